@@ -0,0 +1,229 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.tseries import offsets
+
+from config import Config
+from resampler import AGGREGATIONS, StreamingResampler
+from telemetry_decode import decode_series, telemetry_to_dataframe
+
+# pandas aggregation name -> ThingsBoard `agg` parameter
+SERVER_AGGREGATIONS = {
+    'mean': 'AVG',
+    'sum': 'SUM',
+    'min': 'MIN',
+    'max': 'MAX',
+    'count': 'COUNT',
+}
+
+
+@dataclass
+class AggregationPlan:
+    """Where and how one resample of a time range should run"""
+    mode: str                       # 'server' (ThingsBoard aggregates) or 'client' (raw fetch + resample)
+    rule: str
+    how: str
+    n_buckets: int
+    estimated_raw_rows: int         # per key, for a raw fetch of the whole range
+    estimated_rows: int             # per key, actually transferred by this plan
+    estimated_requests: int
+    agg: Optional[str] = None
+    intervalType: Optional[str] = None
+    interval: Optional[int] = None
+    reason: str = ''
+
+    @property
+    def reduction(self) -> float:
+        """How many times fewer rows this plan moves than a raw fetch"""
+        return self.estimated_raw_rows / max(self.estimated_rows, 1)
+
+
+def rule_to_interval(rule) -> Tuple[str, int]:
+    """
+    Convert a pandas rule string to ThingsBoard (intervalType, interval) parameters
+
+    Fixed-width rules ('15min', '1h') and day rules ('1D') map to MILLISECONDS
+    with the width in ms (ThingsBoard has no calendar-day interval, so a day is
+    24 h even across a DST change); 'W-MON' to WEEK_ISO, other weekly rules to WEEK, month rules to MONTH and
+    quarter rules to QUARTER (calendar intervals ignore `interval`).
+
+    Raises:
+        ValueError: For rules ThingsBoard cannot aggregate by (e.g. '2MS', 'YS')
+    """
+    offset = pd.tseries.frequencies.to_offset(rule)
+    if isinstance(offset, offsets.Tick):
+        return 'MILLISECONDS', int(pd.Timedelta(offset).value // 1_000_000)
+    if isinstance(offset, offsets.Day):
+        # No longer a Tick under pandas 3
+        return 'MILLISECONDS', int(offset.n) * 86_400_000
+    if offset.n != 1:
+        raise ValueError(f"Rule '{rule}' has no ThingsBoard interval equivalent")
+    if isinstance(offset, offsets.Week):
+        return ('WEEK_ISO' if offset.weekday == 0 else 'WEEK'), 0
+    if isinstance(offset, (offsets.MonthBegin, offsets.MonthEnd)):
+        return 'MONTH', 0
+    if isinstance(offset, (offsets.QuarterBegin, offsets.QuarterEnd)):
+        return 'QUARTER', 0
+    raise ValueError(f"Rule '{rule}' has no ThingsBoard interval equivalent")
+
+
+def bucket_starts(rule, startTs: int, endTs: int, timeZone: str = None) -> pd.DatetimeIndex:
+    """
+    Start of every `rule` bucket overlapping [startTs, endTs], in timeZone
+
+    Like DataFrame.resample, fixed-width buckets are counted from local
+    midnight of the start day; day, week, month and quarter buckets start at
+    local calendar boundaries.
+    """
+    tz = timeZone or Config.DEFAULT_TIMEZONE
+    offset = pd.tseries.frequencies.to_offset(rule)
+    start = pd.Timestamp(startTs, unit='ms', tz='UTC').tz_convert(tz)
+    end = pd.Timestamp(endTs, unit='ms', tz='UTC').tz_convert(tz)
+    if isinstance(offset, offsets.Tick):
+        width = int(pd.Timedelta(offset).value // 1_000_000)
+        origin = int(start.normalize().value // 1_000_000)
+        first = origin + (startTs - origin) // width * width
+        values = np.arange(first, endTs + 1, width, dtype=np.int64)
+        return pd.to_datetime(values, unit='ms', utc=True).tz_convert(tz)
+    if isinstance(offset, (offsets.MonthEnd, offsets.QuarterEnd)):
+        # Label calendar buckets by their first day, like ThingsBoard does
+        offset = offsets.MonthBegin() if isinstance(offset, offsets.MonthEnd) else offsets.QuarterBegin(startingMonth=1)
+    first = offset.rollback(start.normalize())
+    return pd.date_range(first, end, freq=offset)
+
+
+def plan_aggregation(
+    rule: str,
+    startTs: int,
+    endTs: int,
+    how: str = 'mean',
+    raw_interval_ms: int = 60 * 1000,
+    limit: int = None,
+    max_buckets_per_request: int = None,
+    min_reduction: float = 2.0
+) -> AggregationPlan:
+    """
+    Decide whether a resample should run on the ThingsBoard server or locally
+
+    Server-side aggregation is chosen when ThingsBoard supports the aggregation
+    and the rule, and it moves at least `min_reduction` times fewer rows than
+    fetching raw points (estimated from the meters' reporting interval).
+
+    Args:
+        rule: Target pandas resample rule, e.g. '1h'
+        startTs: Start timestamp (Unix, milliseconds)
+        endTs: End timestamp (Unix, milliseconds)
+        how: Aggregation ('mean', 'sum', 'min', 'max', 'count', 'last')
+        raw_interval_ms: Typical spacing of raw points of the meter
+        limit: Page size of raw fetches. If None, uses Config.DEFAULT_LIMIT
+        max_buckets_per_request: Buckets per aggregated request. If None, uses limit
+        min_reduction: Smallest row reduction that makes server aggregation worth it
+
+    Returns:
+        AggregationPlan: The chosen plan and its estimates
+    """
+    limit = limit or Config.DEFAULT_LIMIT
+    max_buckets_per_request = max_buckets_per_request or limit
+    n_buckets = len(bucket_starts(rule, startTs, endTs, 'UTC'))
+    raw_rows = max(1, (endTs - startTs) // max(raw_interval_ms, 1) + 1)
+    raw_requests = -(-raw_rows // limit)
+
+    def client_plan(reason):
+        return AggregationPlan('client', rule, how, n_buckets, raw_rows, raw_rows, raw_requests, reason=reason)
+
+    agg = SERVER_AGGREGATIONS.get(how)
+    if agg is None:
+        return client_plan(f"ThingsBoard has no server-side '{how}' aggregation")
+    try:
+        intervalType, interval = rule_to_interval(rule)
+    except ValueError as e:
+        return client_plan(str(e))
+    if raw_rows < n_buckets * min_reduction:
+        return client_plan(f"raw data ({raw_rows} rows) is not much larger than {n_buckets} buckets")
+
+    return AggregationPlan(
+        'server', rule, how, n_buckets, raw_rows, n_buckets,
+        -(-n_buckets // max_buckets_per_request),
+        agg=agg, intervalType=intervalType, interval=interval,
+        reason=f"server aggregation moves {raw_rows / n_buckets:.0f}x fewer rows"
+    )
+
+
+def fetch_resampled(
+    plan: AggregationPlan,
+    startTs: int,
+    endTs: int,
+    entityType: str = "DEVICE",
+    entityId: str = "b57357f0-0934-11f0-ba3c-6989ae50b774",
+    keys: str = "ActiveEnergy_kWh",
+    timeZone: str = None,
+    max_buckets_per_request: int = None,
+    fetch=None,
+    fetch_raw=None,
+    **kwargs
+) -> pd.DataFrame:
+    """
+    Execute a plan and return one row per bucket, indexed by bucket start
+
+    Args:
+        plan: Result of plan_aggregation
+        startTs: Start timestamp (Unix, milliseconds)
+        endTs: End timestamp (Unix, milliseconds)
+        entityType: Entity type, e.g., "DEVICE"
+        entityId: Entity ID
+        keys: Telemetry keys, comma-separated
+        timeZone: Time zone of buckets and index. If None, uses Config.DEFAULT_TIMEZONE
+        max_buckets_per_request: Buckets per aggregated request. If None, uses Config.DEFAULT_LIMIT
+        fetch: get_telemetry_data stand-in for server plans
+        fetch_raw: get_telemetry_data_bulk stand-in for client plans
+        **kwargs: Extra arguments forwarded to the fetch function (e.g. auth_manager)
+
+    Returns:
+        pd.DataFrame: Resampled frame with one float64 column per key
+    """
+    from getTelemetry import get_telemetry_data, get_telemetry_data_bulk
+
+    timeZone = timeZone or Config.DEFAULT_TIMEZONE
+    key_list = [key.strip() for key in keys.split(",") if key.strip()]
+    grid = bucket_starts(plan.rule, startTs, endTs, timeZone)
+
+    if plan.mode == 'client':
+        fetch_raw = fetch_raw or get_telemetry_data_bulk
+        data = fetch_raw(entityType=entityType, entityId=entityId, keys=keys,
+                         startTs=startTs, endTs=endTs, timeZone=timeZone, **kwargs)
+        frame = telemetry_to_dataframe(data, timeZone=timeZone, keys=key_list)
+        if plan.how in AGGREGATIONS:
+            # Anchored on the grid, not on the first point received
+            resampler = StreamingResampler(plan.rule, how=plan.how, columns=key_list, origin=grid[0])
+            resampled = pd.concat([resampler.update(frame), resampler.flush()])
+        else:
+            origin = grid[0] if isinstance(pd.tseries.frequencies.to_offset(plan.rule), offsets.Tick) else 'start_day'
+            resampled = getattr(frame.resample(plan.rule, origin=origin), plan.how)()
+        return resampled.reindex(grid)
+
+    fetch = fetch or get_telemetry_data
+    max_buckets_per_request = max_buckets_per_request or Config.DEFAULT_LIMIT
+    grid_ms = grid.as_unit('ms').asi8
+    out = np.full((len(grid), len(key_list)), np.nan)
+    for first in range(0, len(grid), max_buckets_per_request):
+        last = min(first + max_buckets_per_request, len(grid))
+        chunk_start = int(grid_ms[first])
+        chunk_end = int(grid_ms[last]) - 1 if last < len(grid) else endTs
+        data = fetch(
+            entityType=entityType, entityId=entityId, keys=keys,
+            startTs=chunk_start, endTs=chunk_end,
+            agg=plan.agg, intervalType=plan.intervalType, interval=plan.interval,
+            limit=max_buckets_per_request, timeZone=timeZone, **kwargs
+        )
+        if data is None:
+            raise RuntimeError(f"Aggregated fetch failed for [{chunk_start}, {chunk_end}]")
+        for j, key in enumerate(key_list):
+            ts, values = decode_series(data.get(key) or [])
+            # ThingsBoard stamps each bucket at its middle; snap back to the bucket start
+            rows = np.searchsorted(grid_ms, ts, side='right') - 1
+            valid = rows >= 0
+            out[rows[valid], j] = values[valid]
+
+    return pd.DataFrame(out, index=grid, columns=key_list)
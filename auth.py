@@ -1,18 +1,62 @@
-import requests
 import json
+import base64
+import os
+import tempfile
+import threading
+import time
 from typing import Dict, Optional
 from config import Config
+from instrumentation import metrics
+
+
+def get_session():
+    """Shared HTTP session; requests is only imported once a request is made"""
+    from http_client import get_session as shared_session
+    return shared_session()
+
+
+def decode_jwt_expiry(token: str) -> Optional[float]:
+    """
+    Read the `exp` claim of a JWT without verifying its signature
+
+    Args:
+        token: Encoded JWT
+
+    Returns:
+        Optional[float]: Expiry as a Unix timestamp in seconds, or None if unavailable
+    """
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+        exp = claims.get('exp')
+        return float(exp) if exp is not None else None
+    except (IndexError, ValueError, TypeError, AttributeError):
+        return None
 
 
 class AuthManager:
     """JWT Token Authentication Management Class"""
     
-    def __init__(self, base_url: str = None):
+    def __init__(
+        self,
+        base_url: str = None,
+        username: str = None,
+        password: str = None,
+        token_store_path: str = None,
+        refresh_margin: float = None
+    ):
         """
         Initialize authentication manager
         
         Args:
             base_url: API base URL. If None, uses BASE_URL from config
+            username: Username used to log in again when tokens lapse
+            password: Password used to log in again when tokens lapse
+            token_store_path: Optional JSON file used to share tokens between runs.
+                If None, uses TOKEN_STORE_PATH from config (disabled when unset)
+            refresh_margin: Seconds before expiry at which a token is refreshed.
+                If None, uses TOKEN_REFRESH_MARGIN from config
         """
         if base_url is None:
             base_url = Config.API_BASE_URL
@@ -24,14 +68,22 @@ class AuthManager:
         self.base_url = base_url.rstrip('/')
         self.token = None
         self.refresh_token = None
+        self.token_expires_at = None
+        self.username = username
+        self.password = password
+        self.token_store_path = token_store_path or Config.TOKEN_STORE_PATH
+        self.refresh_margin = Config.TOKEN_REFRESH_MARGIN if refresh_margin is None else refresh_margin
+        # Serializes login/refresh so concurrent workers share one token
+        self._lock = threading.RLock()
+        self._load_token_store()
     
-    def login(self, username: str, password: str) -> Dict[str, str]:
+    def login(self, username: str = None, password: str = None) -> Dict[str, str]:
         """
         Login and get JWT Token
         
         Args:
-            username: Username
-            password: Password
+            username: Username. If None, uses the username given at init
+            password: Password. If None, uses the password given at init
             
         Returns:
             Dict[str, str]: Dictionary containing token and refreshToken
@@ -39,6 +91,15 @@ class AuthManager:
         Raises:
             Exception: Raises exception when login fails
         """
+        if username is None:
+            username = self.username
+        if password is None:
+            password = self.password
+        if not username or not password:
+            raise Exception("Username and password are required to login")
+        
+        import requests
+        
         url = f"{self.base_url}/auth/login"
         
         headers = {
@@ -52,15 +113,18 @@ class AuthManager:
         }
         
         try:
-            response = requests.post(url, headers=headers, json=payload)
+            response = get_session().post(url, headers=headers, json=payload)
             response.raise_for_status()
             
             data = response.json()
             
-            # Save tokens
-            self.token = data.get('token')
-            self.refresh_token = data.get('refreshToken')
+            # Save credentials for automatic re-login, then the tokens
+            with self._lock:
+                self.username = username
+                self.password = password
+                self._set_tokens(data)
             
+            metrics.increment('auth_logins')
             print("Login successful!")
             return data
             
@@ -85,11 +149,10 @@ class AuthManager:
         Raises:
             Exception: Raises exception when not logged in
         """
-        if not self.token:
-            raise Exception("Please login first to get token")
+        token = self.get_token()
         
         return {
-            'Authorization': f'Bearer {self.token}',
+            'Authorization': f'Bearer {token}',
             'accept': 'application/json',
             'Content-Type': 'application/json'
         }
@@ -107,6 +170,8 @@ class AuthManager:
         if not self.refresh_token:
             raise Exception("No refresh token available")
         
+        import requests
+        
         url = f"{self.base_url}/auth/refresh"
         
         headers = {
@@ -116,15 +181,16 @@ class AuthManager:
         }
         
         try:
-            response = requests.post(url, headers=headers)
+            response = get_session().post(url, headers=headers)
             response.raise_for_status()
             
             data = response.json()
             
             # Update tokens
-            self.token = data.get('token')
-            self.refresh_token = data.get('refreshToken')
+            with self._lock:
+                self._set_tokens(data)
             
+            metrics.increment('auth_refreshes')
             print("Token refresh successful!")
             return data
             
@@ -134,18 +200,182 @@ class AuthManager:
                 error_msg += f" - Status code: {e.response.status_code}"
             raise Exception(error_msg)
     
+    def get_token(self) -> str:
+        """
+        Get a valid access token, refreshing or logging in again shortly before expiry
+        
+        Thread-safe: when several threads find the token expiring at the same
+        time, only the first one refreshes it and the others reuse the result.
+        
+        Returns:
+            str: Access token
+            
+        Raises:
+            Exception: Raises exception when no token can be obtained
+        """
+        token = self.token
+        if token and not self._is_expiring(self.token_expires_at):
+            return token
+        
+        with self._lock:
+            # Another thread may have renewed the token while we waited
+            if self.token and not self._is_expiring(self.token_expires_at):
+                return self.token
+            
+            if self.refresh_token and not self._is_expiring(decode_jwt_expiry(self.refresh_token)):
+                try:
+                    self.refresh_token_request()
+                    return self.token
+                except Exception as e:
+                    print(f"Token refresh failed, logging in again: {e}")
+            
+            if self.username and self.password:
+                self.login()
+                return self.token
+            
+            if self.token:
+                # No way to renew it; let the server decide whether it is still valid
+                return self.token
+            
+            raise Exception("Please login first to get token")
+    
+    def invalidate_token(self, token: str = None):
+        """
+        Mark the access token as expired so the next get_token() renews it
+        
+        Args:
+            token: The token that was rejected. If the current token has already
+                been replaced by another thread, nothing is invalidated
+        """
+        with self._lock:
+            if token is None or token == self.token:
+                self.token_expires_at = 0
+    
+    def request(self, method: str, url: str, session=None, **kwargs) -> 'requests.Response':
+        """
+        Send an authenticated request, retrying once with a new token after a 401
+        
+        Args:
+            method: HTTP method
+            url: Request URL
+            session: Session to send through. If None, uses the shared session
+            **kwargs: Extra arguments forwarded to requests.Session.request
+            
+        Returns:
+            requests.Response: Response of the last attempt
+        """
+        headers = dict(kwargs.pop('headers', None) or {})
+        for attempt in range(2):
+            token = self.get_token()
+            headers['X-Authorization'] = f'Bearer {token}'
+            response = (session or get_session()).request(method, url, headers=headers, **kwargs)
+            if response.status_code != 401 or attempt == 1:
+                return response
+            self.invalidate_token(token)
+        return response
+    
+    def _is_expiring(self, expires_at: Optional[float]) -> bool:
+        if expires_at is None:
+            # Tokens without an exp claim are trusted until the server rejects them
+            return False
+        return time.time() >= expires_at - self.refresh_margin
+    
+    def _set_tokens(self, data: Dict[str, str]):
+        self.token = data.get('token')
+        self.refresh_token = data.get('refreshToken') or self.refresh_token
+        self.token_expires_at = decode_jwt_expiry(self.token) if self.token else None
+        self._save_token_store()
+    
+    def _load_token_store(self):
+        if not self.token_store_path or not os.path.exists(self.token_store_path):
+            return
+        try:
+            with open(self.token_store_path, 'r') as f:
+                stored = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: could not read token store {self.token_store_path}: {e}")
+            return
+        if stored.get('base_url') != self.base_url:
+            return
+        if self.username and stored.get('username') not in (None, self.username):
+            return
+        self.token = stored.get('token')
+        self.refresh_token = stored.get('refreshToken')
+        self.token_expires_at = decode_jwt_expiry(self.token) if self.token else None
+    
+    def _save_token_store(self):
+        if not self.token_store_path:
+            return
+        stored = {
+            'base_url': self.base_url,
+            'username': self.username,
+            'token': self.token,
+            'refreshToken': self.refresh_token
+        }
+        tmp_path = None
+        try:
+            directory = os.path.dirname(os.path.abspath(self.token_store_path))
+            os.makedirs(directory, exist_ok=True)
+            # A unique temporary file per write, so concurrent processes never share one
+            fd, tmp_path = tempfile.mkstemp(
+                prefix=f".{os.path.basename(self.token_store_path)}.", suffix='.tmp', dir=directory
+            )
+            os.chmod(tmp_path, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(stored, f)
+            os.replace(tmp_path, self.token_store_path)
+        except OSError as e:
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            print(f"Warning: could not write token store {self.token_store_path}: {e}")
+    
     def logout(self):
         """Logout and clear tokens"""
-        self.token = None
-        self.refresh_token = None
+        with self._lock:
+            self.token = None
+            self.refresh_token = None
+            self.token_expires_at = None
+            if self.token_store_path and os.path.exists(self.token_store_path):
+                os.remove(self.token_store_path)
         print("Logged out")
 
 
+_shared_managers = {}
+_shared_managers_lock = threading.Lock()
+
+
+def get_auth_manager(username: str, password: str, base_url: str = None) -> AuthManager:
+    """
+    Get the process-wide AuthManager for a user, creating it on first use
+    
+    Args:
+        username: Username
+        password: Password
+        base_url: API base URL. If None, uses BASE_URL from .env file
+        
+    Returns:
+        AuthManager: Shared manager whose token is reused until it nears expiry
+    """
+    key = (base_url, username)
+    with _shared_managers_lock:
+        auth_manager = _shared_managers.get(key)
+        if auth_manager is None:
+            auth_manager = AuthManager(base_url, username=username, password=password)
+            _shared_managers[key] = auth_manager
+        elif password != auth_manager.password:
+            auth_manager.password = password
+            auth_manager.invalidate_token()
+    return auth_manager
+
+
 # Simple usage function
 def get_jwt_token(username: str, password: str, base_url: str = None) -> Dict[str, str]:
     """
     Quick function to get JWT Token
     
+    Tokens are cached per user, so repeated calls only log in again when the
+    cached token is about to expire.
+    
     Args:
         username: Username
         password: Password
@@ -154,8 +384,9 @@ def get_jwt_token(username: str, password: str, base_url: str = None) -> Dict[st
     Returns:
         Dict[str, str]: Dictionary containing token and refreshToken
     """
-    auth_manager = AuthManager(base_url)
-    return auth_manager.login(username, password)
+    auth_manager = get_auth_manager(username, password, base_url)
+    token = auth_manager.get_token()
+    return {'token': token, 'refreshToken': auth_manager.refresh_token}
 
 
 # Usage example
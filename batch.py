@@ -0,0 +1,219 @@
+"""
+Batch processing of many ThingsBoard exports in a process pool
+
+Each export (one CSV per floor or meter, laid out like
+data/total-power-usage-17F.csv) is read, resampled, windowed and saved by a
+worker process. Workers write their results straight to disk (resampled CSV,
+scaler statistics and a memory-mappable windows.npy + mask) and return only a
+small summary, so no DataFrame is ever pickled between processes. A failing
+export is reported and does not stop the others.
+
+Usage:
+    python batch.py data/ --output data/output/batch --workers 8
+    python batch.py "exports/*-17F.csv" --rule 15min --window-len 672
+"""
+import argparse
+import contextlib
+import glob
+import io
+import os
+import sys
+import time
+import traceback
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+FileResult = namedtuple(
+    'FileResult',
+    ['path', 'ok', 'rows', 'resampled_rows', 'n_windows', 'outputs', 'seconds', 'error']
+)
+FileResult.__doc__ = """
+Outcome of one export
+
+path: The input CSV
+ok: Whether every stage succeeded
+rows / resampled_rows / n_windows: Sizes at each stage (None when not reached)
+outputs: {"resampled": path, "scaler": path, "windows": path} of the files written
+seconds: Wall time in the worker
+error: Error message (with the worker's log) when ok is False
+"""
+
+
+def discover_exports(source, pattern='*.csv'):
+    """
+    Resolve a directory, glob or single file into a sorted list of CSV exports
+
+    Args:
+        source: Directory (searched for `pattern`), glob pattern or file path
+        pattern: File pattern used when `source` is a directory
+
+    Returns:
+        list: Paths of the exports
+    """
+    if os.path.isdir(source):
+        paths = glob.glob(os.path.join(source, pattern))
+    elif os.path.isfile(source):
+        paths = [source]
+    else:
+        paths = glob.glob(source, recursive=True)
+    return sorted(path for path in paths if os.path.isfile(path))
+
+
+def _output_names(paths, output_dir):
+    """One output directory per export, named after the file (made unique if needed)"""
+    names, used = {}, set()
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        name, i = stem, 1
+        while name in used:
+            i += 1
+            name = f"{stem}-{i}"
+        used.add(name)
+        names[path] = os.path.join(output_dir, name)
+    return names
+
+
+def process_export(path, output_dir, rule='1h', how='mean', window_len=24 * 7, step=1, window_dtype='float32'):
+    """
+    Run read → resample → window → save for one export (executed in a worker)
+
+    Args:
+        path: CSV export
+        output_dir: Directory receiving resampled.csv, scaler.json, windows.npy and windows.mask.npy
+        rule: Resampling frequency
+        how: Resampling aggregation
+        window_len: Window length in resampled steps
+        step: Step between window starts
+        window_dtype: dtype of the saved window tensor
+
+    Returns:
+        FileResult: Summary of the run; failures are captured, never raised
+    """
+    started = time.perf_counter()
+    log = io.StringIO()
+    rows = resampled_rows = n_windows = None
+    outputs = {}
+    try:
+        # The pipeline reports problems by printing; keep them for the summary
+        with contextlib.redirect_stdout(log):
+            from main import create_sliding_windows, read_power_usage_data, resample_power_data
+            from outputs import save_frame, save_windows
+            from scaler import StreamingScaler
+
+            df = read_power_usage_data(path, fast=True, verbose=False)
+            if df is None:
+                raise ValueError("could not read the export")
+            rows = len(df)
+
+            resampled = resample_power_data(df, rule=rule, how=how)
+            del df
+            resampled_rows = len(resampled)
+            os.makedirs(output_dir, exist_ok=True)
+            outputs['resampled'] = os.path.join(output_dir, 'resampled.csv')
+            save_frame(resampled, outputs['resampled'], fmt='csv')
+            # Normalization statistics; merge them across exports with StreamingScaler.merge
+            outputs['scaler'] = os.path.join(output_dir, 'scaler.json')
+            StreamingScaler().partial_fit(resampled).save(outputs['scaler'])
+
+            if resampled_rows >= window_len:
+                X = create_sliding_windows(resampled.to_numpy(), window_len, step=step)
+                n_windows = len(X)
+                outputs['windows'] = os.path.join(output_dir, 'windows.npy')
+                save_windows(X, outputs['windows'], dtype=window_dtype)
+            else:
+                n_windows = 0
+        return FileResult(path, True, rows, resampled_rows, n_windows, outputs, time.perf_counter() - started, None)
+    except Exception as e:
+        message = f"{type(e).__name__}: {e}"
+        details = log.getvalue().strip()
+        if details:
+            message += f"\n{details}"
+        if not isinstance(e, ValueError):
+            message += f"\n{traceback.format_exc()}"
+        return FileResult(path, False, rows, resampled_rows, n_windows, outputs, time.perf_counter() - started, message)
+
+
+def run_batch(source, output_dir='data/output/batch', max_workers=None, pattern='*.csv', verbose=True, **options):
+    """
+    Process every export under `source` in a process pool
+
+    Args:
+        source: Directory, glob pattern or file (see discover_exports)
+        output_dir: Root of the per-export output directories
+        max_workers: Worker processes. If None, uses all cores (capped at the number of files)
+        pattern: File pattern used when `source` is a directory
+        verbose: Print one progress line per finished export and a final summary
+        **options: Forwarded to process_export (rule, how, window_len, step, window_dtype)
+
+    Returns:
+        list: FileResult per export, in input order
+    """
+    paths = discover_exports(source, pattern)
+    if not paths:
+        if verbose:
+            print(f"No exports found in {source}")
+        return []
+    outputs = _output_names(paths, output_dir)
+    max_workers = max(1, min(max_workers or os.cpu_count() or 1, len(paths)))
+
+    started = time.perf_counter()
+    results = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(process_export, path, outputs[path], **options): path for path in paths}
+        for done, future in enumerate(as_completed(futures), 1):
+            path = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker itself died (e.g. out of memory); the pool may still serve others
+                result = FileResult(path, False, None, None, None, {}, None, f"worker failed: {type(e).__name__}: {e}")
+            results[path] = result
+            if verbose:
+                if result.ok:
+                    print(f"[{done}/{len(paths)}] ✓ {path}: {result.rows} rows → {result.resampled_rows} steps "
+                          f"→ {result.n_windows} windows ({result.seconds:.2f}s)")
+                else:
+                    print(f"[{done}/{len(paths)}] ✗ {path}: {result.error.splitlines()[0]}")
+
+    ordered = [results[path] for path in paths]
+    if verbose:
+        print_summary(ordered, time.perf_counter() - started, max_workers)
+    return ordered
+
+
+def print_summary(results, elapsed, workers):
+    """Print totals, throughput and the failures of a batch run"""
+    ok = [r for r in results if r.ok]
+    failed = [r for r in results if not r.ok]
+    rows = sum(r.rows or 0 for r in ok)
+    print("-" * 30)
+    print(f"Processed {len(results)} exports with {workers} workers in {elapsed:.2f}s: "
+          f"{len(ok)} ok, {len(failed)} failed")
+    if elapsed > 0:
+        print(f"{rows} rows, {rows / elapsed:,.0f} rows/s, {len(results) / elapsed:.2f} files/s")
+    for result in failed:
+        print(f"✗ {result.path}\n  " + result.error.replace("\n", "\n  "))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('source', help='Directory, glob pattern or CSV file')
+    parser.add_argument('--output', default='data/output/batch', help='Root output directory')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: all cores)')
+    parser.add_argument('--pattern', default='*.csv', help='File pattern when source is a directory')
+    parser.add_argument('--rule', default='1h', help='Resampling frequency')
+    parser.add_argument('--how', default='mean', help='Resampling aggregation')
+    parser.add_argument('--window-len', type=int, default=24 * 7, help='Window length in resampled steps')
+    parser.add_argument('--step', type=int, default=1, help='Step between window starts')
+    parser.add_argument('--window-dtype', default='float32', help='dtype of the saved window tensors')
+    args = parser.parse_args(argv)
+
+    results = run_batch(
+        args.source, args.output, max_workers=args.workers, pattern=args.pattern,
+        rule=args.rule, how=args.how, window_len=args.window_len, step=args.step, window_dtype=args.window_dtype
+    )
+    return 0 if results and all(r.ok for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
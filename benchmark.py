@@ -0,0 +1,242 @@
+"""
+Benchmark suite for the power-usage pipeline
+
+Generates synthetic ThingsBoard exports of increasing size, then times and
+memory-profiles each pipeline stage. Results are compared against a stored
+baseline and the run fails (exit code 1) when a stage regresses.
+
+Usage:
+    python benchmark.py --sizes 1e4 1e5 1e6 --update-baseline   # record a baseline
+    python benchmark.py --sizes 1e4 1e5 1e6                     # compare against it
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+DEFAULT_BASELINE = 'benchmark_baseline.json'
+WINDOW_LEN = 24 * 7
+# Window tensors larger than this many values are not materialized
+MAX_WINDOW_VALUES = 50_000_000
+MAX_DECODE_POINTS = 1_000_000
+# Entry points of the short-lived jobs, and the dependencies they should not load on import
+STARTUP_MODULES = ('config', 'getTelemetry', 'auth', 'main')
+HEAVY_MODULES = ('numpy', 'pandas', 'requests')
+_STARTUP_PROBE = (
+    "import json, sys, time\n"
+    "started = time.perf_counter()\n"
+    "import {module}\n"
+    "seconds = time.perf_counter() - started\n"
+    "print(json.dumps({{'seconds': seconds, 'heavy': [m for m in {heavy!r} if m in sys.modules]}}))\n"
+)
+
+
+def measure(fn, repeat=3, memory=True):
+    """
+    Run fn `repeat` times and return its result, best wall time and peak allocation
+
+    Pipeline progress prints are silenced. The peak is measured with tracemalloc
+    in one extra run, so tracing does not distort the timings.
+
+    Returns:
+        tuple: (result, seconds, peak_bytes or None)
+    """
+    best = float('inf')
+    result = None
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(max(1, repeat)):
+            started = time.perf_counter()
+            result = fn()
+            best = min(best, time.perf_counter() - started)
+        peak = None
+        if memory:
+            tracemalloc.start()
+            try:
+                fn()
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+    return result, best, peak
+
+
+def run_size(n_rows, n_features=1, gap_rate=0.001, repeat=3, memory=True, workdir=None):
+    """
+    Benchmark every stage on one synthetic export
+
+    Returns:
+        dict: {stage: {"seconds": ..., "peak_bytes": ..., "rows": ...}}
+    """
+    from main import create_sliding_windows, read_power_usage_data, resample_power_data, save_data_to_csv
+    from synthetic import telemetry_response, write_power_csv
+    from telemetry_decode import telemetry_to_dataframe
+    from windowing import WindowBatcher
+
+    results = {}
+
+    def record(stage, fn, rows):
+        value, seconds, peak = measure(fn, repeat=repeat, memory=memory)
+        results[stage] = {'seconds': seconds, 'peak_bytes': peak, 'rows': int(rows)}
+        return value
+
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        csv_path = os.path.join(tmp, 'power.csv')
+        written = write_power_csv(csv_path, n_rows, n_features=n_features, freq='1min', gap_rate=gap_rate)
+
+        df = record('read_power_usage_data',
+                    lambda: read_power_usage_data(csv_path, fast=True, cache=False, verbose=False), written)
+        resampled = record('resample_power_data', lambda: resample_power_data(df, rule='1h'), len(df))
+        values = resampled.to_numpy()
+
+        if len(values) >= WINDOW_LEN:
+            # The function returns a strided view in O(1); summing it reads every
+            # window value, as the copying loop it replaced did
+            record('create_sliding_windows', lambda: float(create_sliding_windows(values, WINDOW_LEN).sum()), len(values))
+            windows = create_sliding_windows(values, WINDOW_LEN)
+            if windows.size <= MAX_WINDOW_VALUES:
+                record('window_batches',
+                       lambda: sum(float(batch[0, 0, 0]) for batch in WindowBatcher(values, WINDOW_LEN, batch_size=512)),
+                       len(windows))
+
+        out_path = os.path.join(tmp, 'resampled.csv')
+        record('save_data_to_csv', lambda: save_data_to_csv(resampled, out_path), len(resampled))
+
+        n_points = min(int(n_rows), MAX_DECODE_POINTS)
+        response = telemetry_response(n_points, keys=tuple(f"key_{i}" for i in range(n_features)))
+        record('telemetry_decode', lambda: telemetry_to_dataframe(response, timeZone='UTC'), n_points * n_features)
+
+    return results
+
+
+def measure_startup(modules=STARTUP_MODULES, repeat=5):
+    """
+    Time `import <module>` in fresh interpreters, as paid by every cron job and worker
+
+    Returns:
+        dict: {"import <module>": {"seconds": ..., "peak_bytes": None, "rows": 1,
+            "heavy_imports": [...]}}, where heavy_imports lists the HEAVY_MODULES
+            loaded as a side effect of the import
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    results = {}
+    for module in modules:
+        best, heavy = float('inf'), []
+        for _ in range(max(1, repeat)):
+            probe = _STARTUP_PROBE.format(module=module, heavy=HEAVY_MODULES)
+            output = subprocess.run([sys.executable, '-c', probe], cwd=here, capture_output=True, text=True, check=True)
+            # The probe's JSON is the last line; anything printed on import comes before it
+            report = json.loads(output.stdout.strip().splitlines()[-1])
+            best = min(best, report['seconds'])
+            heavy = report['heavy']
+        results[f"import {module}"] = {'seconds': best, 'peak_bytes': None, 'rows': 1, 'heavy_imports': heavy}
+    return results
+
+
+def compare(results, baseline, time_tolerance=1.5, memory_tolerance=1.5, min_seconds=0.05, min_bytes=1 << 20):
+    """
+    Find stages slower or hungrier than the baseline beyond the tolerances
+
+    Small absolute differences (below min_seconds / min_bytes) are ignored as noise.
+
+    Returns:
+        list: Human-readable regression descriptions (empty when none)
+    """
+    regressions = []
+    for case, stages in results.items():
+        for stage, current in stages.items():
+            previous = baseline.get(case, {}).get(stage)
+            if previous is None:
+                continue
+            seconds, base_seconds = current['seconds'], previous['seconds']
+            if seconds > base_seconds * time_tolerance and seconds - base_seconds > min_seconds:
+                regressions.append(f"{case} {stage}: {seconds:.3f}s vs baseline {base_seconds:.3f}s")
+            peak, base_peak = current.get('peak_bytes'), previous.get('peak_bytes')
+            if peak is not None and base_peak is not None:
+                if peak > base_peak * memory_tolerance and peak - base_peak > min_bytes:
+                    regressions.append(f"{case} {stage}: peak {peak / 2**20:.1f} MiB vs baseline {base_peak / 2**20:.1f} MiB")
+    return regressions
+
+
+def _print_results(case, stages):
+    print(f"\n=== {case} ===")
+    for stage, result in stages.items():
+        peak = result['peak_bytes']
+        peak_text = f"{peak / 2**20:9.1f} MiB" if peak is not None else "        n/a"
+        rate = result['rows'] / result['seconds'] if result['seconds'] > 0 else float('inf')
+        if 'heavy_imports' in result:
+            heavy = ', '.join(result['heavy_imports']) or 'no heavy dependencies'
+            print(f"  {stage:<24} {result['seconds']:9.4f}s {peak_text}  loads {heavy}")
+            continue
+        print(f"  {stage:<24} {result['seconds']:9.4f}s {peak_text} {rate:14,.0f} rows/s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', type=float, default=[1e4, 1e5, 1e6], help='Rows per synthetic export (up to 1e8)')
+    parser.add_argument('--features', type=int, default=1, help='Value columns per export')
+    parser.add_argument('--gap-rate', type=float, default=0.001, help='Probability that a gap starts at a row')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per stage (best is kept)')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc run')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline JSON file')
+    parser.add_argument('--update-baseline', action='store_true', help='Store these results as the new baseline')
+    parser.add_argument('--time-tolerance', type=float, default=1.5)
+    parser.add_argument('--memory-tolerance', type=float, default=1.5)
+    parser.add_argument('--output', help='Also write the results to this JSON file')
+    parser.add_argument('--workdir', help='Directory for the temporary exports')
+    parser.add_argument('--no-startup', action='store_true', help='Skip the import-time measurements')
+    args = parser.parse_args(argv)
+
+    results = {}
+    if not args.no_startup:
+        results['startup'] = measure_startup(repeat=args.repeat)
+        _print_results('startup', results['startup'])
+    for size in args.sizes:
+        case = f"rows={int(size)},features={args.features}"
+        results[case] = run_size(int(size), args.features, args.gap_rate, args.repeat, not args.no_memory, args.workdir)
+        _print_results(case, results[case])
+
+    report = {
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(), 'numpy': np.__version__},
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f).get('results', {})
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump({**report, 'results': baseline}, f, indent=2)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f).get('results', {})
+    regressions = compare(results, baseline, args.time_tolerance, args.memory_tolerance)
+    if regressions:
+        print("\nRegressions against baseline:")
+        for regression in regressions:
+            print(f"  ✗ {regression}")
+        return 1
+    print("\n✓ No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
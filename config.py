@@ -1,50 +1,167 @@
 import os
+import threading
 
-# Load environment variables from .env file if it exists
+# Path of the optional .env file, loaded on first access to a setting
 env_path = os.path.join(os.path.dirname(__file__), '.env')
-if os.path.exists(env_path):
-    try:
-        from dotenv import load_dotenv
-        load_dotenv(env_path)
-        print(f"✓ Loaded environment variables from {env_path}")
-    except ImportError:
-        print("⚠ python-dotenv not installed, using system environment variables")
-else:
-    print("⚠ .env file not found, using system environment variables")
+
+_env_lock = threading.Lock()
+_env_status = None
+
+
+def load_env(path: str = None) -> str:
+    """
+    Load the .env file into os.environ once per process
+
+    Nothing is read at import time; Config settings call this on first access.
+    Variables already set in the environment take precedence over the file.
+
+    Args:
+        path: .env file to load. If None, uses the .env next to this module
+
+    Returns:
+        str: Human-readable description of where the settings came from
+    """
+    global _env_status
+    if _env_status is not None:
+        return _env_status
+    with _env_lock:
+        if _env_status is not None:
+            return _env_status
+        path = path or env_path
+        if not os.path.exists(path):
+            status = "⚠ .env file not found, using system environment variables"
+        else:
+            try:
+                from dotenv import load_dotenv
+                load_dotenv(path)
+                status = f"✓ Loaded environment variables from {path}"
+            except ImportError:
+                status = "⚠ python-dotenv not installed, using system environment variables"
+        _env_status = status
+    return status
+
+
+class _Setting:
+    """
+    Class attribute computed on first access and cached until Config.reload()
+
+    `compute` receives the Config class, so derived settings can use other settings.
+    """
+
+    def __init__(self, compute):
+        self.compute = compute
+        self.name = None
+        self._value = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    load_env()
+                    self._value = self.compute(owner)
+                    self._loaded = True
+        return self._value
+
+    def reset(self):
+        with self._lock:
+            self._loaded = False
+            self._value = None
+
+
+def _env(name, default=None, cast=str):
+    """Setting read from the environment variable `name`"""
+    def compute(cls):
+        value = os.getenv(name)
+        if value is None:
+            return default
+        return cast(value)
+    return _Setting(compute)
+
+
+def _flag(value: str) -> bool:
+    return value.lower() in ('1', 'true', 'yes')
+
 
 class Config:
-    """Configuration class for loading environment variables"""
-    
+    """
+    Configuration class for loading environment variables
+
+    Settings are read lazily: the .env file is loaded and each value is parsed
+    on first access, then cached. Importing this module has no side effects;
+    call Config.validate_config() explicitly where required settings matter.
+    """
+
     # API Configuration
-    BASE_URL = os.getenv('BASE_URL', 'https://ioter.mpiot.com.hk')
-    AUTHORIZATION_TOKEN = os.getenv('AUTHORIZATION_TOKEN')
-    USERNAME = os.getenv('USERNAME')
-    PASSWORD = os.getenv('PASSWORD')
-    
+    BASE_URL = _env('BASE_URL', 'https://ioter.mpiot.com.hk')
+    AUTHORIZATION_TOKEN = _env('AUTHORIZATION_TOKEN')
+    USERNAME = _env('USERNAME')
+    PASSWORD = _env('PASSWORD')
+
     # API Endpoints
-    API_BASE_URL = f"{BASE_URL.rstrip('/')}/api"
-    TELEMETRY_BASE_URL = f"{BASE_URL.rstrip('/')}/api/plugins/telemetry"
-    
+    API_BASE_URL = _Setting(lambda cls: f"{cls.BASE_URL.rstrip('/')}/api")
+    TELEMETRY_BASE_URL = _Setting(lambda cls: f"{cls.BASE_URL.rstrip('/')}/api/plugins/telemetry")
+
     # Default settings
     DEFAULT_TIMEZONE = "Asia/Hong_Kong"
     DEFAULT_LIMIT = 1000
-    
+
+    # Instrumentation (timings, memory, HTTP latency)
+    PIPELINE_METRICS = _env('PIPELINE_METRICS', False, _flag)
+
+    # Local telemetry store
+    TELEMETRY_STORE_DIR = _env('TELEMETRY_STORE_DIR', 'data/store')
+
+    # Stage cache (memoized pipeline results)
+    STAGE_CACHE_DIR = _env('STAGE_CACHE_DIR', 'data/cache')
+    STAGE_CACHE_MAX_BYTES = _env('STAGE_CACHE_MAX_BYTES', 2 * 1024 ** 3, int)
+    STAGE_CACHE_MAX_AGE = _env('STAGE_CACHE_MAX_AGE', 7 * 24 * 3600.0, float)
+
+    # Token cache settings
+    TOKEN_REFRESH_MARGIN = _env('TOKEN_REFRESH_MARGIN', 60.0, float)
+    TOKEN_STORE_PATH = _env('TOKEN_STORE_PATH')
+
+    # HTTP client settings
+    HTTP_POOL_SIZE = _env('HTTP_POOL_SIZE', 16, int)
+    HTTP_CONNECT_TIMEOUT = _env('HTTP_CONNECT_TIMEOUT', 5.0, float)
+    HTTP_READ_TIMEOUT = _env('HTTP_READ_TIMEOUT', 60.0, float)
+    HTTP_MAX_RETRIES = _env('HTTP_MAX_RETRIES', 3, int)
+    HTTP_BACKOFF_FACTOR = _env('HTTP_BACKOFF_FACTOR', 0.5, float)
+    HTTP_BACKOFF_JITTER = _env('HTTP_BACKOFF_JITTER', 0.25, float)
+
     @classmethod
-    def validate_config(cls):
-        """Validate that required environment variables are set"""
+    def reload(cls):
+        """Forget cached settings so the next access re-reads the environment"""
+        for value in vars(cls).values():
+            if isinstance(value, _Setting):
+                value.reset()
+
+    @classmethod
+    def validate_config(cls, verbose: bool = True):
+        """
+        Validate that required environment variables are set
+
+        Args:
+            verbose: Print where the settings were loaded from
+        """
+        status = load_env()
+        if verbose:
+            print(status)
+
         if not cls.BASE_URL:
             raise ValueError("BASE_URL environment variable is not set")
-        
+
         if not cls.USERNAME:
             print("Warning: USERNAME environment variable is not set")
-        
+
         if not cls.PASSWORD:
             print("Warning: PASSWORD environment variable is not set")
-        
+
         if not cls.AUTHORIZATION_TOKEN:
             print("Warning: AUTHORIZATION_TOKEN environment variable is not set")
-        
-        return True
 
-# Validate configuration on import
-Config.validate_config()
\ No newline at end of file
+        return True
@@ -0,0 +1,135 @@
+from collections import namedtuple
+
+import numpy as np
+
+from gaps import gap_statistics, missing_mask
+
+# Steps in one week of hourly data: the same hour of the same weekday
+HOURS_PER_WEEK = 24 * 7
+
+FillResult = namedtuple('FillResult', ['values', 'filled', 'stats'])
+FillResult.__doc__ = """
+Result of fill_short_gaps
+
+values: Filled copy of the input (DataFrame in, DataFrame out)
+filled: (steps, features) bool array, True where a value was filled
+stats: gap statistics of what is still missing (see gaps.gap_statistics),
+    i.e. the work left for the imputation model
+"""
+
+
+def _period_of(data, period):
+    """
+    Steps per week: `period`, else derived from the index frequency
+
+    Returns None when the frequency has no whole number of steps per week
+    (e.g. '5h', weekly or monthly data); arrays without an index are taken
+    to be hourly.
+    """
+    if period is not None:
+        return int(period)
+    freq = getattr(getattr(data, 'index', None), 'freq', None)
+    if freq is None:
+        return HOURS_PER_WEEK
+    import pandas as pd
+    if isinstance(freq, pd.offsets.Day):
+        # Under pandas 3 a Day is a calendar day, not a fixed Tick
+        step = pd.Timedelta(days=freq.n)
+    elif isinstance(freq, pd.offsets.Tick):
+        step = pd.Timedelta(freq)
+    else:
+        return None
+    week = pd.Timedelta(days=7)
+    if step.value <= 0 or week.value % step.value:
+        return None
+    return week.value // step.value
+
+
+def _neighbours(mask):
+    """
+    Previous and next observed step of every cell, per feature
+
+    Returns:
+        tuple: (prev, next) int arrays shaped like mask; -1 / len(mask) where none exists
+    """
+    n = len(mask)
+    idx = np.arange(n)[:, None]
+    prev = np.maximum.accumulate(np.where(mask, -1, idx), axis=0)
+    nxt = np.minimum.accumulate(np.where(mask, n, idx)[::-1], axis=0)[::-1]
+    return prev, nxt
+
+
+def seasonal_reference(values, period=HOURS_PER_WEEK):
+    """
+    Same-phase reference value of every step: the mean of the observed values one
+    period earlier and one period later (NaN when neither is observed)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    before = np.full_like(values, np.nan)
+    after = np.full_like(values, np.nan)
+    if period < len(values):
+        before[period:] = values[:-period]
+        after[:-period] = values[period:]
+    return np.where(np.isnan(before), after, np.where(np.isnan(after), before, (before + after) / 2))
+
+
+def fill_short_gaps(data, max_gap=2, seasonal_max_gap=None, period=None, seasonal=True):
+    """
+    Fill short NaN gaps in resampled data with cheap, fully vectorized baselines
+
+    Per feature, each missing run of at most `max_gap` steps that has an observed
+    value on both sides is linearly interpolated. Runs that cannot be
+    interpolated (at the edges of the series) or are longer than `max_gap` but
+    at most `seasonal_max_gap` take the value from the same hour of the week:
+    the mean of the observed values one `period` earlier and later. Everything
+    else stays NaN for the imputation model.
+
+    Args:
+        data: (steps,) or (steps, features) array or DataFrame of resampled data
+        max_gap: Longest run (in steps) that is interpolated linearly
+        seasonal_max_gap: Longest run filled seasonally. If None, equals max_gap
+        period: Steps per season. If None, one week at the DataFrame's index
+            frequency, or 168 (hourly data) for arrays. Frequencies with no
+            whole number of steps per week disable the seasonal fill
+        seasonal: Enable the seasonal fill
+
+    Returns:
+        FillResult: (values, filled, stats)
+    """
+    mask = missing_mask(data)
+    values = np.asarray(data, dtype=np.float64).reshape(mask.shape)
+    filled_values = values.copy()
+    if seasonal_max_gap is None:
+        seasonal_max_gap = max_gap
+
+    prev, nxt = _neighbours(mask)
+    run_length = nxt - prev - 1
+    n = len(mask)
+
+    # Linear interpolation between the observed neighbours of short interior runs
+    linear = mask & (prev >= 0) & (nxt < n) & (run_length <= max_gap)
+    if linear.any():
+        left = np.take_along_axis(values, np.clip(prev, 0, n - 1), axis=0)
+        right = np.take_along_axis(values, np.clip(nxt, 0, n - 1), axis=0)
+        idx = np.arange(n)[:, None]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weight = (idx - prev) / (nxt - prev)
+        np.copyto(filled_values, left + (right - left) * weight, where=linear)
+    filled = linear
+
+    season = _period_of(data, period) if seasonal else None
+    if seasonal and season is None:
+        print(f"⚠ Frequency {data.index.freqstr} has no whole number of steps per week; "
+              f"seasonal fill disabled (pass period to enable it)")
+    if season is not None:
+        # References come from the original observations only, never from filled values
+        reference = seasonal_reference(values, season)
+        candidates = mask & ~linear & (run_length <= max(max_gap, seasonal_max_gap)) & ~np.isnan(reference)
+        np.copyto(filled_values, reference, where=candidates)
+        filled = filled | candidates
+
+    if hasattr(data, 'columns'):
+        filled_values = data.__class__(filled_values, index=data.index, columns=data.columns)
+    elif np.ndim(data) == 1:
+        filled_values = filled_values[:, 0]
+    return FillResult(filled_values, filled, gap_statistics(mask & ~filled))
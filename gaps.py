@@ -0,0 +1,140 @@
+from collections import namedtuple
+from typing import Dict, Tuple
+
+import numpy as np
+
+from windowing import count_windows
+
+WindowIndex = namedtuple('WindowIndex', ['mask', 'stats', 'starts'])
+WindowIndex.__doc__ = """
+Result of build_window_index
+
+mask: (steps, features) bool array, True where a value is missing
+stats: gap statistics (see gap_statistics)
+starts: int64 start offsets of the windows that pass the filters
+"""
+
+
+def missing_mask(values) -> np.ndarray:
+    """
+    Boolean (steps, features) mask of missing (NaN) values
+
+    Args:
+        values: (steps,) or (steps, features) array, or a DataFrame
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        values = values[:, None]
+    return np.isnan(values)
+
+
+def _step_mask(mask) -> np.ndarray:
+    """Reduce a (steps, features) mask to one flag per step (missing in any feature)"""
+    mask = np.asarray(mask, dtype=bool)
+    return mask.any(axis=1) if mask.ndim == 2 else mask
+
+
+def gap_runs(mask) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Locate every run of consecutive missing steps
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (start offsets, lengths) of the gaps
+    """
+    step_mask = _step_mask(mask).astype(np.int8)
+    edges = np.diff(np.concatenate(([0], step_mask, [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return starts, ends - starts
+
+
+def run_lengths(mask) -> np.ndarray:
+    """
+    Length of the missing run ending at each step (0 where the step is observed)
+    """
+    step_mask = _step_mask(mask)
+    idx = np.arange(len(step_mask))
+    last_observed = np.maximum.accumulate(np.where(step_mask, -1, idx))
+    return np.where(step_mask, idx - last_observed, 0)
+
+
+def gap_statistics(mask) -> Dict:
+    """
+    Summary statistics of the gaps in a missing mask
+
+    Returns:
+        Dict: n_steps, n_missing_steps, missing_fraction (over all cells),
+            n_gaps, max_gap, mean_gap and gap_length_counts ({length: count})
+    """
+    mask = np.asarray(mask, dtype=bool)
+    _, lengths = gap_runs(mask)
+    lengths_found, counts = np.unique(lengths, return_counts=True)
+    return {
+        'n_steps': int(len(mask)),
+        'n_missing_steps': int(lengths.sum()),
+        'missing_fraction': float(mask.mean()) if mask.size else 0.0,
+        'n_gaps': int(len(lengths)),
+        'max_gap': int(lengths.max()) if len(lengths) else 0,
+        'mean_gap': float(lengths.mean()) if len(lengths) else 0.0,
+        'gap_length_counts': {int(k): int(v) for k, v in zip(lengths_found, counts)},
+    }
+
+
+def valid_window_starts(mask, window_len, step=1, max_missing_frac=None, max_gap=None) -> np.ndarray:
+    """
+    Start offsets of the windows that are usable, without materializing any window
+
+    Args:
+        mask: (steps,) or (steps, features) missing mask (True = missing)
+        window_len: Number of time steps per window
+        step: Stride between candidate window starts
+        max_missing_frac: Largest allowed fraction of missing cells per window
+        max_gap: Longest allowed run of missing steps inside a window
+
+    Returns:
+        np.ndarray: int64 start offsets in ascending order
+    """
+    mask = np.asarray(mask, dtype=bool)
+    if mask.ndim == 1:
+        mask = mask[:, None]
+    n_steps = len(mask)
+    n_windows = count_windows(n_steps, window_len, step)
+    starts = np.arange(n_windows, dtype=np.int64) * step
+    if n_windows == 0:
+        return starts
+
+    keep = np.ones(n_windows, dtype=bool)
+
+    if max_missing_frac is not None:
+        # Missing cells per window from one cumulative sum over the series
+        cumulative = np.concatenate(([0], np.cumsum(mask.sum(axis=1))))
+        missing = cumulative[starts + window_len] - cumulative[starts]
+        keep &= missing <= max_missing_frac * window_len * mask.shape[1]
+
+    if max_gap is not None and max_gap < window_len:
+        # A window [s, s + w) holds a gap longer than max_gap exactly when some step
+        # i in [s + max_gap, s + w) ends a run longer than max_gap
+        too_long = np.concatenate(([0], np.cumsum(run_lengths(mask) > max_gap)))
+        bad = too_long[starts + window_len] - too_long[starts + max_gap]
+        keep &= bad == 0
+
+    return starts[keep]
+
+
+def build_window_index(values, window_len, step=1, max_missing_frac=None, max_gap=None) -> WindowIndex:
+    """
+    Build the missing mask, gap statistics and valid window starts in one pass
+
+    Args:
+        values: (steps,) or (steps, features) array or DataFrame of resampled data
+        window_len: Number of time steps per window
+        step: Stride between candidate window starts
+        max_missing_frac: Largest allowed fraction of missing cells per window
+        max_gap: Longest allowed run of missing steps inside a window
+
+    Returns:
+        WindowIndex: (mask, stats, starts)
+    """
+    mask = missing_mask(values)
+    starts = valid_window_starts(mask, window_len, step, max_missing_frac, max_gap)
+    return WindowIndex(mask, gap_statistics(mask), starts)
@@ -1,8 +1,20 @@
-import requests
 import datetime
 import time
 from config import Config
-from auth import get_jwt_token
+from rate_limit import THROTTLE_STATUS_CODES, get_controller
+
+
+def get_session(throttle_aware: bool = False):
+    """Shared HTTP session; requests is only imported once a request is made"""
+    from http_client import get_session as shared_session
+    return shared_session(throttle_aware)
+
+
+def get_jwt_token(*args, **kwargs):
+    """Re-export of auth.get_jwt_token for existing callers, imported on first use"""
+    from auth import get_jwt_token as jwt_token
+    return jwt_token(*args, **kwargs)
+
 
 def get_telemetry_data(
     entityType: str = "DEVICE",
@@ -17,7 +29,9 @@ def get_telemetry_data(
     agg: str = None,
     orderBy: str = "ASC",
     useStrictDataTypes: bool = False,
-    authorization_token: str = None
+    authorization_token: str = None,
+    auth_manager=None,
+    controller=None
 ):
     """
     Fetch telemetry data from ThingsBoard API.
@@ -36,10 +50,16 @@ def get_telemetry_data(
         orderBy (str): Sorting order (e.g., "ASC", "DESC").
         useStrictDataTypes (bool): Whether to use strict data types.
         authorization_token (str): Bearer token for API requests.
+        auth_manager (AuthManager): Token cache used when authorization_token is None.
+            Tokens are renewed before expiry and the request is retried once after a 401.
+        controller (AdaptiveConcurrencyController): Optional per-host concurrency limiter.
+            When given, requests wait for a free slot and throttled responses are retried.
 
     Returns:
         dict: JSON response containing telemetry data, or None if request fails.
     """
+    import requests
+
     endpoint = f"{Config.TELEMETRY_BASE_URL}/{entityType}/{entityId}/values/timeseries"
 
     # Calculate default timestamps (in milliseconds)
@@ -86,14 +106,199 @@ def get_telemetry_data(
         "X-Authorization": f"Bearer {authorization_token}"
     }
 
+    def send():
+        # Under a controller, 429/503 must reach the controller rather than be retried by the transport
+        session = get_session(throttle_aware=True) if controller is not None else get_session()
+        if authorization_token is None and auth_manager is not None:
+            return auth_manager.request(
+                "GET", endpoint, params=params, headers={"accept": "application/json"}, session=session
+            )
+        return session.get(endpoint, params=params, headers=headers)
+
     try:
-        response = requests.get(endpoint, params=params, headers=headers)
+        if controller is None:
+            response = send()
+        else:
+            # Throttled responses (429/503) are retried once the controller's
+            # Retry-After pause is over instead of being dropped
+            for attempt in range(controller.max_retries + 1):
+                with controller.slot():
+                    started = time.monotonic()
+                    try:
+                        response = send()
+                    except requests.exceptions.RequestException:
+                        controller.record(time.monotonic() - started, None)
+                        raise
+                controller.record(time.monotonic() - started, response.status_code, response.headers.get("Retry-After"))
+                if response.status_code not in THROTTLE_STATUS_CODES:
+                    break
         response.raise_for_status()  # Raises HTTPError if the request was unsuccessful
         return response.json()
     except requests.exceptions.RequestException as e:
         print(f"Error fetching telemetry data: {e}")
         return None
 
+def _split_time_range(startTs: int, endTs: int, shard_ms: int):
+    """
+    Split [startTs, endTs] into consecutive, non-overlapping inclusive shards.
+
+    Returns:
+        list: List of (shard_start, shard_end) tuples in ascending order.
+    """
+    if shard_ms <= 0:
+        raise ValueError("shard_ms must be positive")
+    shards = []
+    shard_start = startTs
+    while shard_start <= endTs:
+        shard_end = min(shard_start + shard_ms - 1, endTs)
+        shards.append((shard_start, shard_end))
+        shard_start = shard_end + 1
+    return shards
+
+
+def _fetch_shard(keys, shard_start: int, shard_end: int, limit: int, **kwargs):
+    """
+    Fetch one shard, re-querying every key that hits `limit` until it is complete.
+
+    Returns:
+        dict: Mapping of key to the list of {"ts", "value"} entries in the shard.
+
+    Raises:
+        RuntimeError: When a request for the shard fails.
+    """
+    results = {key: [] for key in keys}
+    # Keys still to fetch, mapped to the timestamp to resume from
+    cursors = {key: shard_start for key in keys}
+
+    while cursors:
+        # Keys that share a cursor can go out in the same request
+        groups = {}
+        for key, cursor in cursors.items():
+            groups.setdefault(cursor, []).append(key)
+
+        for cursor, group_keys in groups.items():
+            data = get_telemetry_data(
+                keys=",".join(group_keys),
+                limit=limit,
+                startTs=cursor,
+                endTs=shard_end,
+                orderBy="ASC",
+                **kwargs
+            )
+            if data is None:
+                raise RuntimeError(
+                    f"Failed to fetch keys {group_keys} in shard [{cursor}, {shard_end}]"
+                )
+
+            for key in group_keys:
+                values = data.get(key) or []
+                results[key].extend(values)
+                if len(values) >= limit and values[-1]['ts'] < shard_end:
+                    # Page is full: resume just after the last timestamp received
+                    # (a key holds one value per timestamp)
+                    cursors[key] = values[-1]['ts'] + 1
+                else:
+                    del cursors[key]
+
+    return results
+
+
+def get_telemetry_data_bulk(
+    entityType: str = "DEVICE",
+    entityId: str = "b57357f0-0934-11f0-ba3c-6989ae50b774",
+    keys: str = "ActiveEnergy_kWh",
+    startTs: int = None,
+    endTs: int = None,
+    shard_ms: int = 24 * 60 * 60 * 1000,
+    max_workers: int = 8,
+    limit: int = None,
+    **kwargs
+):
+    """
+    Fetch raw telemetry for a long time range in parallel, time-sharded requests.
+
+    The range [startTs, endTs] is split into shards of `shard_ms` milliseconds that
+    are fetched concurrently by a bounded thread pool. Any key that returns a full
+    page (`limit` points) is re-queried after its last timestamp until the shard is
+    complete, so results are never silently truncated.
+
+    Args:
+        entityType (str): Entity type, e.g., "DEVICE".
+        entityId (str): Entity ID.
+        keys (str): Telemetry keys to fetch, comma-separated.
+        startTs (int): Start timestamp (Unix, milliseconds). If None, defaults to 7 days ago.
+        endTs (int): End timestamp (Unix, milliseconds). If None, defaults to now.
+        shard_ms (int): Length of each shard in milliseconds.
+        max_workers (int): Maximum number of concurrent requests; the host's
+            AdaptiveConcurrencyController may run fewer at a time.
+        limit (int): Page size per request. If None, uses Config.DEFAULT_LIMIT.
+        **kwargs: Extra arguments forwarded to get_telemetry_data
+            (e.g. timeZone, useStrictDataTypes, authorization_token).
+
+    Returns:
+        dict: Same format as get_telemetry_data, with every key's entries merged
+            in ascending order; each point appears once.
+
+    Raises:
+        ValueError: When agg (other than "NONE") or orderBy is passed.
+        RuntimeError: When one or more shards could not be fetched.
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    if endTs is None:
+        endTs = int(datetime.datetime.now(datetime.timezone.utc).timestamp() * 1000)
+    if startTs is None:
+        startTs = int((datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=7)).timestamp() * 1000)
+    if limit is None:
+        limit = Config.DEFAULT_LIMIT
+
+    key_list = [key.strip() for key in keys.split(",") if key.strip()]
+    # Raw points only: server-side aggregation does not paginate, and pages are
+    # always requested in ascending order
+    if kwargs.get("agg") not in (None, "NONE"):
+        raise ValueError(f"get_telemetry_data_bulk fetches raw points only, got agg={kwargs['agg']!r}")
+    if "orderBy" in kwargs:
+        raise ValueError("get_telemetry_data_bulk always returns points in ascending order; do not pass orderBy")
+    kwargs.pop("agg", None)
+
+    # Bulk fetches share the host's adaptive limiter, so the effective concurrency
+    # follows the server's capacity rather than max_workers
+    kwargs.setdefault("controller", get_controller(Config.TELEMETRY_BASE_URL))
+
+    shards = _split_time_range(startTs, endTs, shard_ms)
+    shard_results = {}
+    failures = []
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(shards)))) as executor:
+        futures = {
+            executor.submit(
+                _fetch_shard, key_list, shard_start, shard_end, limit,
+                entityType=entityType, entityId=entityId, **kwargs
+            ): (shard_start, shard_end)
+            for shard_start, shard_end in shards
+        }
+        for future in as_completed(futures):
+            try:
+                shard_results[futures[future]] = future.result()
+            except Exception as e:
+                failures.append((futures[future], str(e)))
+
+    if failures:
+        failed = ", ".join(f"[{s}, {e}]: {msg}" for (s, e), msg in sorted(failures))
+        raise RuntimeError(f"Failed to fetch {len(failures)} of {len(shards)} shards: {failed}")
+
+    # Concatenate shards in order; skip a point whose timestamp was already taken
+    # in case the server treats both ends of a shard as inclusive
+    merged = {key: [] for key in key_list}
+    for shard in sorted(shard_results):
+        for key, values in shard_results[shard].items():
+            received = merged[key]
+            for entry in values:
+                if not received or entry['ts'] > received[-1]['ts']:
+                    received.append(entry)
+    return merged
+
+
 # # Example usage (optional, for testing)
 if __name__ == "__main__":
     data = get_telemetry_data()
@@ -0,0 +1,169 @@
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import Config
+from instrumentation import metrics
+from rate_limit import THROTTLE_STATUS_CODES
+
+# Only transient server-side failures are retried; 4xx errors are returned as-is
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+# Under an AdaptiveConcurrencyController throttling responses must reach the
+# controller: retrying them here would hide the signal and inflate its latencies
+CONTROLLED_RETRY_STATUS_CODES = tuple(code for code in RETRY_STATUS_CODES if code not in THROTTLE_STATUS_CODES)
+
+
+def _response_size(response, stream):
+    """
+    Body size for metrics without consuming a streamed body
+
+    Content-Length (bytes on the wire) when sent; otherwise the decoded body
+    of a non-streamed response, which requests has already read. Streamed
+    responses without Content-Length count as 0.
+    """
+    length = response.headers.get('Content-Length')
+    if length is not None and length.isdigit():
+        return int(length)
+    return 0 if stream else len(response.content)
+
+
+class TimeoutSession(requests.Session):
+    """requests.Session that applies a default timeout to every request"""
+
+    def __init__(self, timeout=None):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        if not metrics.enabled:
+            return super().request(method, url, **kwargs)
+
+        started = time.perf_counter()
+        try:
+            response = super().request(method, url, **kwargs)
+        except requests.exceptions.RequestException:
+            metrics.record_http(method, url, None, time.perf_counter() - started)
+            raise
+        retries = getattr(getattr(response.raw, 'retries', None), 'history', ())
+        metrics.record_http(
+            method, url, response.status_code, time.perf_counter() - started,
+            nbytes=_response_size(response, kwargs.get('stream', False)), retries=len(retries)
+        )
+        return response
+
+
+class _TransportRetry(Retry):
+    """Retry that leaves 429 responses to the caller"""
+    # urllib3 otherwise retries any 429 carrying Retry-After by itself, which
+    # hides throttling from the per-host concurrency controller
+    RETRY_AFTER_STATUS_CODES = Retry.RETRY_AFTER_STATUS_CODES - {429}
+
+
+class _ControlledRetry(_TransportRetry):
+    """Retry that leaves every throttling response (429/503) to the caller"""
+    RETRY_AFTER_STATUS_CODES = Retry.RETRY_AFTER_STATUS_CODES - set(THROTTLE_STATUS_CODES)
+
+
+def _build_retry(max_retries: int, backoff_factor: float, backoff_jitter: float, status_codes=RETRY_STATUS_CODES) -> Retry:
+    options = dict(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=status_codes,
+        # Idempotent methods only (GET, HEAD, PUT, DELETE, OPTIONS, TRACE)
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    # A 503 carrying Retry-After would otherwise still be retried by urllib3
+    retry_class = _TransportRetry if set(THROTTLE_STATUS_CODES) & set(status_codes) else _ControlledRetry
+    try:
+        return retry_class(backoff_jitter=backoff_jitter, **options)
+    except TypeError:
+        # urllib3 < 2.0 has no jitter support
+        return retry_class(**options)
+
+
+def create_session(
+    pool_size: int = None,
+    connect_timeout: float = None,
+    read_timeout: float = None,
+    max_retries: int = None,
+    backoff_factor: float = None,
+    backoff_jitter: float = None,
+    retry_status_codes=RETRY_STATUS_CODES
+) -> TimeoutSession:
+    """
+    Create a keep-alive HTTP session with connection pooling and retries
+
+    Args:
+        pool_size: Maximum pooled connections per host. If None, uses Config.HTTP_POOL_SIZE.
+        connect_timeout: Connect timeout in seconds. If None, uses Config.HTTP_CONNECT_TIMEOUT.
+        read_timeout: Read timeout in seconds. If None, uses Config.HTTP_READ_TIMEOUT.
+        max_retries: Retries for idempotent requests. If None, uses Config.HTTP_MAX_RETRIES.
+        backoff_factor: Exponential backoff base in seconds. If None, uses Config.HTTP_BACKOFF_FACTOR.
+        backoff_jitter: Random jitter added to each backoff. If None, uses Config.HTTP_BACKOFF_JITTER.
+        retry_status_codes: Response statuses retried by the transport.
+
+    Returns:
+        TimeoutSession: Configured session
+    """
+    pool_size = pool_size or Config.HTTP_POOL_SIZE
+    connect_timeout = connect_timeout if connect_timeout is not None else Config.HTTP_CONNECT_TIMEOUT
+    read_timeout = read_timeout if read_timeout is not None else Config.HTTP_READ_TIMEOUT
+    max_retries = max_retries if max_retries is not None else Config.HTTP_MAX_RETRIES
+    backoff_factor = backoff_factor if backoff_factor is not None else Config.HTTP_BACKOFF_FACTOR
+    backoff_jitter = backoff_jitter if backoff_jitter is not None else Config.HTTP_BACKOFF_JITTER
+
+    session = TimeoutSession(timeout=(connect_timeout, read_timeout))
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=_build_retry(max_retries, backoff_factor, backoff_jitter, retry_status_codes),
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    # Ask for compressed responses; requests decodes gzip/deflate transparently
+    session.headers['Accept-Encoding'] = 'gzip, deflate'
+    return session
+
+
+# Shared sessions, keyed by whether throttling responses are left to a controller
+_sessions = {}
+_session_lock = threading.Lock()
+
+
+def get_session(throttle_aware: bool = False) -> TimeoutSession:
+    """
+    Get a process-wide shared session, creating it on first use
+
+    The session is safe to share between threads. Worker processes must not
+    reuse a session inherited from their parent; call reset_session() after fork.
+
+    Args:
+        throttle_aware: Get the session for requests paced by an
+            AdaptiveConcurrencyController, whose transport does not retry
+            throttling responses (429/503) so that the controller sees them
+    """
+    session = _sessions.get(throttle_aware)
+    if session is None:
+        with _session_lock:
+            session = _sessions.get(throttle_aware)
+            if session is None:
+                codes = CONTROLLED_RETRY_STATUS_CODES if throttle_aware else RETRY_STATUS_CODES
+                session = _sessions[throttle_aware] = create_session(retry_status_codes=codes)
+    return session
+
+
+def reset_session():
+    """Close the shared sessions so the next get_session() builds new ones"""
+    with _session_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
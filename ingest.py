@@ -0,0 +1,201 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+TIMESTAMP_COLUMN = 'Timestamp'
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+# ThingsBoard exports repeat the entity name on every row; it is never needed downstream
+ENTITY_NAME_COLUMN = 'Entity Name'
+CACHE_SUFFIX = '.cache.npz'
+
+
+def _read_header(filepath, sep):
+    with open(filepath, 'r', encoding='utf-8-sig') as f:
+        return f.readline().rstrip('\r\n').split(sep)
+
+
+def _resolve_engine(engine, chunksize):
+    if engine != 'pyarrow':
+        return engine or 'c'
+    if chunksize is not None:
+        # The pyarrow engine cannot read in chunks
+        return 'c'
+    try:
+        import pyarrow  # noqa: F401
+        return 'pyarrow'
+    except ImportError:
+        print("⚠ pyarrow not installed, falling back to the C parser")
+        return 'c'
+
+
+def _csv_options(filepath, value_columns, sep):
+    header = _read_header(filepath, sep)
+    if TIMESTAMP_COLUMN not in header:
+        raise ValueError(f"Column '{TIMESTAMP_COLUMN}' not found in {filepath}")
+    if value_columns is None:
+        value_columns = [col for col in header if col not in (TIMESTAMP_COLUMN, ENTITY_NAME_COLUMN)]
+    missing = [col for col in value_columns if col not in header]
+    if missing:
+        raise ValueError(f"Columns {missing} not found in {filepath}")
+    return list(value_columns), {
+        'sep': sep,
+        'usecols': [TIMESTAMP_COLUMN] + list(value_columns),
+        'dtype': {col: np.float64 for col in value_columns} | {TIMESTAMP_COLUMN: str},
+    }
+
+
+def _frame_from_chunk(chunk, value_columns, timestamp_format):
+    index = pd.to_datetime(chunk[TIMESTAMP_COLUMN], format=timestamp_format)
+    return pd.DataFrame(
+        chunk[value_columns].to_numpy(dtype=np.float64),
+        index=pd.DatetimeIndex(index, name=TIMESTAMP_COLUMN),
+        columns=value_columns
+    )
+
+
+def iter_power_csv_chunks(filepath, chunksize=1_000_000, value_columns=None, sep=';', timestamp_format=TIMESTAMP_FORMAT):
+    """
+    Stream a ThingsBoard CSV export as DataFrames of at most `chunksize` rows
+
+    Yields:
+        pd.DataFrame: Timestamp-indexed float64 frame with only the value columns
+    """
+    value_columns, options = _csv_options(filepath, value_columns, sep)
+    for chunk in pd.read_csv(filepath, chunksize=chunksize, engine='c', **options):
+        yield _frame_from_chunk(chunk, value_columns, timestamp_format)
+
+
+def _cache_signature(filepath, value_columns, timestamp_format):
+    stat = os.stat(filepath)
+    return json.dumps({
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'columns': value_columns,
+        'timestamp_format': timestamp_format,
+    }, sort_keys=True)
+
+
+def _load_cache(cache_path, signature):
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with np.load(cache_path, allow_pickle=False) as cached:
+            if str(cached['signature']) != signature:
+                return None
+            index = pd.DatetimeIndex(cached['index'].astype('datetime64[ns]'), name=TIMESTAMP_COLUMN)
+            return pd.DataFrame(cached['values'], index=index, columns=list(cached['columns']))
+    except (OSError, KeyError, ValueError) as e:
+        print(f"⚠ Ignoring unreadable cache {cache_path}: {e}")
+        return None
+
+
+def _save_cache(cache_path, signature, df):
+    tmp_path = f"{cache_path}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                signature=np.array(signature),
+                index=df.index.as_unit('ns').asi8,
+                values=df.to_numpy(dtype=np.float64),
+                columns=np.array(list(df.columns), dtype=str),
+            )
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"⚠ Could not write cache {cache_path}: {e}")
+
+
+def read_power_csv(
+    filepath,
+    value_columns=None,
+    sep=';',
+    timestamp_format=TIMESTAMP_FORMAT,
+    engine=None,
+    chunksize=None,
+    cache=True
+):
+    """
+    Read a ThingsBoard CSV export with an explicit schema
+
+    Only the Timestamp and value columns are parsed (values as float64, the
+    timestamp with a fixed format). With cache=True a sidecar binary cache
+    (`<file>.cache.npz`) is written and re-read instead of the CSV as long as the
+    source file's size and mtime are unchanged.
+
+    Args:
+        filepath: Path of the CSV export
+        value_columns: Numeric columns to keep. If None, every column except
+            Timestamp and Entity Name
+        sep: Field separator
+        timestamp_format: strftime format of the Timestamp column
+        engine: pandas parser engine; 'pyarrow' is used when installed
+        chunksize: Parse the file in chunks of this many rows. This bounds the
+            parser's memory, but the returned frame still holds every row; use
+            resample_power_csv or iter_power_csv_chunks for files larger than memory
+        cache: Read and write the sidecar binary cache
+
+    Returns:
+        pd.DataFrame: Timestamp-indexed frame with float64 value columns
+    """
+    value_columns, options = _csv_options(filepath, value_columns, sep)
+
+    cache_path = f"{filepath}{CACHE_SUFFIX}"
+    signature = _cache_signature(filepath, value_columns, timestamp_format)
+    if cache:
+        cached = _load_cache(cache_path, signature)
+        if cached is not None:
+            return cached
+
+    engine = _resolve_engine(engine, chunksize)
+    if chunksize is None:
+        df = _frame_from_chunk(pd.read_csv(filepath, engine=engine, **options), value_columns, timestamp_format)
+    else:
+        # Keep only compact per-chunk arrays; the raw text chunks are dropped as we go
+        index_parts, value_parts = [], []
+        for frame in iter_power_csv_chunks(filepath, chunksize, value_columns, sep, timestamp_format):
+            index_parts.append(frame.index.as_unit('ns').asi8)
+            value_parts.append(frame.to_numpy())
+        index = np.concatenate(index_parts) if index_parts else np.empty(0, dtype=np.int64)
+        values = np.concatenate(value_parts) if value_parts else np.empty((0, len(value_columns)))
+        df = pd.DataFrame(
+            values,
+            index=pd.DatetimeIndex(index.astype('datetime64[ns]'), name=TIMESTAMP_COLUMN),
+            columns=value_columns
+        )
+
+    if cache:
+        _save_cache(cache_path, signature, df)
+    return df
+
+
+def resample_power_csv(filepath, rule='1h', how='mean', chunksize=1_000_000, **csv_options):
+    """
+    Resample a CSV export chunk by chunk, without ever holding all raw rows
+
+    Each chunk is folded into a resampler.StreamingResampler and dropped; only
+    the (much smaller) resampled buckets are kept, so the export may be larger
+    than memory as long as its resampled form is not.
+
+    Args:
+        filepath: Path of the CSV export
+        rule: Fixed-frequency resampling rule, e.g. '1h'
+        how: Aggregation (see resampler.AGGREGATIONS) or a {column: how} dict
+        chunksize: Rows per parsed chunk
+        **csv_options: Forwarded to iter_power_csv_chunks (value_columns, sep, timestamp_format)
+
+    Returns:
+        pd.DataFrame: Resampled frame, as resample_power_data would return it
+    """
+    from resampler import resample_stream
+
+    value_columns, _ = _csv_options(filepath, csv_options.get('value_columns'), csv_options.get('sep', ';'))
+    parts = list(resample_stream(
+        iter_power_csv_chunks(filepath, chunksize=chunksize, **csv_options), rule=rule, how=how, columns=value_columns
+    ))
+    if not parts:
+        return pd.DataFrame(columns=value_columns, index=pd.DatetimeIndex([], name=TIMESTAMP_COLUMN), dtype=np.float64)
+    resampled = pd.concat(parts)
+    resampled.index.name = TIMESTAMP_COLUMN
+    return resampled
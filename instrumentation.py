@@ -0,0 +1,272 @@
+import bisect
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from config import Config
+
+# Upper bounds (seconds) of the HTTP latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+
+
+class _NoOpStage:
+    """Stand-in returned by stage() when instrumentation is disabled"""
+    rows = None
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NOOP_STAGE = _NoOpStage()
+
+
+class StageRecord:
+    """Measurements of one run of a pipeline stage"""
+
+    def __init__(self, name: str, rows: Optional[int] = None):
+        self.name = name
+        self.rows = rows
+        self.wall_time = None
+        self.peak_rss_bytes = None
+        self.rss_delta_bytes = None
+        self.peak_traced_bytes = None
+
+    def to_dict(self) -> Dict:
+        return dict(self.__dict__)
+
+
+def _current_rss() -> Optional[int]:
+    """Resident set size of this process in bytes (Linux), or None"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _peak_rss() -> Optional[int]:
+    """Peak resident set size of this process in bytes, or None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak if os.uname().sysname == 'Darwin' else peak * 1024
+
+
+class Instrumentation:
+    """
+    Lightweight registry of pipeline-stage and HTTP measurements
+
+    When disabled, stage() returns a shared no-op context manager and
+    record_http()/increment() return immediately, so instrumented code costs a
+    single attribute check. Enable it with PIPELINE_METRICS=1 or enable().
+    """
+
+    def __init__(self, enabled: Optional[bool] = False, trace_allocations: bool = False):
+        """
+        Initialize the registry
+
+        Args:
+            enabled: Start collecting immediately. None follows Config.PIPELINE_METRICS,
+                read on first use rather than at import
+            trace_allocations: Also record the peak of Python/NumPy allocations per
+                stage with tracemalloc (adds noticeable overhead)
+        """
+        self.enabled = enabled
+        self.trace_allocations = trace_allocations
+        self._lock = threading.Lock()
+        self.reset()
+
+    @property
+    def enabled(self) -> bool:
+        if self._enabled is None:
+            self._enabled = bool(Config.PIPELINE_METRICS)
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value: Optional[bool]):
+        self._enabled = value
+
+    def enable(self, trace_allocations: bool = None):
+        if trace_allocations is not None:
+            self.trace_allocations = trace_allocations
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        """Drop every measurement collected so far"""
+        with self._lock:
+            self.stages = []
+            self.counters = {}
+            self.http = {}
+
+    def stage(self, name: str, rows: Optional[int] = None):
+        """
+        Time a pipeline stage
+
+        Usage:
+            with metrics.stage('resample') as record:
+                df = resample_power_data(df)
+                record.rows = len(df)
+        """
+        if not self.enabled:
+            return nullcontext(_NOOP_STAGE)
+        return self._measure_stage(name, rows)
+
+    @contextmanager
+    def _measure_stage(self, name, rows):
+        record = StageRecord(name, rows)
+        tracing = self.trace_allocations
+        started_tracing = False
+        if tracing:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+        rss_before = _current_rss()
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.wall_time = time.perf_counter() - started
+            rss_after = _current_rss()
+            if rss_before is not None and rss_after is not None:
+                record.rss_delta_bytes = rss_after - rss_before
+            record.peak_rss_bytes = _peak_rss()
+            if tracing:
+                record.peak_traced_bytes = tracemalloc.get_traced_memory()[1]
+                if started_tracing:
+                    tracemalloc.stop()
+            with self._lock:
+                self.stages.append(record)
+
+    def increment(self, name: str, value: float = 1):
+        """Add to a named counter (e.g. 'auth_logins')"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def record_http(self, method: str, url: str, status: Optional[int], latency: float, nbytes: int = 0, retries: int = 0):
+        """
+        Record one HTTP call
+
+        Args:
+            method: HTTP method
+            url: Request URL (only the host is kept)
+            status: HTTP status, or None for a connection error
+            latency: Seconds from sending the request to receiving the response
+            nbytes: Size of the response body (Content-Length when available)
+            retries: Retries performed by the transport for this call
+        """
+        if not self.enabled:
+            return
+        host = urlsplit(url).netloc
+        key = (method.upper(), host)
+        with self._lock:
+            entry = self.http.get(key)
+            if entry is None:
+                entry = self.http[key] = {
+                    'count': 0,
+                    'latency_sum': 0.0,
+                    'latency_buckets': [0] * len(LATENCY_BUCKETS),
+                    'bytes': 0,
+                    'retries': 0,
+                    'status': {},
+                }
+            entry['count'] += 1
+            entry['latency_sum'] += latency
+            entry['latency_buckets'][bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+            entry['bytes'] += nbytes
+            entry['retries'] += retries
+            status_key = str(status) if status is not None else 'error'
+            entry['status'][status_key] = entry['status'].get(status_key, 0) + 1
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                'stages': [record.to_dict() for record in self.stages],
+                'counters': dict(self.counters),
+                'http': [
+                    {'method': method, 'host': host, **entry,
+                     'latency_buckets': dict(zip([str(b) for b in LATENCY_BUCKETS], entry['latency_buckets']))}
+                    for (method, host), entry in self.http.items()
+                ],
+            }
+
+    def to_json(self, path: str = None) -> str:
+        """Serialize all measurements as JSON, optionally writing them to `path`"""
+        text = json.dumps(self.to_dict(), indent=2)
+        if path is not None:
+            with open(path, 'w') as f:
+                f.write(text)
+        return text
+
+    def to_prometheus(self) -> str:
+        """Render all measurements in the Prometheus text exposition format"""
+        lines = []
+        data = self.to_dict()
+
+        def add(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+
+        def labels(**values):
+            inner = ",".join(f'{k}="{str(v).replace(chr(34), chr(39))}"' for k, v in values.items())
+            return "{" + inner + "}"
+
+        stage_totals = {}
+        for record in data['stages']:
+            totals = stage_totals.setdefault(record['name'], {'seconds': 0.0, 'rows': 0, 'runs': 0, 'peak_rss': 0})
+            totals['seconds'] += record['wall_time'] or 0.0
+            totals['rows'] += record['rows'] or 0
+            totals['runs'] += 1
+            totals['peak_rss'] = max(totals['peak_rss'], record['peak_rss_bytes'] or 0)
+        if stage_totals:
+            add('pipeline_stage_seconds_total', 'counter', 'Wall time spent in each pipeline stage',
+                [f"pipeline_stage_seconds_total{labels(stage=n)} {t['seconds']}" for n, t in stage_totals.items()])
+            add('pipeline_stage_rows_total', 'counter', 'Rows processed by each pipeline stage',
+                [f"pipeline_stage_rows_total{labels(stage=n)} {t['rows']}" for n, t in stage_totals.items()])
+            add('pipeline_stage_runs_total', 'counter', 'Runs of each pipeline stage',
+                [f"pipeline_stage_runs_total{labels(stage=n)} {t['runs']}" for n, t in stage_totals.items()])
+            add('pipeline_stage_peak_rss_bytes', 'gauge', 'Peak process RSS observed after each stage',
+                [f"pipeline_stage_peak_rss_bytes{labels(stage=n)} {t['peak_rss']}" for n, t in stage_totals.items()])
+
+        for name, value in data['counters'].items():
+            add(f"pipeline_{name}_total", 'counter', f"Counter {name}", [f"pipeline_{name}_total {value}"])
+
+        if data['http']:
+            samples = []
+            for entry in data['http']:
+                base = {'method': entry['method'], 'host': entry['host']}
+                cumulative = 0
+                for bound, count in entry['latency_buckets'].items():
+                    cumulative += count
+                    le = '+Inf' if bound == 'inf' else bound
+                    samples.append(f"http_request_duration_seconds_bucket{labels(**base, le=le)} {cumulative}")
+                samples.append(f"http_request_duration_seconds_sum{labels(**base)} {entry['latency_sum']}")
+                samples.append(f"http_request_duration_seconds_count{labels(**base)} {entry['count']}")
+            add('http_request_duration_seconds', 'histogram', 'HTTP request latency', samples)
+            add('http_response_bytes_total', 'counter', 'HTTP response payload bytes',
+                [f"http_response_bytes_total{labels(method=e['method'], host=e['host'])} {e['bytes']}" for e in data['http']])
+            add('http_retries_total', 'counter', 'HTTP retries performed by the transport',
+                [f"http_retries_total{labels(method=e['method'], host=e['host'])} {e['retries']}" for e in data['http']])
+            add('http_responses_total', 'counter', 'HTTP responses by status',
+                [f"http_responses_total{labels(method=e['method'], host=e['host'], status=s)} {c}"
+                 for e in data['http'] for s, c in e['status'].items()])
+
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry used by the pipeline, the HTTP client and AuthManager
+metrics = Instrumentation(enabled=None)
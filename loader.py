@@ -0,0 +1,228 @@
+import queue
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+LoaderBatch = namedtuple('LoaderBatch', ['X', 'X_ori', 'missing_mask', 'indicating_mask', 'index'])
+LoaderBatch.__doc__ = """
+One mini-batch of windows
+
+X: (batch, window, features) windows; NaN where missing (including injected gaps)
+X_ori: Windows before missingness injection (None without injection)
+missing_mask: True where X is observed (None with mask=False)
+indicating_mask: True where a value was artificially removed (None without injection)
+index: Sample indices of the batch (window starts, or rows of the window tensor)
+"""
+
+_DONE = object()
+
+
+class WindowLoader:
+    """
+    Shuffled mini-batches of sliding windows, prefetched on a background thread
+
+    Windows are gathered with one vectorized np.take per batch, either from the
+    resampled series and a list of window starts (overlapping windows are never
+    materialized) or from a saved window tensor, which may be a read-only
+    memory map from outputs.load_windows. Batches are written into a small ring
+    of preallocated buffers that is reused across batches and epochs.
+
+    Like WindowBatcher, a yielded batch is only valid until the next one is
+    requested; copy it to keep it.
+
+    Usage:
+        index = build_window_index(resampled, 168, max_missing_frac=0.5)
+        loader = WindowLoader(resampled.to_numpy(), 168, starts=index.starts,
+                              batch_size=64, missing_rate=0.1, seed=0)
+        for epoch in range(n_epochs):
+            for batch in loader:
+                train_step(batch.X, batch.X_ori, batch.indicating_mask)
+    """
+
+    def __init__(
+        self,
+        data,
+        window_len=None,
+        starts=None,
+        batch_size=64,
+        shuffle=True,
+        drop_last=False,
+        dtype=np.float32,
+        prefetch=2,
+        mask=True,
+        missing_rate=0.0,
+        scaler=None,
+        seed=None
+    ):
+        """
+        Initialize the loader
+
+        Args:
+            data: (Time, Features) series when window_len is given, otherwise a
+                (samples, window, features) tensor (np.ndarray or np.memmap)
+            window_len: Window length; None means `data` already holds windows
+            starts: Window starts into the series (e.g. gaps.valid_window_starts).
+                If None, every possible start is used
+            batch_size: Windows per batch
+            shuffle: Reshuffle the sample order at the start of every epoch
+            drop_last: Skip the last, smaller batch
+            dtype: dtype of the batches
+            prefetch: Batches prepared ahead of the consumer; 0 disables the thread
+            mask: Also yield missing_mask (True = observed)
+            missing_rate: Fraction of observed values removed at random (MCAR) in
+                every batch, for imputation training; the originals go to X_ori
+            scaler: Optional fitted scaler.StreamingScaler applied to every batch
+            seed: Seed of the shuffling and the missingness injection
+        """
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        if not 0.0 <= missing_rate < 1.0:
+            raise ValueError("missing_rate must be in [0, 1)")
+
+        if window_len is None:
+            self._source = data if isinstance(data, np.ndarray) else np.asarray(data)
+            if self._source.ndim != 3:
+                raise ValueError(f"Expected a (samples, window, features) tensor, got shape {self._source.shape}")
+            self.window_len = self._source.shape[1]
+            self.index = np.arange(len(self._source)) if starts is None else np.asarray(starts, dtype=np.int64)
+            self._offsets = None
+        else:
+            series = data.to_numpy() if hasattr(data, 'to_numpy') else np.asarray(data)
+            self._source = series[:, None] if series.ndim == 1 else series
+            self.window_len = window_len
+            n_starts = len(self._source) - window_len + 1
+            if n_starts <= 0:
+                raise ValueError("數據長度小於窗口長度，無法切分！")
+            self.index = np.arange(n_starts) if starts is None else np.asarray(starts, dtype=np.int64)
+            self._offsets = np.arange(window_len)
+
+        self.n_features = self._source.shape[-1]
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.dtype = np.dtype(dtype)
+        self.prefetch = prefetch
+        self.mask = mask
+        self.missing_rate = missing_rate
+        self.scaler = scaler
+        self.seed = seed
+        self.epoch = 0
+
+    @property
+    def n_samples(self):
+        return len(self.index)
+
+    def __len__(self):
+        """Number of batches per epoch"""
+        if self.drop_last:
+            return self.n_samples // self.batch_size
+        return -(-self.n_samples // self.batch_size)
+
+    def _new_slot(self):
+        shape = (self.batch_size, self.window_len, self.n_features)
+        inject = self.missing_rate > 0
+        return {
+            'X': np.empty(shape, dtype=self.dtype),
+            'gather': None if self._source.dtype == self.dtype else np.empty(shape, dtype=self._source.dtype),
+            'X_ori': np.empty(shape, dtype=self.dtype) if inject else None,
+            'missing_mask': np.empty(shape, dtype=bool) if self.mask or inject else None,
+            'indicating_mask': np.empty(shape, dtype=bool) if inject else None,
+            'noise': np.empty(shape, dtype=np.float32) if inject else None,
+        }
+
+    def _fill(self, slot, sample_index, rng):
+        n = len(sample_index)
+        X = slot['X'][:n]
+        # np.take can only write into a buffer of the source dtype
+        target = X if slot['gather'] is None else slot['gather'][:n]
+        # Sorted reads keep a memory-mapped source's page accesses sequential
+        sample_index = np.sort(sample_index)
+        if self._offsets is None:
+            np.take(self._source, sample_index, axis=0, out=target)
+        else:
+            np.take(self._source, sample_index[:, None] + self._offsets, axis=0, out=target)
+        if target is not X:
+            np.copyto(X, target, casting='unsafe')
+        if self.scaler is not None:
+            self.scaler.transform(X, copy=False)
+
+        missing_mask = indicating_mask = X_ori = None
+        if slot['missing_mask'] is not None:
+            missing_mask = slot['missing_mask'][:n]
+            np.isnan(X, out=missing_mask)
+            np.logical_not(missing_mask, out=missing_mask)
+        if self.missing_rate > 0:
+            X_ori = slot['X_ori'][:n]
+            np.copyto(X_ori, X)
+            indicating_mask = slot['indicating_mask'][:n]
+            noise = rng.random(dtype=np.float32, out=slot['noise'][:n])
+            np.less(noise, self.missing_rate, out=indicating_mask)
+            np.logical_and(indicating_mask, missing_mask, out=indicating_mask)
+            np.copyto(X, np.nan, where=indicating_mask)
+            missing_mask &= ~indicating_mask
+            if not self.mask:
+                missing_mask = None
+        return LoaderBatch(X, X_ori, missing_mask, indicating_mask, sample_index)
+
+    def _batches(self, epoch):
+        """Yield (sample_index, rng) per batch of one epoch"""
+        seed = None if self.seed is None else (self.seed, epoch)
+        rng = np.random.default_rng(seed)
+        order = rng.permutation(self.index) if self.shuffle else self.index
+        stop = len(self) * self.batch_size if self.drop_last else self.n_samples
+        for start in range(0, stop, self.batch_size):
+            yield order[start:start + self.batch_size], rng
+
+    def __iter__(self):
+        epoch = self.epoch
+        self.epoch += 1
+        if self.prefetch <= 0:
+            slot = self._new_slot()
+            for sample_index, rng in self._batches(epoch):
+                yield self._fill(slot, sample_index, rng)
+            return
+        yield from self._prefetched(epoch)
+
+    def _prefetched(self, epoch):
+        # prefetch batches may wait in the queue while the producer fills one more
+        # and the consumer holds one, so prefetch + 2 buffers are never overwritten early
+        slots = [self._new_slot() for _ in range(self.prefetch + 2)]
+        ready = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+
+        def produce():
+            try:
+                for i, (sample_index, rng) in enumerate(self._batches(epoch)):
+                    batch = self._fill(slots[i % len(slots)], sample_index, rng)
+                    while not stop.is_set():
+                        try:
+                            ready.put(batch, timeout=0.1)
+                            break
+                        except queue.Full:
+                            continue
+                    if stop.is_set():
+                        return
+                ready.put(_DONE)
+            except BaseException as e:
+                ready.put(e)
+
+        thread = threading.Thread(target=produce, name='window-loader', daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = ready.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            # Unblock a producer waiting on a full queue, then wait for it to exit
+            while thread.is_alive():
+                try:
+                    ready.get(timeout=0.05)
+                except queue.Empty:
+                    pass
+            thread.join()
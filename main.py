@@ -1,76 +1,160 @@
-import pandas as pd
-import numpy as np
 import os
-import getTelemetry
+from config import Config
+from instrumentation import metrics
 
-def read_power_usage_data(filepath):
+# pandas/numpy 與各處理模組在函式內才載入，讓 import main 保持輕量（例如 worker 行程）
+
+def read_power_usage_data(filepath, fast=False, verbose=True, **fast_options):
+    """
+    Read a ThingsBoard CSV export indexed by Timestamp
+
+    With fast=True the export is read through ingest.read_power_csv: explicit
+    float64 schema, only the value columns, fixed timestamp format, optional
+    pyarrow engine / chunked reading, and a sidecar binary cache. Extra keyword
+    arguments are forwarded to it.
+    """
     if not os.path.exists(filepath):
         print(f"Error: File not found at {filepath}")
         return None
     
+    import pandas as pd
+    from ingest import read_power_csv
+
     try:
-        df = pd.read_csv(filepath, sep=';', parse_dates=['Timestamp'])
-        df.set_index('Timestamp', inplace=True)
-        print("Successfully read data:")
-        print(df.head()) # Print first 5 rows to verify
+        with metrics.stage('read_csv') as record:
+            if fast:
+                df = read_power_csv(filepath, **fast_options)
+            else:
+                df = pd.read_csv(filepath, sep=';', parse_dates=['Timestamp'])
+                df.set_index('Timestamp', inplace=True)
+            record.rows = len(df)
+        if verbose:
+            print("Successfully read data:")
+            print(df.head()) # Print first 5 rows to verify
         return df
     except Exception as e:
         print(f"Error reading CSV file: {e}")
         return None
 
-def resample_power_data(df, rule='1h'):
+def resample_power_data(df, rule='1h', columns=None, how='mean'):
+    """
+    Resample the numeric columns of df to `rule` with the `how` aggregation
+
+    For data that arrives in pieces (CSV chunks, live telemetry) use
+    resampler.StreamingResampler, which only updates the affected buckets.
+    """
+    from resampler import AGGREGATIONS
+
     print(f"\nResampling data to {rule} frequency...")
-    # Select only the numeric column 'Total_Power_Usage_17/F' for resampling
-    resampled_df = df['Total_Power_Usage_17/F'].resample(rule).mean().to_frame()
+    if columns is None:
+        columns = list(df.select_dtypes('number').columns)
+    elif isinstance(columns, str):
+        columns = [columns]
+    if how not in AGGREGATIONS:
+        raise ValueError(f"Unknown aggregation '{how}', expected one of {AGGREGATIONS}")
+    with metrics.stage('resample', rows=len(df)):
+        resampled_df = getattr(df[columns].resample(rule), how)()
     # print("Resampled data head:")
     # print(resampled_df.head())
     return resampled_df
 
 def save_data_to_csv(df, output_filepath):
+    from outputs import save_frame
+
     print(f"\nSaving data to {output_filepath}...")
-    output_dir = os.path.dirname(output_filepath)
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
     try:
-        df.to_csv(output_filepath)
+        # Written to a temporary file first, so readers never see a partial CSV
+        with metrics.stage('save_csv', rows=len(df)):
+            save_frame(df, output_filepath, fmt='csv')
         # print("Data saved successfully.")
     except Exception as e:
         print(f"Error saving data to CSV: {e}")
 
-def create_sliding_windows(data, window_len):
+def save_data(df, output_filepath):
+    """
+    Save a resampled frame; the format (.parquet/.feather/.csv) follows the extension
+    """
+    from outputs import save_frame
+
+    print(f"\nSaving data to {output_filepath}...")
+    try:
+        with metrics.stage('save', rows=len(df)):
+            save_frame(df, output_filepath)
+    except Exception as e:
+        print(f"Error saving data: {e}")
+
+def save_window_tensor(X, output_filepath, save_mask=True):
+    """
+    Save the 3D window tensor (.npy memmap or .h5) with its missing-value mask
+    """
+    from outputs import save_windows
+
+    print(f"\nSaving windows {X.shape} to {output_filepath}...")
+    try:
+        with metrics.stage('save_windows', rows=len(X)):
+            save_windows(X, output_filepath, save_mask=save_mask)
+    except Exception as e:
+        print(f"Error saving window tensor: {e}")
+
+def create_sliding_windows(data, window_len, step=1, dtype='float64', copy=False, starts=None):
     """
     將 2D 數據 (Time, Features) 轉換為 3D (Samples, Window, Features)
+
+    預設回傳唯讀的 stride view（不複製資料）；需要可寫入的獨立陣列時請設定 copy=True。
+    大型資料請改用 windowing.WindowBatcher 分批取得窗口。
+    starts 可傳入 gaps.valid_window_starts 的結果，只取出可用的窗口；此時一律回傳複本
+    （copy 參數無作用），且不可與 step != 1 併用。
     """
-    n_steps = len(data)
-    n_features = data.shape[1]
-    
-    # 計算可以切出多少個樣本
+    import numpy as np
+    from windowing import sliding_windows_view
+
+    if starts is not None and step != 1:
+        raise ValueError("step 與 starts 不可同時指定：starts 已決定要取出的窗口")
     # 如果數據長度是 100，窗口是 96，我們只能切出 (100 - 96 + 1) = 5 個樣本
-    n_samples = n_steps - window_len + 1
-    
-    if n_samples <= 0:
-        raise ValueError("數據長度小於窗口長度，無法切分！")
-    
-    # 初始化 3D 陣列
-    X = np.zeros((n_samples, window_len, n_features))
-    
-    # 填入數據 (這裡使用最簡單的迴圈，Numpy 有更進階的 stride_tricks 但較難懂)
-    for i in range(n_samples):
-        X[i] = data[i : i + window_len]
-        
+    with metrics.stage('window', rows=len(data)):
+        X = sliding_windows_view(data, window_len, dtype=dtype)
+        if starts is not None:
+            return X[np.asarray(starts, dtype=np.int64)]
+        X = X[::step]
+        if copy:
+            X = X.copy()
     return X
 
 if __name__ == "__main__":
+    from gaps import build_window_index
+    from stage_cache import StageCache, stage_key
+
+    # 設定在 import 時不會驗證，執行管線前明確檢查
+    Config.validate_config()
+
     csv_filepath = 'data/total-power-usage-17F.csv'
-    power_data = read_power_usage_data(csv_filepath)
-    
+    RULE = '1h'
 
-    if power_data is not None:
+    # 以輸入檔內容與參數的雜湊作為快取鍵；輸入與參數未變時直接重用重採樣結果
+    cache = StageCache()
+    resample_key = None
+    if os.path.exists(csv_filepath):
+        resample_key = stage_key('resample', cache.file_digest(csv_filepath), fast=True, rule=RULE, how='mean')
+
+    def read_and_resample():
+        power_data = read_power_usage_data(csv_filepath, fast=True)
+        if power_data is None:
+            return None
         print("*" * 30)
         print(f"\nOriginal data total rows: {len(power_data)}")
-        
+
         # Resample the data to 1 hour frequency
-        resampled_power_data = resample_power_data(power_data, rule='1h')
+        return resample_power_data(power_data, rule=RULE)
+
+    if resample_key is None:
+        resampled_power_data = read_and_resample()
+    else:
+        misses = cache.misses
+        resampled_power_data = cache.cached('resample', resample_key, read_and_resample)
+        if cache.misses == misses:
+            print(f"\nReusing cached resampled data ({RULE}) from {cache.root}")
+
+    if resampled_power_data is not None:
         print(f"\nResampled data total rows: {len(resampled_power_data)}")
         
         # Define output path and save the resampled data
@@ -92,7 +176,44 @@ if __name__ == "__main__":
 
         # Create sliding windows from the resampled data
         WINDOW_LEN = 24*7  # 7 days of hourly data
-        X_intact = create_sliding_windows(resampled_power_data.values, WINDOW_LEN)
+
+        # 短缺口先以線性插值 / 同週同時段數值補上，較長的缺口才留給 PyPOTS 模型
+        from gap_filler import fill_short_gaps
+        FILL_MAX_GAP, SEASONAL_MAX_GAP = 2, 6
+        gap_fill = fill_short_gaps(resampled_power_data, max_gap=FILL_MAX_GAP, seasonal_max_gap=SEASONAL_MAX_GAP)
+        model_input = gap_fill.values
+        print(f"\nFilled {int(gap_fill.filled.sum())} values in short gaps; "
+              f"{gap_fill.stats['n_missing_steps']} missing hours left for the model")
+
+        # Track missing hours and which windows are usable before building any window
+        # 只有窗口或補值參數改變時，才需要重建窗口索引
+        index_key = stage_key('window_index', resample_key, window_len=WINDOW_LEN, max_missing_frac=0.5,
+                              fill_max_gap=FILL_MAX_GAP, seasonal_max_gap=SEASONAL_MAX_GAP)
+        window_index = cache.cached(
+            'window_index', index_key,
+            lambda: build_window_index(model_input, WINDOW_LEN, max_missing_frac=0.5)
+        )
+        print(f"\nMissing hours: {window_index.stats['n_missing_steps']} in {window_index.stats['n_gaps']} gaps "
+              f"(longest {window_index.stats['max_gap']}h)")
+        print(f"Windows with at most 50% missing: {len(window_index.starts)}")
+        # 只保留缺失比例不超過 50% 的窗口，缺失過多的窗口不送進模型
+        X_intact = create_sliding_windows(model_input.values, WINDOW_LEN, starts=window_index.starts)
         print("-" * 30)
         print(f"最終 PyPOTS 輸入格式 (X): {X_intact.shape}")
-        print("(樣本數, 時間步長, 特徵數)")
\ No newline at end of file
+        print("(樣本數, 時間步長, 特徵數)")
+
+        # Save the window tensor so later stages can memory-map it instead of rebuilding it
+        save_window_tensor(X_intact, 'data/output/windows.npy')
+        # 補值的位置在 windows.mask.npy 中算作「已觀測」；另存同一批窗口的補值旗標，
+        # 讓下游可把補上的值和真正的觀測值分開
+        filled_windows = create_sliding_windows(gap_fill.filled, WINDOW_LEN, dtype=bool, starts=window_index.starts)
+        save_window_tensor(filled_windows, 'data/output/windows.filled.npy', save_mask=False)
+
+        # 單次掃描計算各特徵的平均值/標準差，存於輸出旁供模型正規化使用
+        from scaler import StreamingScaler
+        StreamingScaler().partial_fit(resampled_power_data).save('data/output/scaler.json')
+
+        # Set PIPELINE_METRICS=1 to record stage timings and memory for this run
+        if metrics.enabled:
+            metrics.to_json('data/output/metrics.json')
+            print(metrics.to_prometheus())
\ No newline at end of file
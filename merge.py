@@ -0,0 +1,319 @@
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+from resampler import StreamingResampler, rule_to_nanos
+
+POLICIES = ('prefer_api', 'prefer_csv', 'last_write_wins')
+SOURCES = ('csv', 'api')
+# Precedence = (preferred source flag << _FLAG_SHIFT) | write sequence number
+_FLAG_SHIFT = 40
+
+
+def frame_to_arrays(df: pd.DataFrame, columns: Sequence[str], timeZone: str = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert a time-indexed frame to (epoch-ms int64, (rows, columns) float64) arrays
+
+    Naive indexes, such as the Timestamp column of ThingsBoard CSV exports, are
+    local times and are localized to `timeZone` first. The repeated hour of a DST
+    fall-back is resolved from the row order; rows that stay ambiguous, and
+    local times skipped by a DST change, are dropped with a warning. Columns
+    missing from the frame become NaN.
+
+    Args:
+        df: Frame indexed by a DatetimeIndex
+        columns: Column order of the values array
+        timeZone: Time zone of naive indexes. If None, uses Config.DEFAULT_TIMEZONE
+    """
+    index = pd.DatetimeIndex(df.index)
+    values = df.reindex(columns=list(columns)).to_numpy(dtype=np.float64)
+    if index.tz is None:
+        tz = timeZone or Config.DEFAULT_TIMEZONE
+        try:
+            # The repeated hour of a DST fall-back is told apart by its order
+            index = index.tz_localize(tz, ambiguous='infer', nonexistent='NaT')
+        except ValueError:
+            # Unordered or incomplete repeats cannot be inferred
+            index = index.tz_localize(tz, ambiguous='NaT', nonexistent='NaT')
+        invalid = np.asarray(index.isna())
+        if invalid.any():
+            print(f"⚠ Dropped {int(invalid.sum())} rows whose local time is ambiguous or "
+                  f"does not exist in {tz}")
+            index, values = index[~invalid], values[~invalid]
+    ts = index.tz_convert('UTC').as_unit('ms').asi8
+    return ts, values
+
+
+def sort_unique(ts: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sort one source by timestamp, keeping the last row of any repeated timestamp
+
+    Already sorted input (the usual case) is only checked, not sorted.
+    """
+    ts = np.asarray(ts, dtype=np.int64)
+    if len(ts) > 1 and (np.diff(ts) < 0).any():
+        order = np.argsort(ts, kind='stable')
+        ts, values = ts[order], values[order]
+    if len(ts) > 1:
+        last = np.append(ts[1:] != ts[:-1], True)
+        if not last.all():
+            ts, values = ts[last], values[last]
+    return ts, values
+
+
+def merge_sorted(runs: List[Tuple[np.ndarray, np.ndarray, np.ndarray]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    k-way merge of sorted runs, keeping the highest-precedence row per timestamp
+
+    The runs are concatenated and, unless they already follow each other, put
+    in order with a stable sort. NumPy's stable sort of int64 is timsort, which
+    finds the k presorted runs and merges them instead of sorting from scratch.
+    Ties are then resolved per timestamp group with one maximum.reduceat.
+
+    Args:
+        runs: (ts int64, values 2D float64, precedence int64 per row) tuples, each
+            sorted by ts without repeated timestamps
+
+    Returns:
+        tuple: Merged (ts, values, precedence) with unique, ascending timestamps
+    """
+    runs = [run for run in runs if len(run[0])]
+    if not runs:
+        return np.empty(0, dtype=np.int64), np.empty((0, 0)), np.empty(0, dtype=np.int64)
+    if len(runs) == 1:
+        return runs[0]
+    ts = np.concatenate([run[0] for run in runs])
+    values = np.concatenate([run[1] for run in runs])
+    precedence = np.concatenate([run[2] for run in runs])
+
+    boundaries = np.cumsum([len(run[0]) for run in runs])[:-1]
+    if (ts[boundaries] <= ts[boundaries - 1]).any():
+        order = np.argsort(ts, kind='stable')
+        ts, values, precedence = ts[order], values[order], precedence[order]
+
+    group_starts = np.flatnonzero(np.append(True, ts[1:] != ts[:-1]))
+    if len(group_starts) < len(ts):
+        best = np.maximum.reduceat(precedence, group_starts)
+        sizes = np.diff(np.append(group_starts, len(ts)))
+        keep = precedence == np.repeat(best, sizes)
+        ts, values, precedence = ts[keep], values[keep], precedence[keep]
+    return ts, values, precedence
+
+
+class MergedSeries:
+    """
+    Incrementally merged telemetry from CSV exports and the API
+
+    The merged series is kept as sorted epoch-ms and value arrays in growable
+    buffers. add() binary-searches the range of the existing series that a new
+    batch overlaps, merges only that range with the batch and splices the
+    result back; rows after the overlap are moved, all others are untouched. A
+    daily delta appended after months of backfill therefore costs time in
+    proportion to the delta.
+
+    When both sides have a row at the same timestamp, the policy decides:
+        prefer_api: API rows replace CSV rows (and vice versa never)
+        prefer_csv: CSV rows replace API rows
+        last_write_wins: the row added last wins
+    Within one source, later adds win.
+
+    Usage:
+        merged = MergedSeries(['kW'], policy='prefer_api')
+        merged.add(read_power_usage_data(csv_path), 'csv', rename={'Total_Power_Usage_17/F': 'kW'})
+        merged.add(get_telemetry_data(keys='kW', startTs=..., endTs=...), 'api')
+        hourly = merged.resample('1h')
+    """
+
+    def __init__(self, columns: Sequence[str], policy: str = 'prefer_api', timeZone: str = None):
+        """
+        Initialize an empty series
+
+        Args:
+            columns: Value columns (API keys) of the merged series
+            policy: One of 'prefer_api', 'prefer_csv', 'last_write_wins'
+            timeZone: Time zone of naive CSV timestamps and of output frames.
+                If None, uses Config.DEFAULT_TIMEZONE
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy '{policy}', expected one of {POLICIES}")
+        self.columns = list(columns)
+        self.policy = policy
+        self.timeZone = timeZone or Config.DEFAULT_TIMEZONE
+        self._n = 0
+        self._writes = 0
+        self._ts = np.empty(0, dtype=np.int64)
+        self._values = np.empty((0, len(self.columns)))
+        self._precedence = np.empty(0, dtype=np.int64)
+        # Per (rule, how): [resampled frame, changed ts range since it was built, grid origin]
+        self._resampled: Dict[tuple, list] = {}
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def ts(self) -> np.ndarray:
+        """Merged epoch-ms timestamps (read-only view)"""
+        view = self._ts[:self._n]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def values(self) -> np.ndarray:
+        """Merged (rows, columns) values (read-only view)"""
+        view = self._values[:self._n]
+        view.flags.writeable = False
+        return view
+
+    def _precedence_of(self, source):
+        preferred = (
+            (self.policy == 'prefer_api' and source == 'api')
+            or (self.policy == 'prefer_csv' and source == 'csv')
+        )
+        self._writes += 1
+        return (int(preferred) << _FLAG_SHIFT) | self._writes
+
+    def _reserve(self, size):
+        capacity = len(self._ts)
+        if size <= capacity:
+            return
+        # Geometric growth keeps appends amortized O(new rows)
+        capacity = max(size, capacity + capacity // 2, 1024)
+        for name in ('_ts', '_values', '_precedence'):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self._n] = old[:self._n]
+            setattr(self, name, new)
+
+    def add(self, data, source: str = 'api', rename: Dict[str, str] = None) -> int:
+        """
+        Merge a batch of points into the series
+
+        Args:
+            data: Time-indexed DataFrame (e.g. read_power_usage_data) or a
+                get_telemetry_data / get_telemetry_data_bulk response
+            source: 'csv' or 'api'; decides conflicts under the prefer_* policies
+            rename: Optional {data column: series column} mapping
+
+        Returns:
+            int: Number of rows of the batch that were kept
+        """
+        if source not in SOURCES:
+            raise ValueError(f"Unknown source '{source}', expected one of {SOURCES}")
+        if isinstance(data, dict):
+            from telemetry_decode import telemetry_to_dataframe
+            names = {key: (rename or {}).get(key, key) for key in data}
+            data = telemetry_to_dataframe(data, timeZone='UTC').rename(columns=names)
+        elif rename:
+            data = data.rename(columns=rename)
+        return self.add_arrays(*frame_to_arrays(data, self.columns, self.timeZone), source=source)
+
+    def add_arrays(self, ts: np.ndarray, values: np.ndarray, source: str = 'api') -> int:
+        """
+        Splice (epoch-ms, (rows, columns) values) arrays into the series
+
+        Returns:
+            int: Number of the given rows that were kept
+        """
+        if source not in SOURCES:
+            raise ValueError(f"Unknown source '{source}', expected one of {SOURCES}")
+        ts, values = sort_unique(ts, np.asarray(values, dtype=np.float64).reshape(len(ts), len(self.columns)))
+        if len(ts) == 0:
+            return 0
+        precedence = self._precedence_of(source)
+        n = self._n
+        base_ts = self._ts[:n]
+        lo = int(np.searchsorted(base_ts, ts[0], 'left'))
+        hi = int(np.searchsorted(base_ts, ts[-1], 'right'))
+
+        batch_precedence = np.full(len(ts), precedence, dtype=np.int64)
+        merged_ts, merged_values, merged_precedence = merge_sorted([
+            (base_ts[lo:hi], self._values[lo:hi], self._precedence[lo:hi]),
+            (ts, values, batch_precedence),
+        ])
+        kept = int((merged_precedence == precedence).sum())
+
+        tail = n - hi
+        new_n = lo + len(merged_ts) + tail
+        self._reserve(new_n)
+        if tail and len(merged_ts) != hi - lo:
+            # Shift the rows after the overlap; copies because source and target overlap
+            for array in (self._ts, self._values, self._precedence):
+                array[lo + len(merged_ts):new_n] = array[hi:n].copy()
+        self._ts[lo:lo + len(merged_ts)] = merged_ts
+        self._values[lo:lo + len(merged_ts)] = merged_values
+        self._precedence[lo:lo + len(merged_ts)] = merged_precedence
+        self._n = new_n
+
+        for dirty in self._resampled.values():
+            dirty[1] = ts[0] if dirty[1] is None else min(dirty[1], ts[0])
+            dirty[2] = ts[-1] if dirty[2] is None else max(dirty[2], ts[-1])
+        return kept
+
+    def to_frame(self, start: int = 0, stop: int = None) -> pd.DataFrame:
+        """Rows [start, stop) of the merged series as a frame with a tz-aware index"""
+        stop = self._n if stop is None else stop
+        index = pd.to_datetime(self._ts[start:stop], unit='ms', utc=True).tz_convert(self.timeZone)
+        index.name = 'ts'
+        return pd.DataFrame(self._values[start:stop].copy(), index=index, columns=self.columns)
+
+    def resample(self, rule: str = '1h', how='mean') -> pd.DataFrame:
+        """
+        Resample the merged series, recomputing only buckets touched since the last call
+
+        Buckets are computed with resampler.StreamingResampler on the rows of the
+        affected buckets and spliced into the previously returned frame. As with
+        DataFrame.resample, they are counted from local midnight of the first
+        day of the series; points added before that day trigger a full recompute.
+
+        Args:
+            rule: Fixed-frequency pandas rule, e.g. '1h' or '1D'
+            how: Aggregation (see resampler.AGGREGATIONS), or a {column: how} dict
+
+        Returns:
+            pd.DataFrame: One row per bucket from the first to the last point
+        """
+        key = (rule, how if isinstance(how, str) else tuple(sorted(how.items())))
+        if not self._n:
+            return self._resample_rows(rule, how, None, 0, 0)
+        origin = pd.Timestamp(int(self._ts[0]), unit='ms', tz='UTC').tz_convert(self.timeZone).normalize()
+        entry = self._resampled.get(key)
+        if entry is None or entry[3] != origin:
+            entry = self._resampled[key] = [None, int(self._ts[0]), int(self._ts[self._n - 1]), origin]
+        frame, dirty_lo, dirty_hi, _ = entry
+        if dirty_lo is None:
+            return frame
+
+        # Rows one bucket (plus a DST hour) beyond the changes complete the touched buckets
+        pad = 2 * rule_to_nanos(rule) // 1_000_000
+        start = int(np.searchsorted(self._ts[:self._n], dirty_lo - pad, 'left'))
+        stop = int(np.searchsorted(self._ts[:self._n], dirty_hi + pad, 'right'))
+        piece = self._resample_rows(rule, how, origin, start, stop)
+        stamps = piece.index.tz_convert('UTC').as_unit('ms').asi8
+        first = int(np.searchsorted(stamps, dirty_lo, 'right')) - 1
+        last = int(np.searchsorted(stamps, dirty_hi, 'right')) - 1
+        # Only the buckets holding changed points; edge buckets may be partial
+        piece = piece.iloc[first:last + 1]
+
+        if frame is not None and len(frame):
+            # Keep the old buckets outside the recomputed range
+            old = frame.index.tz_convert('UTC').as_unit('ms').asi8
+            outside = (old < stamps[first]) | (old > stamps[last])
+            piece = pd.concat([frame[outside], piece]).sort_index()
+            full = pd.date_range(piece.index[0], piece.index[-1], freq=rule, name=piece.index.name)
+            if len(full) != len(piece):
+                piece = piece.reindex(full)
+                for column in self.columns:
+                    agg = how.get(column, 'mean') if isinstance(how, dict) else how
+                    if agg in ('sum', 'count'):
+                        piece[column] = piece[column].fillna(0)
+        entry[:3] = [piece, None, None]
+        return piece
+
+    def _resample_rows(self, rule, how, origin, start, stop):
+        resampler = StreamingResampler(rule, how=how, columns=self.columns, origin=origin or 'start_day')
+        if stop <= start:
+            return resampler.flush()
+        closed = resampler.update(self.to_frame(start, stop))
+        return pd.concat([closed, resampler.flush()])
@@ -0,0 +1,352 @@
+"""
+Local mock of the ThingsBoard endpoints used by auth.py and getTelemetry.py
+
+Serves /api/auth/login, /api/auth/refresh (and /api/auth/token), /api/auth/user
+and /api/plugins/telemetry/{entityType}/{entityId}/values/timeseries with
+deterministic synthetic series, so the client code can be load- and
+fault-tested without network access or credentials.
+
+Usage:
+    with MockThingsBoard(latency=0.01, throttle_rate=0.1) as server:
+        auth = AuthManager(server.base_url, username="user@iot.com", password="1234")
+        ...
+
+    python mock_thingsboard.py --port 8080 --error-rate 0.05   # standalone
+"""
+import argparse
+import base64
+import gzip
+import json
+import math
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from synthetic import hash_uniform, power_values
+
+TELEMETRY_PREFIX = '/api/plugins/telemetry/'
+SERVER_AGGREGATIONS = ('AVG', 'SUM', 'MIN', 'MAX', 'COUNT')
+
+
+def _b64(obj):
+    return base64.urlsafe_b64encode(json.dumps(obj).encode()).rstrip(b'=').decode()
+
+
+class MockThingsBoard:
+    """In-process ThingsBoard stand-in with configurable latency, faults and token expiry"""
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        username: str = 'user@iot.com',
+        password: str = '1234',
+        token_ttl: float = 3600.0,
+        refresh_ttl: float = 7 * 24 * 3600.0,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: float = 1.0,
+        raw_interval_ms: int = 60_000,
+        gap_rate: float = 0.0,
+        fault_auth: bool = False,
+        seed: int = 0
+    ):
+        """
+        Initialize the mock server (call start() or use it as a context manager)
+
+        Args:
+            host: Interface to bind
+            port: Port to bind; 0 picks a free one
+            username: Accepted username
+            password: Accepted password
+            token_ttl: Lifetime of access tokens in seconds
+            refresh_ttl: Lifetime of refresh tokens in seconds
+            latency: Added delay per request in seconds
+            error_rate: Probability of answering 500/503
+            throttle_rate: Probability of answering 429 with Retry-After
+            retry_after: Retry-After value of 429 responses, in whole seconds
+            raw_interval_ms: Spacing of the synthetic raw points
+            gap_rate: Probability that a synthetic point is missing
+            fault_auth: Also inject latency and faults into the auth endpoints
+            seed: Seed of the synthetic series and the fault injection
+        """
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.token_ttl = token_ttl
+        self.refresh_ttl = refresh_ttl
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.raw_interval_ms = raw_interval_ms
+        self.gap_rate = gap_rate
+        self.fault_auth = fault_auth
+        self.seed = seed
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._token_counter = 0
+        self.stats = {'requests': 0, 'logins': 0, 'refreshes': 0, 'unauthorized': 0,
+                      'throttled': 0, 'errors': 0, 'points_served': 0}
+        self._server = None
+        self._thread = None
+
+    # -- lifecycle -----------------------------------------------------------
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        handler = type('Handler', (_MockHandler,), {'mock': self})
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # -- tokens --------------------------------------------------------------
+
+    def issue_tokens(self):
+        """Return a fresh {"token", "refreshToken"} pair"""
+        now = time.time()
+        with self._lock:
+            self._token_counter += 1
+            jti = self._token_counter
+        header = _b64({'alg': 'none'})
+        token = f"{header}.{_b64({'sub': self.username, 'exp': now + self.token_ttl, 'jti': jti})}.mock"
+        refresh = f"{header}.{_b64({'sub': self.username, 'exp': now + self.refresh_ttl, 'jti': jti, 'scope': 'REFRESH'})}.mock"
+        return {'token': token, 'refreshToken': refresh}
+
+    @staticmethod
+    def token_claims(token):
+        try:
+            payload = token.split('.')[1]
+            return json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+        except (IndexError, ValueError, AttributeError):
+            return None
+
+    def token_valid(self, token, refresh=False):
+        claims = self.token_claims(token)
+        if not claims or claims.get('exp', 0) < time.time():
+            return False
+        return (claims.get('scope') == 'REFRESH') == refresh
+
+    # -- data ----------------------------------------------------------------
+
+    def series(self, entityId, key, startTs, endTs):
+        """Synthetic raw points of one key in [startTs, endTs] as (ts int64 ms, values)"""
+        step = self.raw_interval_ms
+        first = -(-startTs // step) * step
+        if endTs < first:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        ts = np.arange(first, endTs + 1, step, dtype=np.int64)
+        # Noise and gaps are pure functions of (series, ts), so overlapping queries agree
+        salt = (zlib.crc32(f"{entityId}/{key}".encode()) << 16) + self.seed
+        values = power_values(ts * 1_000_000, 1, noise=0)[:, 0]
+        values = np.round(values + 2.0 * (hash_uniform(ts, salt) - 0.5), 2)
+        if self.gap_rate > 0:
+            keep = hash_uniform(ts, salt + 1) >= self.gap_rate
+            ts, values = ts[keep], values[keep]
+        return ts, values
+
+    @staticmethod
+    def _aggregate(ts, values, startTs, interval, agg):
+        """Reduce sorted points to one per non-empty interval bucket"""
+        starts, index = np.unique((ts - startTs) // interval, return_index=True)
+        counts = np.diff(np.append(index, len(ts)))
+        if agg == 'MIN':
+            values = np.minimum.reduceat(values, index)
+        elif agg == 'MAX':
+            values = np.maximum.reduceat(values, index)
+        elif agg == 'COUNT':
+            values = counts.astype(np.float64)
+        else:
+            values = np.add.reduceat(values, index)
+            if agg == 'AVG':
+                values = values / counts
+        # ThingsBoard stamps each aggregated bucket at its middle
+        return startTs + starts * interval + interval // 2, values
+
+    def timeseries(self, entityId, query):
+        keys = [key for key in query.get('keys', [''])[0].split(',') if key]
+        startTs = int(query.get('startTs', ['0'])[0])
+        endTs = int(query.get('endTs', [str(int(time.time() * 1000))])[0])
+        limit = int(query.get('limit', ['100'])[0])
+        agg = query.get('agg', ['NONE'])[0].upper()
+        interval = int(query.get('interval', ['0'])[0] or 0)
+        descending = query.get('orderBy', ['DESC'])[0].upper() == 'DESC'
+        strict = query.get('useStrictDataTypes', ['false'])[0].lower() == 'true'
+
+        result = {}
+        for key in keys:
+            ts, values = self.series(entityId, key, startTs, endTs)
+            if agg in SERVER_AGGREGATIONS and interval > 0 and len(ts):
+                ts, values = self._aggregate(ts, values, startTs, interval, agg)
+            if descending:
+                ts, values = ts[::-1], values[::-1]
+            ts, values = ts[:limit], values[:limit]
+            result[key] = [
+                {'ts': int(t), 'value': float(v) if strict else f"{v:.2f}"}
+                for t, v in zip(ts.tolist(), values.tolist())
+            ]
+            with self._lock:
+                self.stats['points_served'] += len(ts)
+        return result
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    mock = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, body, headers=None):
+        payload = json.dumps(body).encode()
+        if 'gzip' in (self.headers.get('Accept-Encoding') or '') and len(payload) > 512:
+            payload = gzip.compress(payload, compresslevel=1)
+            headers = dict(headers or {}, **{'Content-Encoding': 'gzip'})
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            return {}
+
+    def _bearer(self, *header_names):
+        for name in header_names:
+            value = self.headers.get(name) or ''
+            if value.startswith('Bearer '):
+                return value[len('Bearer '):]
+        return None
+
+    def _inject_faults(self):
+        """Apply latency and random 429/5xx; return True when a fault was sent"""
+        mock = self.mock
+        with mock._lock:
+            mock.stats['requests'] += 1
+            roll = mock._random.random()
+            error_code = mock._random.choice((500, 503))
+        if mock.latency:
+            time.sleep(mock.latency)
+        if roll < mock.throttle_rate:
+            with mock._lock:
+                mock.stats['throttled'] += 1
+            self._send_json(429, {'message': 'Too many requests'}, {'Retry-After': str(math.ceil(mock.retry_after))})
+            return True
+        if roll < mock.throttle_rate + mock.error_rate:
+            with mock._lock:
+                mock.stats['errors'] += 1
+            self._send_json(error_code, {'message': 'Injected failure'})
+            return True
+        return False
+
+    def _unauthorized(self):
+        with self.mock._lock:
+            self.mock.stats['unauthorized'] += 1
+        self._send_json(401, {'status': 401, 'message': 'Token has expired', 'errorCode': 11})
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        body = self._read_json()
+        if self.mock.fault_auth and self._inject_faults():
+            return
+        mock = self.mock
+        if path == '/api/auth/login':
+            if body.get('username') != mock.username or body.get('password') != mock.password:
+                self._send_json(401, {'status': 401, 'message': 'Invalid username or password', 'errorCode': 10})
+                return
+            with mock._lock:
+                mock.stats['logins'] += 1
+            self._send_json(200, mock.issue_tokens())
+        elif path in ('/api/auth/refresh', '/api/auth/token'):
+            refresh = body.get('refreshToken') or self._bearer('Authorization', 'X-Authorization')
+            if not mock.token_valid(refresh, refresh=True):
+                self._unauthorized()
+                return
+            with mock._lock:
+                mock.stats['refreshes'] += 1
+            self._send_json(200, mock.issue_tokens())
+        else:
+            self._send_json(404, {'message': f'Unknown endpoint {path}'})
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if (parts.path.startswith(TELEMETRY_PREFIX) or self.mock.fault_auth) and self._inject_faults():
+            return
+        mock = self.mock
+        token = self._bearer('X-Authorization', 'Authorization')
+        if not mock.token_valid(token):
+            self._unauthorized()
+            return
+
+        if parts.path == '/api/auth/user':
+            self._send_json(200, {'email': mock.username, 'authority': 'TENANT_ADMIN'})
+            return
+        segments = parts.path[len(TELEMETRY_PREFIX):].split('/') if parts.path.startswith(TELEMETRY_PREFIX) else []
+        if len(segments) == 4 and segments[2:] == ['values', 'timeseries']:
+            self._send_json(200, mock.timeseries(segments[1], parse_qs(parts.query)))
+            return
+        self._send_json(404, {'message': f'Unknown endpoint {parts.path}'})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--retry-after', type=float, default=1.0)
+    parser.add_argument('--token-ttl', type=float, default=3600.0)
+    parser.add_argument('--gap-rate', type=float, default=0.0)
+    parser.add_argument('--fault-auth', action='store_true')
+    args = parser.parse_args(argv)
+
+    server = MockThingsBoard(
+        host=args.host, port=args.port, latency=args.latency, error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate, retry_after=args.retry_after,
+        token_ttl=args.token_ttl, gap_rate=args.gap_rate, fault_auth=args.fault_auth
+    ).start()
+    print(f"Mock ThingsBoard listening on {server.base_url} (user {server.username} / {server.password})")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+import os
+import tempfile
+from contextlib import contextmanager
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+FRAME_FORMATS = ('parquet', 'feather', 'csv')
+WINDOW_FORMATS = ('npy', 'h5')
+MASK_SUFFIX = '.mask'
+
+# Mode of outputs when the process umask cannot be read without changing it
+DEFAULT_UMASK = 0o022
+
+
+@lru_cache(maxsize=1)
+def _file_mode():
+    """
+    Mode a regular file created by open() would get (0o666 minus the umask)
+
+    os.umask can only be read by setting it, which races with other threads
+    creating files, so the umask is read from /proc where available.
+    """
+    umask = DEFAULT_UMASK
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('Umask:'):
+                    umask = int(line.split()[1], 8)
+                    break
+    except (OSError, ValueError):
+        pass
+    return 0o666 & ~umask
+
+
+@contextmanager
+def atomic_path(path):
+    """
+    Yield a temporary path next to `path` and move it into place on success
+
+    The temporary file lives in the same directory so the final os.replace is an
+    atomic rename; readers never see a half-written file. On error the temporary
+    file is removed and the original file (if any) is left untouched.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp', dir=directory)
+    os.close(fd)
+    # mkstemp creates files as 0600; finished outputs get the usual umask-based mode
+    os.chmod(tmp_path, _file_mode())
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _format_of(path, fmt, allowed):
+    if fmt is None:
+        fmt = os.path.splitext(path)[1].lstrip('.').lower()
+        fmt = {'hdf5': 'h5', 'pq': 'parquet'}.get(fmt, fmt)
+    if fmt not in allowed:
+        raise ValueError(f"Unsupported format '{fmt}', expected one of {allowed}")
+    return fmt
+
+
+def _mask_path(path):
+    stem, ext = os.path.splitext(path)
+    return f"{stem}{MASK_SUFFIX}{ext}"
+
+
+def save_frame(df, path, fmt=None):
+    """
+    Atomically write a resampled frame as Parquet, Feather or CSV
+
+    Parquet and Feather need pyarrow and keep dtypes and the DatetimeIndex, so
+    the next stage can read them back without re-parsing text.
+
+    Args:
+        df: DataFrame to write
+        path: Output path; the format is taken from the extension unless fmt is given
+        fmt: One of 'parquet', 'feather', 'csv'
+    """
+    fmt = _format_of(path, fmt, FRAME_FORMATS)
+    with atomic_path(path) as tmp_path:
+        if fmt == 'parquet':
+            df.to_parquet(tmp_path)
+        elif fmt == 'feather':
+            # Feather cannot store an index; keep it as a regular column
+            df.reset_index().to_feather(tmp_path)
+        else:
+            df.to_csv(tmp_path)
+
+
+def load_frame(path, fmt=None):
+    """Read a frame written by save_frame"""
+    fmt = _format_of(path, fmt, FRAME_FORMATS)
+    if fmt == 'parquet':
+        return pd.read_parquet(path)
+    if fmt == 'feather':
+        df = pd.read_feather(path)
+        return df.set_index(df.columns[0])
+    return pd.read_csv(path, index_col=0, parse_dates=[0])
+
+
+def _write_npy(path, array, chunk_rows, transform=None, dtype=None):
+    dtype = np.dtype(dtype or array.dtype)
+    out = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=array.shape)
+    # Copy in chunks so a strided window view is never materialized in full
+    for start in range(0, len(array), chunk_rows):
+        chunk = array[start:start + chunk_rows]
+        out[start:start + len(chunk)] = chunk if transform is None else transform(chunk)
+    out.flush()
+    del out
+
+
+def _write_h5(path, array, mask, chunk_rows):
+    try:
+        import h5py
+    except ImportError:
+        raise ImportError("h5py is required to write HDF5 window tensors (pip install h5py)")
+    with atomic_path(path) as tmp_path:
+        with h5py.File(tmp_path, 'w') as f:
+            chunks = (min(chunk_rows, len(array)),) + array.shape[1:] if len(array) else None
+            dataset = f.create_dataset('X', shape=array.shape, dtype=array.dtype, chunks=chunks, compression='gzip')
+            mask_dataset = None
+            if mask:
+                mask_dataset = f.create_dataset('mask', shape=array.shape, dtype=bool, chunks=chunks, compression='gzip')
+            for start in range(0, len(array), chunk_rows):
+                chunk = np.asarray(array[start:start + chunk_rows])
+                dataset[start:start + len(chunk)] = chunk
+                if mask_dataset is not None:
+                    mask_dataset[start:start + len(chunk)] = ~np.isnan(chunk)
+
+
+def save_windows(X, path, save_mask=True, fmt=None, chunk_rows=4096, dtype=None):
+    """
+    Write a (samples, window, features) tensor and its missing-value mask
+
+    For '.npy' the tensor goes to `path` and the mask (True = observed, as PyPOTS
+    expects) to `<stem>.mask.npy`; both can be memory-mapped by load_windows.
+    Each file is replaced atomically, but the pair is not: both are written in
+    full first and then renamed one after the other, so a reader racing the
+    write may briefly see the new tensor next to the old mask. load_windows
+    rejects a mask whose shape does not match. For '.h5' both are chunked,
+    gzip-compressed datasets 'X' and 'mask' in one file, replaced atomically.
+
+    Args:
+        X: Window tensor or a (read-only) strided view of one
+        path: Output path ending in .npy or .h5
+        save_mask: Also write the observed-value mask
+        fmt: One of 'npy', 'h5'. If None, taken from the extension
+        chunk_rows: Number of windows copied per chunk
+        dtype: Output dtype of the tensor. If None, keeps the dtype of X
+    """
+    fmt = _format_of(path, fmt, WINDOW_FORMATS)
+    if fmt == 'h5':
+        if dtype is not None:
+            X = X.astype(dtype, copy=False)
+        _write_h5(path, X, save_mask, chunk_rows)
+        return
+    mask_path = _mask_path(path)
+    if not save_mask:
+        with atomic_path(path) as tmp_path:
+            _write_npy(tmp_path, X, chunk_rows, dtype=dtype)
+        # A mask left from an earlier save would no longer describe the tensor
+        if os.path.exists(mask_path):
+            os.remove(mask_path)
+        return
+    with atomic_path(mask_path) as tmp_mask_path, atomic_path(path) as tmp_path:
+        _write_npy(tmp_path, X, chunk_rows, dtype=dtype)
+        _write_npy(tmp_mask_path, X, chunk_rows, transform=lambda chunk: ~np.isnan(chunk), dtype=bool)
+
+
+@contextmanager
+def open_windows(path, fmt=None):
+    """
+    Open a window tensor written by save_windows lazily and close it on exit
+
+    Yields:
+        tuple: (X, mask). Read-only memory maps for .npy (mask is None if it was
+            not saved); h5py datasets for .h5, valid until the block exits.
+    """
+    fmt = _format_of(path, fmt, WINDOW_FORMATS)
+    if fmt == 'h5':
+        import h5py
+        with h5py.File(path, 'r') as f:
+            yield f['X'], f['mask'] if 'mask' in f else None
+        return
+    yield load_windows(path, fmt=fmt)
+
+
+def load_windows(path, mmap=True, fmt=None):
+    """
+    Load a window tensor written by save_windows
+
+    Returns:
+        tuple: (X, mask). For .npy these are read-only memory maps when mmap=True
+            (mask is None if it was not saved). HDF5 files are read into memory
+            and closed; use open_windows to read them lazily.
+
+    Raises:
+        ValueError: When the mask next to a .npy tensor does not match its shape
+    """
+    fmt = _format_of(path, fmt, WINDOW_FORMATS)
+    if fmt == 'h5':
+        with open_windows(path, fmt) as (X, mask):
+            return X[()], None if mask is None else mask[()]
+    mmap_mode = 'r' if mmap else None
+    X = np.load(path, mmap_mode=mmap_mode)
+    mask_path = _mask_path(path)
+    mask = np.load(mask_path, mmap_mode=mmap_mode) if os.path.exists(mask_path) else None
+    if mask is not None and mask.shape != X.shape:
+        raise ValueError(f"Mask {mask_path} has shape {mask.shape}, expected {X.shape}")
+    return X, mask
+
+
+def iter_window_batches(path, batch_size=256):
+    """
+    Yield (X, mask) batches sliced from a saved window tensor
+
+    Only the rows of the current batch are read from disk.
+    """
+    with open_windows(path) as (X, mask):
+        for start in range(0, len(X), batch_size):
+            stop = start + batch_size
+            yield np.asarray(X[start:stop]), None if mask is None else np.asarray(mask[start:stop])
@@ -0,0 +1,206 @@
+import email.utils
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+# Responses that mean "slow down" rather than "this request is wrong"
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """
+    Parse a Retry-After header (delta seconds or HTTP date) into seconds to wait
+
+    Returns:
+        Optional[float]: Seconds to wait, or None if the header is missing or invalid
+    """
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class AdaptiveConcurrencyController:
+    """
+    AIMD concurrency limiter for requests to one host
+
+    At most `limit` requests are in flight at once. The limit grows by one after
+    a full limit's worth of fast, successful responses (additive increase) and
+    is cut by `decrease_factor` on throttling (429/503), errors or responses
+    slower than `latency_threshold` (multiplicative decrease, at most once per
+    `cooldown` seconds). A Retry-After header pauses every new request to the
+    host until it has passed.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        latency_threshold: float = 5.0,
+        decrease_factor: float = 0.5,
+        cooldown: float = 1.0,
+        max_retries: int = 5,
+        default_retry_after: float = 1.0,
+        throughput_window: float = 60.0
+    ):
+        """
+        Initialize the controller
+
+        Args:
+            initial_limit: Starting number of concurrent requests
+            min_limit: Lower bound of the limit
+            max_limit: Upper bound of the limit
+            latency_threshold: Responses slower than this (seconds) count as congestion
+            decrease_factor: Multiplier applied to the limit on congestion
+            cooldown: Minimum seconds between two decreases
+            max_retries: How many times a throttled request should be retried
+            default_retry_after: Pause (seconds) after throttling without Retry-After
+            throughput_window: Seconds over which throughput is measured
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = max(min_limit, min(initial_limit, max_limit))
+        self.latency_threshold = latency_threshold
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self.max_retries = max_retries
+        self.default_retry_after = default_retry_after
+        self.throughput_window = throughput_window
+
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self._successes_since_increase = 0
+        self._last_decrease = 0.0
+        self._completions = deque()
+        self._totals = {'requests': 0, 'successes': 0, 'throttled': 0, 'errors': 0, 'latency': 0.0}
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """Block until a request slot is free and no Retry-After pause is active"""
+        with self._condition:
+            while True:
+                wait = self.blocked_until - time.monotonic()
+                if wait <= 0 and self.in_flight < self.limit:
+                    self.in_flight += 1
+                    return
+                self._condition.wait(timeout=wait if wait > 0 else None)
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+    @contextmanager
+    def slot(self):
+        """Context manager holding one request slot"""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def record(self, latency: float, status_code: Optional[int], retry_after=None):
+        """
+        Report the outcome of one request and adapt the limit
+
+        Args:
+            latency: Request latency in seconds
+            status_code: HTTP status, or None for a connection error
+            retry_after: Value of the Retry-After header, if any
+        """
+        now = time.monotonic()
+        with self._condition:
+            self._totals['requests'] += 1
+            self._totals['latency'] += latency
+            self._completions.append(now)
+            while self._completions and self._completions[0] < now - self.throughput_window:
+                self._completions.popleft()
+
+            throttled = status_code in THROTTLE_STATUS_CODES
+            failed = status_code is None or status_code >= 500
+            if throttled:
+                self._totals['throttled'] += 1
+                pause = parse_retry_after(retry_after)
+                if pause is None:
+                    pause = self.default_retry_after
+                self.blocked_until = max(self.blocked_until, now + pause)
+            elif failed:
+                self._totals['errors'] += 1
+            else:
+                self._totals['successes'] += 1
+
+            if throttled or failed or latency > self.latency_threshold:
+                if now - self._last_decrease >= self.cooldown:
+                    self.limit = max(self.min_limit, int(self.limit * self.decrease_factor))
+                    self._last_decrease = now
+                self._successes_since_increase = 0
+            else:
+                self._successes_since_increase += 1
+                if self._successes_since_increase >= self.limit:
+                    self.limit = min(self.max_limit, self.limit + 1)
+                    self._successes_since_increase = 0
+            self._condition.notify_all()
+
+    def throughput(self) -> float:
+        """Completed requests per second over the last throughput_window seconds"""
+        now = time.monotonic()
+        with self._condition:
+            while self._completions and self._completions[0] < now - self.throughput_window:
+                self._completions.popleft()
+            if not self._completions:
+                return 0.0
+            elapsed = max(now - self._completions[0], 1e-9)
+            return len(self._completions) / max(elapsed, min(self.throughput_window, 1.0))
+
+    def stats(self) -> Dict:
+        """Current limit, in-flight count, throughput and cumulative counters"""
+        with self._condition:
+            totals = dict(self._totals)
+            limit, in_flight = self.limit, self.in_flight
+            paused = max(0.0, self.blocked_until - time.monotonic())
+        requests = totals['requests']
+        return {
+            'limit': limit,
+            'in_flight': in_flight,
+            'paused_for': paused,
+            'throughput': self.throughput(),
+            'requests': requests,
+            'successes': totals['successes'],
+            'throttled': totals['throttled'],
+            'errors': totals['errors'],
+            'mean_latency': totals['latency'] / requests if requests else 0.0,
+        }
+
+
+_controllers = {}
+_controllers_lock = threading.Lock()
+
+
+def get_controller(url: str, **options) -> AdaptiveConcurrencyController:
+    """
+    Get the shared controller for the host of `url`, creating it on first use
+
+    Args:
+        url: Any URL on the host
+        **options: AdaptiveConcurrencyController arguments used on creation
+    """
+    host = urlsplit(url).netloc or url
+    with _controllers_lock:
+        controller = _controllers.get(host)
+        if controller is None:
+            controller = AdaptiveConcurrencyController(**options)
+            _controllers[host] = controller
+        return controller
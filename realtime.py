@@ -0,0 +1,270 @@
+import asyncio
+import datetime
+import functools
+import inspect
+
+import numpy as np
+
+from resampler import StreamingResampler, rule_to_nanos
+from telemetry_decode import telemetry_to_dataframe
+
+
+class RingBuffer:
+    """
+    Fixed-size ring buffer of time steps whose current window is a zero-copy view
+
+    Every step is written twice, at `head` and `head + length`, into a
+    preallocated (2 * length, features) array. The last `length` steps in time
+    order are then always the contiguous slice [head, head + length), so
+    reading the window never copies and costs O(1) regardless of its size.
+    """
+
+    def __init__(self, length, n_features=1, dtype=np.float32, fill_value=np.nan):
+        """
+        Initialize the buffer
+
+        Args:
+            length: Number of time steps in the window (e.g. WINDOW_LEN)
+            n_features: Number of features per step
+            dtype: dtype of the buffer
+            fill_value: Value of steps not written yet
+        """
+        if length <= 0:
+            raise ValueError("length must be positive")
+        self.length = length
+        self._data = np.full((2 * length, n_features), fill_value, dtype=dtype)
+        self._head = 0
+        self.count = 0
+
+    @property
+    def is_full(self):
+        return self.count >= self.length
+
+    def push(self, values):
+        """Append one step (a scalar or an array of n_features values)"""
+        self._data[self._head] = values
+        self._data[self._head + self.length] = values
+        self._head = (self._head + 1) % self.length
+        self.count += 1
+
+    def extend(self, rows):
+        """Append several steps, oldest first"""
+        rows = np.asarray(rows, dtype=self._data.dtype)
+        if rows.ndim == 1:
+            rows = rows[:, None] if self._data.shape[1] == 1 else rows[None, :]
+        if len(rows) >= self.length:
+            # Only the newest `length` rows survive; write them in one go
+            rows = rows[-self.length:]
+            self._data[:self.length] = rows
+            self._data[self.length:] = rows
+            self._head = 0
+            self.count += len(rows)
+            return
+        for row in rows:
+            self.push(row)
+
+    def window(self):
+        """Read-only (length, features) view of the latest steps, oldest first"""
+        view = self._data[self._head:self._head + self.length]
+        view.flags.writeable = False
+        return view
+
+
+class LocalTelemetryFeed:
+    """
+    In-process stand-in for a ThingsBoard websocket subscription
+
+    publish() takes messages in the websocket format
+    {"data": {key: [[ts, value], ...]}}; iterating the feed yields them in order
+    until close() is called.
+    """
+
+    def __init__(self):
+        self._queue = asyncio.Queue()
+
+    async def publish(self, message):
+        await self._queue.put(message)
+
+    async def close(self):
+        await self._queue.put(None)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        message = await self._queue.get()
+        if message is None:
+            raise StopAsyncIteration
+        return message
+
+
+def websocket_message_to_telemetry(message):
+    """Convert a websocket update {"data": {key: [[ts, value], ...]}} to the REST format"""
+    data = message.get('data') or {}
+    return {key: [{'ts': ts, 'value': value} for ts, value in points] for key, points in data.items()}
+
+
+class IngestDaemon:
+    """
+    Long-running asyncio service that keeps the latest resampled window in a RingBuffer
+
+    New raw points come either from polling get_telemetry_data with startTs set
+    just after the oldest of the keys' last seen timestamps, so a key cut off at
+    the request limit loses nothing (run()), or from a websocket-style feed
+    (consume()). The first poll backfills a whole window with the paginating
+    get_telemetry_data_bulk. They are resampled incrementally; every closed bucket is pushed
+    into the ring buffer and `on_window(window, bucket_start)` is called with a
+    zero-copy view of the current window.
+    """
+
+    def __init__(
+        self,
+        entityId: str,
+        keys: str,
+        window_len: int = 24 * 7,
+        rule: str = '1h',
+        how: str = 'mean',
+        poll_interval: float = 60.0,
+        allowed_lateness=None,
+        on_window=None,
+        fetch=None,
+        backfill_fetch=None,
+        entityType: str = "DEVICE",
+        timeZone: str = None,
+        **fetch_kwargs
+    ):
+        """
+        Initialize the daemon
+
+        Args:
+            entityId: Entity ID
+            keys: Telemetry keys, comma-separated; each key is one feature
+            window_len: Number of resampled steps kept in the ring buffer
+            rule: Resample rule of the steps
+            how: Aggregation of raw points per step
+            poll_interval: Seconds between polls in run()
+            allowed_lateness: How long a bucket waits for out-of-order points
+            on_window: Callback (sync or async) called as on_window(window, bucket_start)
+            fetch: get_telemetry_data stand-in. If None, uses getTelemetry.get_telemetry_data
+            backfill_fetch: Fetch for the first poll and for catching up after more
+                than a window of downtime; it must page past the request limit.
+                If None, uses getTelemetry.get_telemetry_data_bulk (or `fetch`
+                when a custom fetch is given)
+            entityType: Entity type, e.g., "DEVICE"
+            timeZone: Time zone of bucket timestamps
+            **fetch_kwargs: Extra arguments forwarded to fetch (e.g. auth_manager)
+        """
+        if fetch is None:
+            from getTelemetry import get_telemetry_data, get_telemetry_data_bulk
+            fetch = get_telemetry_data
+            backfill_fetch = backfill_fetch or get_telemetry_data_bulk
+        self.entityType = entityType
+        self.entityId = entityId
+        self.keys = [key.strip() for key in keys.split(",") if key.strip()]
+        self.rule = rule
+        self.poll_interval = poll_interval
+        self.on_window = on_window
+        self.fetch = fetch
+        self.backfill_fetch = backfill_fetch or fetch
+        self.timeZone = timeZone
+        self.fetch_kwargs = fetch_kwargs
+        self.ring = RingBuffer(window_len, len(self.keys))
+        self.resampler = StreamingResampler(rule, how=how, columns=self.keys, allowed_lateness=allowed_lateness)
+        self.span_ms = rule_to_nanos(rule) // 1_000_000 * (window_len + 1)
+        # Timestamp each key is complete up to; a key cut off at the request limit lags the others
+        self.key_last_ts = {}
+        self.steps_emitted = 0
+        self._stopped = asyncio.Event()
+
+    @property
+    def last_ts(self):
+        """Timestamp polling resumes after: the oldest of the keys' cursors"""
+        return min(self.key_last_ts.values()) if self.key_last_ts else None
+
+    def stop(self):
+        """Ask run()/consume() to return after the current iteration"""
+        self._stopped.set()
+
+    async def _handle(self, data, endTs=None):
+        """
+        Feed a REST-format telemetry dict through the resampler into the ring
+
+        `endTs` is the end of the polled range: a key without new points in it
+        is complete up to there, so it does not hold the next poll back.
+        """
+        # Polls resume from the slowest key, so drop points a key already delivered
+        data = {
+            key: [entry for entry in values if int(entry['ts']) > self.key_last_ts[key]]
+            if key in self.key_last_ts else values
+            for key, values in data.items()
+        }
+        frame = telemetry_to_dataframe(data, timeZone=self.timeZone, keys=self.keys)
+        for key in self.keys:
+            newest = None if frame.empty else frame[key].last_valid_index()
+            if newest is not None:
+                newest = int(newest.value // 1_000_000)
+            elif endTs is not None:
+                newest = endTs
+            else:
+                continue
+            self.key_last_ts[key] = max(self.key_last_ts.get(key, newest), newest)
+        if frame.empty:
+            return
+
+        closed = self.resampler.update(frame)
+        for bucket_start, row in zip(closed.index, closed.to_numpy()):
+            self.ring.push(row)
+            self.steps_emitted += 1
+            if self.on_window is not None:
+                result = self.on_window(self.ring.window(), bucket_start)
+                if inspect.isawaitable(result):
+                    await result
+
+    async def poll_once(self):
+        """Fetch points newer than the last seen timestamp and process them"""
+        now = int(datetime.datetime.now(datetime.timezone.utc).timestamp() * 1000)
+        last_ts = self.last_ts
+        if last_ts is None:
+            # First poll: backfill enough history to fill the whole window
+            startTs = now - self.span_ms
+        else:
+            startTs = last_ts + 1
+        # A single request stops at its limit (1000 points by default); long
+        # ranges go through the paginating backfill fetch instead
+        fetch = self.backfill_fetch if now - startTs >= self.span_ms else self.fetch
+
+        loop = asyncio.get_running_loop()
+        try:
+            data = await loop.run_in_executor(None, functools.partial(
+                fetch,
+                entityType=self.entityType,
+                entityId=self.entityId,
+                keys=",".join(self.keys),
+                startTs=startTs,
+                endTs=now,
+                **self.fetch_kwargs
+            ))
+        except RuntimeError as e:
+            # get_telemetry_data_bulk raises when shards fail
+            print(f"Warning: backfill for {self.entityId} failed: {e}")
+            data = None
+        if data is None:
+            print(f"Warning: poll for {self.entityId} failed, retrying next interval")
+            return
+        await self._handle(data, endTs=now)
+
+    async def run(self):
+        """Poll until stop() is called"""
+        while not self._stopped.is_set():
+            await self.poll_once()
+            try:
+                await asyncio.wait_for(self._stopped.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def consume(self, feed):
+        """Process websocket-style messages from an async iterable until it ends or stop() is called"""
+        async for message in feed:
+            await self._handle(websocket_message_to_telemetry(message))
+            if self._stopped.is_set():
+                break
@@ -0,0 +1,303 @@
+from typing import Dict, Iterable, Union
+
+import numpy as np
+import pandas as pd
+
+AGGREGATIONS = ('mean', 'sum', 'min', 'max', 'last', 'count')
+
+
+def rule_to_nanos(rule) -> int:
+    """
+    Convert a fixed-frequency pandas rule (e.g. '1h', '15min', '1D') to nanoseconds
+
+    Days count as 24 hours. (Under pandas 3 a Day is a calendar day, no longer
+    a fixed Tick; StreamingResampler buckets them on local calendar days.)
+
+    Raises:
+        ValueError: For calendar rules such as 'MS' that have no fixed width
+    """
+    offset = pd.tseries.frequencies.to_offset(rule)
+    if isinstance(offset, pd.offsets.Day):
+        return int(offset.n) * 86_400 * 10 ** 9
+    try:
+        return int(pd.Timedelta(offset).value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Rule '{rule}' does not have a fixed width")
+
+
+class StreamingResampler:
+    """
+    Incremental resampler that keeps running per-bucket state
+
+    Raw points can be fed in any order with update(). Each bucket keeps its
+    running sum, count, min, max and last value, so only buckets touched by new
+    points are updated. A bucket is closed, emitted once and dropped from the
+    state when the latest timestamp seen (the watermark) passes its end plus
+    `allowed_lateness`. Points for already emitted buckets are counted in
+    `late_points` and ignored.
+
+    Emitted frames match `df.resample(rule).<how>()`: one row per bucket,
+    including empty buckets as NaN (0 for 'sum' and 'count'). As in pandas'
+    default origin='start_day', buckets are counted from local midnight of the
+    first day seen, in the data's time zone; day rules ('1D') follow local
+    calendar days, so DST days are 23 or 25 hours long. The origin is fixed by
+    the first update: when a later update reaches back to an earlier day, rules
+    that do not divide a day (e.g. '7h') keep the first grid where pandas would
+    re-anchor. Pass `origin` to pin it.
+    """
+
+    def __init__(
+        self,
+        rule='1h',
+        how: Union[str, Dict[str, str]] = 'mean',
+        columns=None,
+        allowed_lateness=None,
+        origin='start_day'
+    ):
+        """
+        Initialize the resampler
+
+        Args:
+            rule: Fixed-frequency pandas rule of the buckets, e.g. '1h'
+            how: Aggregation for every column, or a {column: aggregation} dict.
+                One of 'mean', 'sum', 'min', 'max', 'last', 'count'
+            columns: Columns to resample. If None, the numeric columns of the first update
+            allowed_lateness: How long (pandas Timedelta or string) a bucket stays
+                open after its end to absorb out-of-order points
+            origin: 'start_day' (midnight of the first day seen), 'epoch'
+                (1970-01-01 in the data's time zone) or a Timestamp
+        """
+        self.rule = rule
+        self.width = rule_to_nanos(rule)
+        # Day rules are bucketed on local wall-clock time, all others on absolute time
+        self.calendar_days = isinstance(pd.tseries.frequencies.to_offset(rule), pd.offsets.Day)
+        self.origin = origin
+        self.how = how
+        self.columns = list(columns) if columns is not None else None
+        self.allowed_lateness = int(pd.Timedelta(allowed_lateness or 0).value)
+        self.tz = None
+        self.watermark = None
+        self.late_points = 0
+        # Start of the first bucket not emitted yet (None until the first emission)
+        self._next_emit = None
+        # Bucket grid origin in key space (see _key_space), set by the first update
+        self._origin = None
+        self._keys = np.empty(0, dtype=np.int64)
+        self._state = None
+
+    def _aggregation(self, column):
+        how = self.how.get(column, 'mean') if isinstance(self.how, dict) else self.how
+        if how not in AGGREGATIONS:
+            raise ValueError(f"Unknown aggregation '{how}', expected one of {AGGREGATIONS}")
+        return how
+
+    def _new_state(self, n_buckets, n_features):
+        return {
+            'sum': np.zeros((n_buckets, n_features)),
+            'count': np.zeros((n_buckets, n_features), dtype=np.int64),
+            'min': np.full((n_buckets, n_features), np.inf),
+            'max': np.full((n_buckets, n_features), -np.inf),
+            'last': np.full((n_buckets, n_features), np.nan),
+            'last_ts': np.full((n_buckets, n_features), np.iinfo(np.int64).min, dtype=np.int64),
+        }
+
+    def _reindex_state(self, keys):
+        """Grow the state to cover `keys` (a sorted superset of the current keys)"""
+        state = self._new_state(len(keys), len(self.columns))
+        if len(self._keys):
+            pos = np.searchsorted(keys, self._keys)
+            for name, array in self._state.items():
+                state[name][pos] = array
+        self._keys = keys
+        self._state = state
+
+    def _split_input(self, data):
+        if isinstance(data, pd.Series):
+            data = data.to_frame()
+        if self.columns is None:
+            self.columns = list(data.select_dtypes('number').columns)
+        index = pd.DatetimeIndex(data.index)
+        if self.tz is None and index.tz is not None:
+            self.tz = index.tz
+        if index.tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+        ts = index.as_unit('ns').asi8
+        values = data[self.columns].to_numpy(dtype=np.float64)
+        return ts, values
+
+    def _key_space(self, ts):
+        """
+        Map UTC nanoseconds to the space buckets are floored in
+
+        Local wall-clock nanoseconds for day rules of tz-aware data, so that
+        buckets are local calendar days; the timestamps themselves otherwise.
+        """
+        if not self.calendar_days or self.tz is None:
+            return ts
+        local = pd.DatetimeIndex(np.asarray(ts, dtype='datetime64[ns]')).tz_localize('UTC').tz_convert(self.tz)
+        return local.tz_localize(None).asi8
+
+    def _resolve_origin(self, ts):
+        origin = self.origin
+        if isinstance(origin, str) and origin == 'start_day':
+            first = pd.Timestamp(int(ts.min()), unit='ns', tz='UTC')
+            first = first.tz_convert(self.tz) if self.tz is not None else first.tz_localize(None)
+            origin = first.normalize()
+        elif isinstance(origin, str) and origin == 'epoch':
+            origin = pd.Timestamp('1970-01-01', tz=self.tz)
+        else:
+            origin = pd.Timestamp(origin)
+            if self.tz is not None:
+                origin = origin.tz_localize(self.tz) if origin.tz is None else origin.tz_convert(self.tz)
+            elif origin.tz is not None:
+                origin = origin.tz_convert('UTC').tz_localize(None)
+        if self.calendar_days or origin.tz is None:
+            # Key space of day rules is local wall-clock time
+            return int(origin.tz_localize(None).as_unit('ns').value)
+        return int(origin.as_unit('ns').value)
+
+    def update(self, data) -> pd.DataFrame:
+        """
+        Add raw points and emit the buckets that closed as a result
+
+        Args:
+            data: DatetimeIndex-ed DataFrame or Series of raw points
+
+        Returns:
+            pd.DataFrame: Newly closed buckets (possibly empty)
+        """
+        ts, values = self._split_input(data)
+        if len(ts) == 0:
+            return self._empty_frame()
+
+        keys_ts = self._key_space(ts)
+        if self._origin is None:
+            self._origin = self._resolve_origin(ts)
+        bucket_starts = self._origin + (keys_ts - self._origin) // self.width * self.width
+        if self._next_emit is not None:
+            late = bucket_starts < self._next_emit
+            if late.any():
+                self.late_points += int(late.sum())
+                keep = ~late
+                ts, keys_ts, values, bucket_starts = ts[keep], keys_ts[keep], values[keep], bucket_starts[keep]
+        if len(ts) == 0:
+            return self._empty_frame()
+
+        keys = np.union1d(self._keys, bucket_starts)
+        if len(keys) != len(self._keys) or self._state is None:
+            self._reindex_state(keys)
+        pos = np.searchsorted(self._keys, bucket_starts)
+
+        state = self._state
+        valid = ~np.isnan(values)
+        rows, cols = np.nonzero(valid)
+        bucket_rows = pos[rows]
+        np.add.at(state['sum'], (bucket_rows, cols), values[rows, cols])
+        np.add.at(state['count'], (bucket_rows, cols), 1)
+        np.minimum.at(state['min'], (bucket_rows, cols), values[rows, cols])
+        np.maximum.at(state['max'], (bucket_rows, cols), values[rows, cols])
+
+        # Last value: latest timestamp per (bucket, column); later input rows win ties
+        if len(rows):
+            order = np.lexsort((rows, ts[rows], cols, bucket_rows))
+            b, c, r = bucket_rows[order], cols[order], rows[order]
+            is_last = np.ones(len(order), dtype=bool)
+            is_last[:-1] = (b[1:] != b[:-1]) | (c[1:] != c[:-1])
+            b, c, r = b[is_last], c[is_last], r[is_last]
+            newer = ts[r] >= state['last_ts'][b, c]
+            b, c, r = b[newer], c[newer], r[newer]
+            state['last'][b, c] = values[r, c]
+            state['last_ts'][b, c] = ts[r]
+
+        # The watermark lives in key space, like the bucket starts it closes
+        batch_max = int(keys_ts.max())
+        self.watermark = batch_max if self.watermark is None else max(self.watermark, batch_max)
+        return self._emit(self.watermark - self.allowed_lateness)
+
+    def flush(self) -> pd.DataFrame:
+        """Emit every remaining bucket, e.g. at the end of a stream"""
+        if not len(self._keys):
+            return self._empty_frame()
+        return self._emit(int(self._keys[-1]) + self.width)
+
+    def snapshot(self) -> pd.DataFrame:
+        """Current (partial) aggregates of the open buckets, without emitting them"""
+        return self._frame(self._keys, self._aggregate(slice(None)))
+
+    def _emit(self, cutoff) -> pd.DataFrame:
+        """Emit all buckets whose end is <= cutoff"""
+        if not len(self._keys):
+            return self._empty_frame()
+        closed = int(np.searchsorted(self._keys, cutoff - self.width, side='right'))
+        if closed == 0:
+            return self._empty_frame()
+
+        first = self._keys[0] if self._next_emit is None else min(self._next_emit, self._keys[0])
+        last = self._keys[closed - 1]
+        # Include empty buckets between the closed ones, as DataFrame.resample does
+        starts = np.arange(first, last + self.width, self.width, dtype=np.int64)
+        aggregated = self._aggregate(slice(0, closed))
+        out = np.full((len(starts), len(self.columns)), np.nan)
+        for j, column in enumerate(self.columns):
+            if self._aggregation(column) in ('sum', 'count'):
+                out[:, j] = 0
+        out[(self._keys[:closed] - first) // self.width] = aggregated
+
+        self._keys = self._keys[closed:]
+        self._state = {name: array[closed:] for name, array in self._state.items()}
+        self._next_emit = int(last) + self.width
+        return self._frame(starts, out)
+
+    def _aggregate(self, rows) -> np.ndarray:
+        state = self._state
+        if state is None:
+            return np.empty((0, len(self.columns or [])))
+        count = state['count'][rows]
+        out = np.empty(count.shape)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for j, column in enumerate(self.columns):
+                how = self._aggregation(column)
+                if how == 'mean':
+                    out[:, j] = state['sum'][rows][:, j] / count[:, j]
+                elif how == 'sum':
+                    out[:, j] = state['sum'][rows][:, j]
+                elif how == 'count':
+                    out[:, j] = count[:, j]
+                elif how == 'last':
+                    out[:, j] = state['last'][rows][:, j]
+                else:
+                    out[:, j] = np.where(count[:, j] > 0, state[how][rows][:, j], np.nan)
+        return out
+
+    def _frame(self, starts, values) -> pd.DataFrame:
+        index = pd.DatetimeIndex(np.asarray(starts, dtype='datetime64[ns]'))
+        if self.tz is not None and self.calendar_days:
+            # Local midnights; shift ones skipped by a DST change forward, as pandas does
+            index = index.tz_localize(self.tz, ambiguous=True, nonexistent='shift_forward')
+        elif self.tz is not None:
+            index = index.tz_localize('UTC').tz_convert(self.tz)
+        frame = pd.DataFrame(values, index=index, columns=self.columns)
+        frame.index.freq = None
+        return frame
+
+    def _empty_frame(self) -> pd.DataFrame:
+        return self._frame(np.empty(0, dtype=np.int64), np.empty((0, len(self.columns or []))))
+
+
+def resample_stream(
+    frames: Iterable[pd.DataFrame], rule='1h', how='mean', columns=None, allowed_lateness=None, origin='start_day'
+):
+    """
+    Resample a stream of raw frames (e.g. ingest.iter_power_csv_chunks) incrementally
+
+    Yields:
+        pd.DataFrame: Closed buckets as soon as they are complete, then the remainder
+    """
+    resampler = StreamingResampler(rule, how=how, columns=columns, allowed_lateness=allowed_lateness, origin=origin)
+    for frame in frames:
+        closed = resampler.update(frame)
+        if len(closed):
+            yield closed
+    remainder = resampler.flush()
+    if len(remainder):
+        yield remainder
@@ -0,0 +1,233 @@
+import json
+
+import numpy as np
+
+from outputs import atomic_path
+
+
+def _as_2d(data):
+    """(steps, features) float view of a frame, 1D series or window tensor"""
+    values = data.to_numpy() if hasattr(data, 'to_numpy') else np.asarray(data)
+    if values.ndim == 1:
+        return values[:, None]
+    if values.ndim == 3:
+        # Windows overlap, so each step is counted once per window that contains it
+        return values.reshape(-1, values.shape[-1])
+    return values
+
+
+class StreamingScaler:
+    """
+    Single-pass per-feature mean / variance / min / max (Welford / Chan et al.)
+
+    Statistics are updated batch by batch with the pairwise update of Chan,
+    Golub & LeVeque, so data never has to be held in memory at once, and two
+    scalers fitted on different parts of the data (e.g. by worker processes)
+    merge exactly. NaNs (missing values) are ignored per feature.
+
+    Fit on the resampled series (or CSV chunks / live points), not on the window
+    tensor: every step appears in up to window_len overlapping windows.
+
+    Usage:
+        scaler = StreamingScaler()
+        for chunk in iter_power_csv_chunks(path):
+            scaler.partial_fit(chunk)
+        scaler.save('data/output/scaler.json')
+        for batch in WindowBatcher(values, 168):
+            scaler.transform(batch, copy=False)
+    """
+
+    def __init__(self, columns=None):
+        """
+        Initialize an empty scaler
+
+        Args:
+            columns: Optional feature names, stored with the statistics
+        """
+        self.columns = list(columns) if columns is not None else None
+        self.count = None
+        self.mean = None
+        self.m2 = None
+        self.min = None
+        self.max = None
+
+    @property
+    def n_features(self):
+        return None if self.count is None else len(self.count)
+
+    def _init(self, n_features):
+        self.count = np.zeros(n_features, dtype=np.int64)
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros(n_features)
+        self.min = np.full(n_features, np.inf)
+        self.max = np.full(n_features, -np.inf)
+
+    def _combine(self, count, mean, m2, minimum, maximum):
+        """Merge the statistics of another sample into this one (Chan et al.)"""
+        total = self.count + count
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = mean - self.mean
+            weight = np.where(total > 0, count / np.maximum(total, 1), 0.0)
+            self.mean = self.mean + delta * weight
+            self.m2 = self.m2 + m2 + delta ** 2 * self.count * weight
+        self.count = total
+        self.min = np.fmin(self.min, minimum)
+        self.max = np.fmax(self.max, maximum)
+
+    def partial_fit(self, data):
+        """
+        Update the statistics with a batch of rows
+
+        Args:
+            data: DataFrame, (steps, features) array or window tensor. A 1D array
+                is one feature over time; pass a live multi-feature point as (1, features)
+
+        Returns:
+            StreamingScaler: self
+        """
+        if self.columns is None and hasattr(data, 'columns'):
+            self.columns = [str(c) for c in data.columns]
+        values = _as_2d(data)
+        if self.count is None:
+            self._init(values.shape[1])
+        elif values.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {values.shape[1]}")
+        if len(values) == 0:
+            return self
+
+        observed = ~np.isnan(values)
+        count = observed.sum(axis=0)
+        filled = np.where(observed, values, 0.0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(count > 0, filled.sum(axis=0) / np.maximum(count, 1), 0.0)
+            # Sum of squared deviations from the batch mean; stable because it is centered
+            m2 = (np.where(observed, values - mean, 0.0) ** 2).sum(axis=0)
+        minimum = np.where(observed, values, np.inf).min(axis=0)
+        maximum = np.where(observed, values, -np.inf).max(axis=0)
+        self._combine(count, mean, m2, minimum, maximum)
+        return self
+
+    def merge(self, other):
+        """
+        Fold another scaler's statistics into this one
+
+        Returns:
+            StreamingScaler: self
+        """
+        if other.count is None:
+            return self
+        if self.count is None:
+            self._init(other.n_features)
+            self.columns = self.columns or other.columns
+        elif other.n_features != self.n_features:
+            raise ValueError(f"Cannot merge scalers with {self.n_features} and {other.n_features} features")
+        self._combine(other.count, other.mean, other.m2, other.min, other.max)
+        return self
+
+    @property
+    def var(self):
+        """Population variance per feature (NaN for features without data)"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.count > 0, self.m2 / np.maximum(self.count, 1), np.nan)
+
+    @property
+    def std(self):
+        return np.sqrt(self.var)
+
+    def _scale(self, dtype):
+        std = self.std
+        # Constant (or empty) features are only centered
+        std = np.where(np.isfinite(std) & (std > 0), std, 1.0)
+        return self.mean.astype(dtype), std.astype(dtype)
+
+    def transform(self, data, copy=True, out=None):
+        """
+        Standardize (x - mean) / std along the last axis
+
+        Works on (steps, features) arrays and (samples, window, features) batches.
+
+        Args:
+            data: Array to standardize
+            copy: If False, `data` is modified in place (it must be writable, e.g.
+                a WindowBatcher batch or materialized windows)
+            out: Optional preallocated output array (e.g. for read-only window views)
+
+        Returns:
+            np.ndarray: The standardized array (data itself when copy=False)
+        """
+        if self.count is None:
+            raise ValueError("Scaler has not been fitted")
+        values = np.asarray(data)
+        if out is None:
+            out = values if not copy else np.empty_like(values, dtype=np.result_type(values, np.float32))
+        mean, std = self._scale(out.dtype)
+        np.subtract(values, mean, out=out)
+        np.divide(out, std, out=out)
+        return out
+
+    def inverse_transform(self, data, copy=True):
+        """Undo transform(): x * std + mean"""
+        values = np.array(data, dtype=np.result_type(data, np.float32)) if copy else np.asarray(data)
+        mean, std = self._scale(values.dtype)
+        np.multiply(values, std, out=values)
+        np.add(values, mean, out=values)
+        return values
+
+    def to_dict(self):
+        def listed(array):
+            return [None if not np.isfinite(v) else float(v) for v in array]
+
+        return {
+            'columns': self.columns,
+            'count': self.count.tolist() if self.count is not None else None,
+            'mean': listed(self.mean) if self.count is not None else None,
+            'm2': listed(self.m2) if self.count is not None else None,
+            'min': listed(self.min) if self.count is not None else None,
+            'max': listed(self.max) if self.count is not None else None,
+            'std': listed(self.std) if self.count is not None else None,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        scaler = cls(state.get('columns'))
+        if state.get('count') is not None:
+            def array(values, missing):
+                return np.array([missing if v is None else v for v in values], dtype=np.float64)
+
+            scaler.count = np.array(state['count'], dtype=np.int64)
+            scaler.mean = array(state['mean'], 0.0)
+            scaler.m2 = array(state['m2'], 0.0)
+            scaler.min = array(state['min'], np.inf)
+            scaler.max = array(state['max'], -np.inf)
+        return scaler
+
+    def save(self, path):
+        """Atomically write the fitted state as JSON (e.g. next to windows.npy)"""
+        with atomic_path(path) as tmp_path:
+            with open(tmp_path, 'w') as f:
+                json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def fit_csv(filepath, chunksize=1_000_000, **csv_options):
+    """
+    Fit a StreamingScaler over a CSV export chunk by chunk
+
+    Args:
+        filepath: ThingsBoard CSV export
+        chunksize: Rows per chunk
+        **csv_options: Forwarded to ingest.iter_power_csv_chunks
+
+    Returns:
+        StreamingScaler: Fitted scaler
+    """
+    from ingest import iter_power_csv_chunks
+
+    scaler = StreamingScaler()
+    for chunk in iter_power_csv_chunks(filepath, chunksize=chunksize, **csv_options):
+        scaler.partial_fit(chunk)
+    return scaler
@@ -0,0 +1,317 @@
+import hashlib
+import importlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+
+META_FILE = 'meta.json'
+DIGEST_FILE = 'digests.json'
+_MISSING = object()
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20, memo_path: str = None) -> str:
+    """
+    BLAKE2b digest of a file's content
+
+    Hashing reads the whole file, so digests are remembered in `memo_path` keyed
+    on (size, mtime_ns) and only recomputed when the file changes.
+
+    Args:
+        path: File to hash
+        chunk_size: Bytes read per chunk
+        memo_path: Optional JSON file remembering earlier digests
+
+    Returns:
+        str: Hex digest
+    """
+    stat = os.stat(path)
+    abs_path = os.path.abspath(path)
+    memo = {}
+    if memo_path and os.path.exists(memo_path):
+        try:
+            with open(memo_path) as f:
+                memo = json.load(f)
+        except (OSError, ValueError):
+            memo = {}
+        entry = memo.get(abs_path)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return entry['digest']
+
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    hexdigest = digest.hexdigest()
+
+    if memo_path:
+        memo[abs_path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'digest': hexdigest}
+        _write_json_atomic(memo_path, memo)
+    return hexdigest
+
+
+def stage_key(stage: str, *inputs, **params) -> str:
+    """
+    Cache key of a stage run: a hash of its name, input keys/digests and parameters
+
+    Chain keys by passing the upstream stage's key as an input, so a change to
+    any upstream input or parameter changes every downstream key.
+
+    Usage:
+        source = file_digest('data/total-power-usage-17F.csv')
+        resample_key = stage_key('resample', source, rule='1h', how='mean')
+        index_key = stage_key('window_index', resample_key, window_len=168)
+    """
+    payload = json.dumps([stage, [str(i) for i in inputs], params], sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=20).hexdigest()
+
+
+def _write_json_atomic(path, obj):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix='.json.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(obj, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _json_default(obj):
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+
+class _Encoder:
+    """Write a value as .npy files plus a JSON description of its structure"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.count = 0
+
+    def _array(self, array):
+        name = f"a{self.count}.npy"
+        self.count += 1
+        np.save(os.path.join(self.directory, name), np.ascontiguousarray(array), allow_pickle=False)
+        return name
+
+    def encode(self, value):
+        if isinstance(value, pd.DataFrame):
+            index = value.index
+            if isinstance(index, pd.DatetimeIndex):
+                index_meta = {'kind': 'datetime', 'file': self._array(index.asi8), 'unit': index.unit,
+                              'tz': str(index.tz) if index.tz is not None else None, 'freq': index.freqstr}
+            else:
+                index_meta = {'kind': 'array', 'file': self._array(index.to_numpy())}
+            index_meta['name'] = index.name
+            return {
+                'type': 'frame',
+                'index': index_meta,
+                'columns': [str(c) for c in value.columns],
+                'files': [self._array(value[c].to_numpy()) for c in value.columns],
+            }
+        if isinstance(value, np.ndarray):
+            return {'type': 'array', 'file': self._array(value)}
+        if isinstance(value, tuple) and hasattr(value, '_fields'):
+            cls = type(value)
+            return {
+                'type': 'namedtuple',
+                'class': f"{cls.__module__}:{cls.__qualname__}",
+                'fields': [self.encode(v) for v in value],
+            }
+        if isinstance(value, (list, tuple)) and any(isinstance(v, (np.ndarray, pd.DataFrame)) for v in value):
+            return {'type': 'tuple' if isinstance(value, tuple) else 'list', 'items': [self.encode(v) for v in value]}
+        # Anything else must be plain JSON (dicts of numbers, strings, ...)
+        return {'type': 'json', 'value': json.loads(json.dumps(value, default=_json_default))}
+
+
+def _decode(directory, meta, mmap):
+    kind = meta['type']
+    load = lambda name: np.load(os.path.join(directory, name), mmap_mode='r' if mmap else None, allow_pickle=False)
+    if kind == 'frame':
+        index_meta = meta['index']
+        if index_meta['kind'] == 'datetime':
+            stamps = np.asarray(load(index_meta['file'])).view(f"datetime64[{index_meta['unit']}]")
+            index = pd.DatetimeIndex(stamps, name=index_meta['name'])
+            if index_meta['tz']:
+                index = index.tz_localize('UTC').tz_convert(index_meta['tz'])
+            if index_meta['freq']:
+                index = pd.DatetimeIndex(index, freq=index_meta['freq'])
+        else:
+            index = pd.Index(load(index_meta['file']), name=index_meta['name'])
+        return pd.DataFrame({c: load(f) for c, f in zip(meta['columns'], meta['files'])}, index=index)
+    if kind == 'array':
+        return load(meta['file'])
+    if kind == 'namedtuple':
+        module, qualname = meta['class'].split(':')
+        cls = importlib.import_module(module)
+        for part in qualname.split('.'):
+            cls = getattr(cls, part)
+        return cls(*(_decode(directory, m, mmap) for m in meta['fields']))
+    if kind in ('tuple', 'list'):
+        items = [_decode(directory, m, mmap) for m in meta['items']]
+        return tuple(items) if kind == 'tuple' else items
+    return meta['value']
+
+
+class StageCache:
+    """
+    Content-addressed on-disk cache of pipeline stage results
+
+    Each entry lives in root/<stage>/<key>/ as .npy files (memory-mapped on load)
+    and a meta.json describing the value: DataFrames, arrays, namedtuples of
+    those (e.g. gaps.WindowIndex) and JSON-able values are supported. Entries
+    are written to a temporary directory and renamed into place, so concurrent
+    runs never read a partial entry. After each put, entries older than
+    max_age are dropped, then the least recently used ones until the cache
+    fits in max_bytes.
+    """
+
+    def __init__(self, root: str = None, max_bytes: int = None, max_age: float = None, mmap: bool = True):
+        """
+        Initialize the cache
+
+        Args:
+            root: Cache directory. If None, uses Config.STAGE_CACHE_DIR
+            max_bytes: Size limit of the whole cache. If None, uses Config.STAGE_CACHE_MAX_BYTES
+            max_age: Seconds since last use after which entries are dropped.
+                If None, uses Config.STAGE_CACHE_MAX_AGE
+            mmap: Memory-map arrays on load instead of reading them into memory
+        """
+        self.root = root or Config.STAGE_CACHE_DIR
+        self.max_bytes = Config.STAGE_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.max_age = Config.STAGE_CACHE_MAX_AGE if max_age is None else max_age
+        self.mmap = mmap
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _entry_dir(self, stage, key):
+        return os.path.join(self.root, stage, key)
+
+    def file_digest(self, path: str) -> str:
+        """file_digest() memoized in this cache's directory"""
+        return file_digest(path, memo_path=os.path.join(self.root, DIGEST_FILE))
+
+    def _load(self, stage, key):
+        directory = self._entry_dir(stage, key)
+        try:
+            with open(os.path.join(directory, META_FILE)) as f:
+                meta = json.load(f)
+            value = _decode(directory, meta, self.mmap)
+        except (OSError, ValueError, KeyError):
+            return _MISSING
+        # The meta file's mtime is the entry's last use, for LRU eviction
+        try:
+            os.utime(os.path.join(directory, META_FILE))
+        except OSError:
+            pass
+        return value
+
+    def get(self, stage: str, key: str, default=None):
+        """Return the cached result of (stage, key), or `default` on a miss"""
+        value = self._load(stage, key)
+        with self._lock:
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+        return value
+
+    def put(self, stage: str, key: str, value):
+        """
+        Store `value` as the result of (stage, key)
+
+        Returns:
+            The stored value, as get() would return it (memory-mapped when mmap=True)
+        """
+        stage_dir = os.path.join(self.root, stage)
+        os.makedirs(stage_dir, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix=f".{key}.", dir=stage_dir)
+        try:
+            meta = _Encoder(tmp_dir).encode(value)
+            with open(os.path.join(tmp_dir, META_FILE), 'w') as f:
+                json.dump(meta, f)
+            try:
+                os.rename(tmp_dir, self._entry_dir(stage, key))
+            except OSError:
+                # Another run stored the same key first; its content is identical
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        self.evict()
+        stored = self._load(stage, key)
+        # An entry larger than max_bytes is evicted right away; hand back the original
+        return value if stored is _MISSING else stored
+
+    def cached(self, stage: str, key: str, compute: Callable[[], object]):
+        """
+        Return the cached result of (stage, key), computing and storing it on a miss
+
+        A compute() result of None (the pipeline's failure value) is not stored.
+        """
+        value = self.get(stage, key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = compute()
+        if value is None:
+            return None
+        return self.put(stage, key, value)
+
+    def entries(self):
+        """List (stage, key, size_bytes, last_used) of every entry"""
+        found = []
+        if not os.path.isdir(self.root):
+            return found
+        for stage in os.listdir(self.root):
+            stage_dir = os.path.join(self.root, stage)
+            if not os.path.isdir(stage_dir):
+                continue
+            for key in os.listdir(stage_dir):
+                directory = os.path.join(stage_dir, key)
+                if key.startswith('.'):
+                    continue
+                try:
+                    last_used = os.stat(os.path.join(directory, META_FILE)).st_mtime
+                    size = sum(entry.stat().st_size for entry in os.scandir(directory))
+                except OSError:
+                    continue
+                found.append((stage, key, size, last_used))
+        return found
+
+    def evict(self, now: Optional[float] = None) -> int:
+        """
+        Drop expired entries, then least recently used ones until the cache fits
+
+        Returns:
+            int: Number of entries removed
+        """
+        now = time.time() if now is None else now
+        entries = sorted(self.entries(), key=lambda entry: entry[3])
+        total = sum(entry[2] for entry in entries)
+        removed = 0
+        for stage, key, size, last_used in entries:
+            expired = self.max_age is not None and now - last_used > self.max_age
+            if not expired and (self.max_bytes is None or total <= self.max_bytes):
+                continue
+            shutil.rmtree(self._entry_dir(stage, key), ignore_errors=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        """Remove every entry"""
+        shutil.rmtree(self.root, ignore_errors=True)
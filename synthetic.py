@@ -0,0 +1,159 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_COLUMN = 'Total_Power_Usage_17/F'
+DEFAULT_ENTITY_NAME = 'Total_Power_Usage_17/F'
+
+
+def feature_names(n_features):
+    """Value column names: the 17/F column first, then Feature_2, Feature_3, ..."""
+    return [DEFAULT_COLUMN] + [f"Feature_{i}" for i in range(2, n_features + 1)]
+
+
+def power_values(ts_ns, n_features=1, base=40.0, seed=0, noise=1.0):
+    """
+    Synthetic power readings (kW) with daily and weekly cycles plus noise
+
+    Args:
+        ts_ns: int64 epoch-ns timestamps
+        n_features: Number of meters (columns)
+        base: Mean load in kW
+        seed: Random seed
+        noise: Standard deviation of the Gaussian noise in kW
+
+    Returns:
+        np.ndarray: (len(ts_ns), n_features) float64 values
+    """
+    rng = np.random.default_rng(seed)
+    hours = (np.asarray(ts_ns, dtype=np.int64) // 3_600_000_000_000).astype(np.float64)
+    daily = np.sin(2 * np.pi * (hours % 24) / 24)
+    weekly = np.where((hours // 24 + 4) % 7 >= 5, -0.3, 0.0)  # epoch day 0 was a Thursday
+    scale = 1.0 + 0.2 * np.arange(n_features)
+    values = base * scale * (1.0 + 0.25 * daily + weekly)[:, None]
+    if noise:
+        values += rng.normal(0.0, noise, size=values.shape)
+    return np.round(values, 2)
+
+
+def hash_uniform(ts, salt=0):
+    """
+    Uniform [0, 1) numbers that depend only on (ts, salt), via the splitmix64 finalizer
+
+    Unlike a seeded generator, the number drawn for a timestamp does not depend
+    on which other timestamps are requested with it.
+    """
+    x = np.asarray(ts, dtype=np.int64).astype(np.uint64) + np.uint64(salt & 0xFFFFFFFFFFFFFFFF)
+    x = x + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    x = x ^ (x >> np.uint64(31))
+    return (x >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+
+def gap_mask(n_rows, gap_rate=0.0, mean_gap=3, max_gap=None, seed=0):
+    """
+    Boolean mask of rows to drop, as runs of consecutive missing rows
+
+    Args:
+        n_rows: Number of rows
+        gap_rate: Probability that a gap starts at any given row
+        mean_gap: Mean gap length in rows (geometric distribution)
+        max_gap: Cap on gap length in rows
+        seed: Random seed
+    """
+    rng = np.random.default_rng(seed)
+    mask = np.zeros(n_rows, dtype=bool)
+    if gap_rate <= 0 or n_rows == 0:
+        return mask
+    starts = np.flatnonzero(rng.random(n_rows) < gap_rate)
+    lengths = rng.geometric(1.0 / max(mean_gap, 1), size=len(starts))
+    if max_gap is not None:
+        lengths = np.minimum(lengths, max_gap)
+    # Mark each gap with +1 at its start and -1 after its end, then integrate
+    delta = np.zeros(n_rows + 1, dtype=np.int64)
+    np.add.at(delta, starts, 1)
+    np.add.at(delta, np.minimum(starts + lengths, n_rows), -1)
+    return np.cumsum(delta[:-1]) > 0
+
+
+def write_power_csv(
+    path,
+    n_rows,
+    n_features=1,
+    freq='1min',
+    start='2025-01-01',
+    gap_rate=0.0,
+    mean_gap=3,
+    max_gap=None,
+    chunk_rows=1_000_000,
+    seed=0
+):
+    """
+    Write a synthetic export in the ThingsBoard format of data/total-power-usage-17F.csv
+
+    Rows are generated and written chunk by chunk, so 10^8-row files need only
+    one chunk in memory. Gaps are rows missing from the export, as in real
+    ThingsBoard exports.
+
+    Args:
+        path: Output CSV path
+        n_rows: Number of time steps before gaps are removed
+        n_features: Number of value columns
+        freq: Spacing of the time steps
+        start: First timestamp
+        gap_rate: Probability that a gap starts at any given row
+        mean_gap: Mean gap length in rows
+        max_gap: Cap on gap length in rows
+        chunk_rows: Rows generated per chunk
+        seed: Random seed
+
+    Returns:
+        int: Number of rows written
+    """
+    n_rows = int(n_rows)
+    columns = feature_names(n_features)
+    start_ns = pd.Timestamp(start).value
+    step_ns = pd.Timedelta(freq).value
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    written = 0
+    with open(path, 'w', newline='') as f:
+        f.write(';'.join(['Timestamp', 'Entity Name'] + columns) + '\n')
+        for chunk, first in enumerate(range(0, n_rows, chunk_rows)):
+            count = min(chunk_rows, n_rows - first)
+            ts = start_ns + (first + np.arange(count, dtype=np.int64)) * step_ns
+            keep = ~gap_mask(count, gap_rate, mean_gap, max_gap, seed=seed + chunk)
+            ts = ts[keep]
+            values = power_values(ts, n_features, seed=seed + chunk)
+            stamps = np.char.replace(np.datetime_as_string(ts.astype('datetime64[ns]').astype('datetime64[s]')), 'T', ' ')
+            frame = pd.DataFrame(values, columns=columns)
+            frame.insert(0, 'Entity Name', DEFAULT_ENTITY_NAME)
+            frame.insert(0, 'Timestamp', stamps)
+            frame.to_csv(f, sep=';', header=False, index=False, float_format='%.2f')
+            written += len(ts)
+    return written
+
+
+def telemetry_response(n_points, keys=('ActiveEnergy_kWh',), startTs=0, interval_ms=60_000, strict=False, seed=0):
+    """
+    Synthetic get_telemetry_data response: {key: [{"ts": ..., "value": ...}, ...]}
+
+    Args:
+        n_points: Points per key
+        keys: Telemetry keys
+        startTs: First timestamp (Unix, milliseconds)
+        interval_ms: Spacing of the points
+        strict: Numeric values (useStrictDataTypes=True) instead of strings
+        seed: Random seed
+    """
+    ts = startTs + np.arange(int(n_points), dtype=np.int64) * interval_ms
+    values = power_values(ts * 1_000_000, len(keys), seed=seed)
+    response = {}
+    for j, key in enumerate(keys):
+        column = values[:, j].tolist() if strict else [f"{v:.2f}" for v in values[:, j]]
+        response[key] = [{'ts': t, 'value': v} for t, v in zip(ts.tolist(), column)]
+    return response
@@ -0,0 +1,101 @@
+from operator import itemgetter
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+
+_get_ts = itemgetter('ts')
+_get_value = itemgetter('value')
+
+
+def to_float_array(values) -> np.ndarray:
+    """
+    Convert telemetry values to float64 in one vectorized pass
+
+    Values may already be numbers (useStrictDataTypes=True) or numeric strings.
+    Anything that cannot be parsed becomes NaN.
+    """
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        return pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=np.float64)
+
+
+def decode_series(entries: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Decode one key of a telemetry response into NumPy columns
+
+    Args:
+        entries: List of {"ts": ..., "value": ...} dicts as returned by get_telemetry_data
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (ts int64 epoch ms, values float64)
+    """
+    n = len(entries)
+    ts = np.fromiter(map(_get_ts, entries), dtype=np.int64, count=n)
+    values = to_float_array(list(map(_get_value, entries)))
+    return ts, values
+
+
+def telemetry_to_dataframe(data: Dict[str, List[Dict]], timeZone: str = None, keys: List[str] = None) -> pd.DataFrame:
+    """
+    Convert a telemetry response into a time-indexed DataFrame with float columns
+
+    All keys are aligned on the sorted union of their timestamps; a key with no
+    point at a timestamp gets NaN there. If a key repeats a timestamp, the last
+    value wins.
+
+    Args:
+        data: Response of get_telemetry_data / get_telemetry_data_bulk
+        timeZone: Time zone of the index. If None, uses Config.DEFAULT_TIMEZONE
+        keys: Column order. If None, uses the response's key order
+
+    Returns:
+        pd.DataFrame: Frame indexed by tz-aware 'ts' with one float64 column per key
+    """
+    if keys is None:
+        keys = list(data.keys()) if data else []
+
+    decoded = [decode_series((data or {}).get(key) or []) for key in keys]
+    if decoded:
+        index = np.unique(np.concatenate([ts for ts, _ in decoded]))
+    else:
+        index = np.empty(0, dtype=np.int64)
+
+    columns = np.full((len(index), len(keys)), np.nan)
+    for j, (ts, values) in enumerate(decoded):
+        columns[np.searchsorted(index, ts), j] = values
+
+    ts_index = pd.to_datetime(index, unit='ms', utc=True).tz_convert(timeZone or Config.DEFAULT_TIMEZONE)
+    ts_index.name = 'ts'
+    return pd.DataFrame(columns, index=ts_index, columns=keys)
+
+
+def get_telemetry_frame(bulk: bool = False, **kwargs) -> pd.DataFrame:
+    """
+    Fetch telemetry and decode it straight into a DataFrame
+
+    Requests use useStrictDataTypes=True unless told otherwise, so numbers arrive
+    already numeric and skip string parsing.
+
+    Args:
+        bulk: Use get_telemetry_data_bulk (sharded, paginated) instead of get_telemetry_data
+        **kwargs: Arguments forwarded to the fetch function
+
+    Returns:
+        pd.DataFrame: Decoded frame, or None if the request fails
+    """
+    from getTelemetry import get_telemetry_data, get_telemetry_data_bulk
+
+    kwargs.setdefault('useStrictDataTypes', True)
+    fetch = get_telemetry_data_bulk if bulk else get_telemetry_data
+    data = fetch(**kwargs)
+    if data is None:
+        return None
+
+    keys = None
+    if 'keys' in kwargs:
+        keys = [key.strip() for key in kwargs['keys'].split(',') if key.strip()]
+    return telemetry_to_dataframe(data, timeZone=kwargs.get('timeZone'), keys=keys)
@@ -0,0 +1,244 @@
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote, unquote
+
+import numpy as np
+
+from config import Config
+from telemetry_decode import decode_series, to_float_array
+
+MANIFEST_NAME = "manifest.json"
+
+
+def _atomic_save_npy(path: str, array: np.ndarray):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+class TelemetryStore:
+    """
+    Local columnar store for telemetry series with incremental sync
+
+    Each series, keyed by (entityType, entityId, key), lives in its own directory
+    as append-only segments of two .npy files (int64 epoch-ms timestamps and
+    float64 values) plus a JSON manifest holding the segment ranges and the
+    high-water mark. Segments are memory-mapped on read, so range reads only
+    touch the segments that overlap the requested range.
+    """
+
+    def __init__(self, root: str = None):
+        """
+        Initialize the store
+
+        Args:
+            root: Directory of the store. If None, uses TELEMETRY_STORE_DIR from config
+        """
+        self.root = root or Config.TELEMETRY_STORE_DIR
+        self._lock = threading.Lock()
+
+    def _series_dir(self, entityType: str, entityId: str, key: str) -> str:
+        # Keys such as "Total_Power_Usage_17/F" contain path separators
+        return os.path.join(self.root, quote(entityType, safe=''), quote(entityId, safe=''), quote(key, safe=''))
+
+    def _load_manifest(self, series_dir: str) -> Dict:
+        path = os.path.join(series_dir, MANIFEST_NAME)
+        if not os.path.exists(path):
+            return {"segments": [], "high_water_mark": None, "next_segment": 0}
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def _new_segment_name(self, manifest: Dict, first_ts: int) -> str:
+        index = manifest.get("next_segment", len(manifest["segments"]))
+        manifest["next_segment"] = index + 1
+        return f"seg-{index:06d}-{first_ts}"
+
+    def _save_manifest(self, series_dir: str, manifest: Dict):
+        path = os.path.join(series_dir, MANIFEST_NAME)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, path)
+
+    def series(self) -> List[Tuple[str, str, str]]:
+        """List every stored series as (entityType, entityId, key)"""
+        found = []
+        if not os.path.isdir(self.root):
+            return found
+        for dirpath, _, filenames in os.walk(self.root):
+            if MANIFEST_NAME in filenames:
+                parts = os.path.relpath(dirpath, self.root).split(os.sep)
+                if len(parts) == 3:
+                    found.append(tuple(unquote(part) for part in parts))
+        return sorted(found)
+
+    def high_water_mark(self, entityType: str, entityId: str, key: str) -> Optional[int]:
+        """Latest timestamp (epoch ms) stored for a series, or None if it is empty"""
+        return self._load_manifest(self._series_dir(entityType, entityId, key))["high_water_mark"]
+
+    def append(self, entityType: str, entityId: str, key: str, ts, values) -> int:
+        """
+        Append points newer than the high-water mark as a new segment
+
+        Args:
+            entityType: Entity type, e.g., "DEVICE"
+            entityId: Entity ID
+            key: Telemetry key
+            ts: Epoch-ms timestamps
+            values: Values matching ts
+
+        Returns:
+            int: Number of points appended
+        """
+        ts = np.asarray(ts, dtype=np.int64)
+        values = to_float_array(values)
+        if ts.shape != values.shape:
+            raise ValueError("ts and values must have the same length")
+
+        series_dir = self._series_dir(entityType, entityId, key)
+        with self._lock:
+            manifest = self._load_manifest(series_dir)
+            hwm = manifest["high_water_mark"]
+            if hwm is not None:
+                newer = ts > hwm
+                ts, values = ts[newer], values[newer]
+            if len(ts) == 0:
+                return 0
+
+            order = np.argsort(ts, kind='stable')
+            ts, values = ts[order], values[order]
+            # Keep the last value for duplicated timestamps
+            keep = np.append(ts[1:] != ts[:-1], True)
+            ts, values = ts[keep], values[keep]
+
+            os.makedirs(series_dir, exist_ok=True)
+            name = self._new_segment_name(manifest, int(ts[0]))
+            _atomic_save_npy(os.path.join(series_dir, f"{name}.ts.npy"), ts)
+            _atomic_save_npy(os.path.join(series_dir, f"{name}.value.npy"), values)
+
+            manifest["segments"].append({
+                "name": name,
+                "start": int(ts[0]),
+                "end": int(ts[-1]),
+                "rows": int(len(ts))
+            })
+            manifest["high_water_mark"] = int(ts[-1])
+            self._save_manifest(series_dir, manifest)
+            return int(len(ts))
+
+    def read_range(
+        self,
+        entityType: str,
+        entityId: str,
+        key: str,
+        startTs: int = None,
+        endTs: int = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Read the points with startTs <= ts <= endTs
+
+        Only segments overlapping the range are opened (memory-mapped), and each
+        one is sliced with a binary search on its timestamps.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (ts int64, values float64) in ascending order
+        """
+        series_dir = self._series_dir(entityType, entityId, key)
+        manifest = self._load_manifest(series_dir)
+        ts_parts, value_parts = [], []
+        for segment in manifest["segments"]:
+            if startTs is not None and segment["end"] < startTs:
+                continue
+            if endTs is not None and segment["start"] > endTs:
+                continue
+            seg_ts = np.load(os.path.join(series_dir, f"{segment['name']}.ts.npy"), mmap_mode='r')
+            seg_values = np.load(os.path.join(series_dir, f"{segment['name']}.value.npy"), mmap_mode='r')
+            lo = 0 if startTs is None else np.searchsorted(seg_ts, startTs, side='left')
+            hi = len(seg_ts) if endTs is None else np.searchsorted(seg_ts, endTs, side='right')
+            ts_parts.append(seg_ts[lo:hi])
+            value_parts.append(seg_values[lo:hi])
+
+        if not ts_parts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        return np.concatenate(ts_parts), np.concatenate(value_parts)
+
+    def compact(self, entityType: str, entityId: str, key: str) -> int:
+        """
+        Merge all segments of a series into one
+
+        Returns:
+            int: Number of rows in the compacted series
+        """
+        series_dir = self._series_dir(entityType, entityId, key)
+        with self._lock:
+            manifest = self._load_manifest(series_dir)
+            old_segments = manifest["segments"]
+            if len(old_segments) <= 1:
+                return sum(segment["rows"] for segment in old_segments)
+
+            ts, values = self.read_range(entityType, entityId, key)
+            name = self._new_segment_name(manifest, int(ts[0]))
+            _atomic_save_npy(os.path.join(series_dir, f"{name}.ts.npy"), ts)
+            _atomic_save_npy(os.path.join(series_dir, f"{name}.value.npy"), values)
+            manifest["segments"] = [{
+                "name": name,
+                "start": int(ts[0]),
+                "end": int(ts[-1]),
+                "rows": int(len(ts))
+            }]
+            self._save_manifest(series_dir, manifest)
+
+            for segment in old_segments:
+                for suffix in (".ts.npy", ".value.npy"):
+                    os.remove(os.path.join(series_dir, f"{segment['name']}{suffix}"))
+            return int(len(ts))
+
+    def sync(
+        self,
+        entityType: str,
+        entityId: str,
+        keys: str,
+        initialStartTs: int = None,
+        endTs: int = None,
+        fetch=None,
+        **fetch_kwargs
+    ) -> Dict[str, int]:
+        """
+        Fetch only the points newer than each key's high-water mark and append them
+
+        Args:
+            entityType: Entity type, e.g., "DEVICE"
+            entityId: Entity ID
+            keys: Telemetry keys, comma-separated
+            initialStartTs: Start timestamp for keys with no stored data yet.
+                If None, the fetch function's default range is used
+            endTs: End timestamp (Unix, milliseconds). If None, defaults to now
+            fetch: Function with the get_telemetry_data_bulk signature.
+                If None, uses getTelemetry.get_telemetry_data_bulk
+            **fetch_kwargs: Extra arguments forwarded to fetch
+
+        Returns:
+            Dict[str, int]: Number of points appended per key
+        """
+        if fetch is None:
+            from getTelemetry import get_telemetry_data_bulk
+            fetch = get_telemetry_data_bulk
+
+        appended = {}
+        for key in [key.strip() for key in keys.split(",") if key.strip()]:
+            hwm = self.high_water_mark(entityType, entityId, key)
+            startTs = initialStartTs if hwm is None else hwm + 1
+            data = fetch(
+                entityType=entityType,
+                entityId=entityId,
+                keys=key,
+                startTs=startTs,
+                endTs=endTs,
+                **fetch_kwargs
+            )
+            ts, values = decode_series((data or {}).get(key) or [])
+            appended[key] = self.append(entityType, entityId, key, ts, values)
+        return appended
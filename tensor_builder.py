@@ -0,0 +1,199 @@
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+from resampler import rule_to_nanos
+from telemetry_decode import decode_series
+from windowing import count_windows, sliding_windows_view
+
+GRID_AGGREGATIONS = ('mean', 'sum', 'min', 'max')
+
+AlignedTensor = namedtuple('AlignedTensor', ['X', 'grid', 'index', 'features'])
+AlignedTensor.__doc__ = """
+Result of build_aligned_tensor
+
+X: (samples, window, features) float32 window tensor
+grid: (steps, features) float32 series on the shared time grid (NaN = missing)
+index: tz-aware DatetimeIndex of the grid
+features: (entityType, entityId, key) of each feature column
+"""
+
+
+def _feature_list(devices, keys, entityType) -> List[Tuple[str, str, str]]:
+    features = []
+    for device in devices:
+        if isinstance(device, (tuple, list)):
+            device_type, device_id = device
+        else:
+            device_type, device_id = entityType, device
+        for key in keys:
+            features.append((device_type, device_id, key))
+    return features
+
+
+def _wall_clock_ms(ts, tz) -> np.ndarray:
+    """Local wall-clock milliseconds of epoch-ms timestamps, used to bucket day rules"""
+    local = pd.to_datetime(np.asarray(ts, dtype=np.int64), unit='ms', utc=True).tz_convert(tz)
+    return local.tz_localize(None).as_unit('ms').asi8
+
+
+def accumulate_on_grid(grid, column, ts, values, grid_start, step_ms, how='mean', counts=None):
+    """
+    Aggregate raw points of one feature into column `column` of a preallocated grid
+
+    Args:
+        grid: (steps, features) array to write into (running sums for 'mean')
+        column: Feature column index
+        ts: int64 epoch-ms timestamps
+        values: float values
+        grid_start: Epoch ms of the first grid step
+        step_ms: Grid step in milliseconds
+        how: One of 'mean', 'sum', 'min', 'max'
+        counts: Optional (steps, features) int array counting points per step
+    """
+    bucket = (ts - grid_start) // step_ms
+    keep = (bucket >= 0) & (bucket < len(grid)) & ~np.isnan(values)
+    bucket, values = bucket[keep], values[keep]
+    # Column view: the updates below write straight into the grid
+    target = grid[:, column]
+    if how in ('mean', 'sum'):
+        target += np.bincount(bucket, weights=values, minlength=len(grid)).astype(grid.dtype)
+        if counts is not None:
+            counts[:, column] += np.bincount(bucket, minlength=len(grid))
+    elif how == 'min':
+        np.fmin.at(target, bucket, values)
+    elif how == 'max':
+        np.fmax.at(target, bucket, values)
+    else:
+        raise ValueError(f"Unknown aggregation '{how}', expected one of {GRID_AGGREGATIONS}")
+
+
+def build_aligned_tensor(
+    devices: Sequence,
+    keys: Sequence[str],
+    startTs: int,
+    endTs: int,
+    rule: str = '1h',
+    window_len: int = 24 * 7,
+    step: int = 1,
+    how: str = 'mean',
+    entityType: str = "DEVICE",
+    max_workers: int = 4,
+    fetch=None,
+    out: np.ndarray = None,
+    timeZone: str = None,
+    **fetch_kwargs
+) -> AlignedTensor:
+    """
+    Fetch many devices/keys concurrently and build one aligned PyPOTS input tensor
+
+    Every (device, key) pair becomes one feature. Raw points are aggregated
+    straight into a preallocated (steps, features) float32 grid and the windows
+    are copied once into a preallocated (samples, window, features) float32
+    buffer, without any intermediate DataFrame concat or merge.
+
+    Args:
+        devices: Entity IDs, or (entityType, entityId) tuples
+        keys: Telemetry keys fetched for every device
+        startTs: Start of the grid (Unix, milliseconds), floored to the grid step.
+            Like DataFrame.resample, steps are counted from local midnight of the
+            start day in timeZone, and day rules follow local calendar days
+        endTs: End of the grid (Unix, milliseconds), inclusive
+        rule: Fixed-frequency pandas rule of the grid, e.g. '1h'
+        window_len: Number of time steps per window
+        step: Stride between the start of consecutive windows
+        how: Aggregation of raw points per grid step ('mean', 'sum', 'min', 'max')
+        entityType: Entity type for devices given as plain IDs
+        max_workers: Number of devices fetched concurrently
+        fetch: Function with the get_telemetry_data_bulk signature.
+            If None, uses getTelemetry.get_telemetry_data_bulk
+        out: Optional preallocated float32 buffer for X
+        timeZone: Time zone the grid is aligned in and of the returned index.
+            If None, uses Config.DEFAULT_TIMEZONE
+        **fetch_kwargs: Extra arguments forwarded to fetch (e.g. auth_manager)
+
+    Returns:
+        AlignedTensor: (X, grid, index, features)
+    """
+    if fetch is None:
+        from getTelemetry import get_telemetry_data_bulk
+        fetch = get_telemetry_data_bulk
+    if how not in GRID_AGGREGATIONS:
+        raise ValueError(f"Unknown aggregation '{how}', expected one of {GRID_AGGREGATIONS}")
+
+    keys = list(keys)
+    features = _feature_list(devices, keys, entityType)
+    tz = timeZone or Config.DEFAULT_TIMEZONE
+    step_ms = rule_to_nanos(rule) // 1_000_000
+    # Day rules are bucketed on local wall-clock time, all others on absolute time
+    calendar_days = isinstance(pd.tseries.frequencies.to_offset(rule), pd.offsets.Day)
+    if calendar_days:
+        key_start, key_end = _wall_clock_ms([startTs, endTs], tz)
+    else:
+        key_start, key_end = startTs, endTs
+    origin = int(pd.Timestamp(startTs, unit='ms', tz='UTC').tz_convert(tz).normalize().value // 1_000_000)
+    if calendar_days:
+        origin = int(_wall_clock_ms([origin], tz)[0])
+    grid_start = origin + (key_start - origin) // step_ms * step_ms
+    n_steps = (key_end - grid_start) // step_ms + 1
+
+    n_samples = count_windows(n_steps, window_len, step)
+    if n_samples <= 0:
+        raise ValueError("數據長度小於窗口長度，無法切分！")
+
+    fill = np.nan if how in ('min', 'max') else 0
+    grid = np.full((n_steps, len(features)), fill, dtype=np.float32)
+    counts = np.zeros((n_steps, len(features)), dtype=np.int64) if how in ('mean', 'sum') else None
+
+    starts = grid_start + np.arange(n_steps, dtype=np.int64) * step_ms
+    if calendar_days:
+        # Local midnights; shift ones skipped by a DST change forward, as pandas does
+        index = pd.to_datetime(starts, unit='ms').tz_localize(tz, ambiguous=True, nonexistent='shift_forward')
+    else:
+        index = pd.to_datetime(starts, unit='ms', utc=True).tz_convert(tz)
+    fetch_start = int(index[0].value // 1_000_000)
+
+    device_ids = list(dict.fromkeys((f[0], f[1]) for f in features))
+
+    def fetch_device(device):
+        device_type, device_id = device
+        return device, fetch(
+            entityType=device_type,
+            entityId=device_id,
+            keys=",".join(keys),
+            startTs=fetch_start,
+            endTs=endTs,
+            **fetch_kwargs
+        )
+
+    column_of = {feature: j for j, feature in enumerate(features)}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(device_ids)))) as executor:
+        # Each response is decoded and accumulated as soon as it is consumed, then dropped
+        for (device_type, device_id), data in executor.map(fetch_device, device_ids):
+            for key in keys:
+                ts, values = decode_series((data or {}).get(key) or [])
+                if calendar_days:
+                    ts = _wall_clock_ms(ts, tz)
+                accumulate_on_grid(
+                    grid, column_of[(device_type, device_id, key)], ts, values,
+                    grid_start, step_ms, how=how, counts=counts
+                )
+
+    if how == 'mean':
+        np.divide(grid, counts, out=grid, where=counts > 0)
+    if counts is not None:
+        # Steps with no data at all are missing, not zero
+        grid[counts == 0] = np.nan
+
+    shape = (n_samples, window_len, len(features))
+    if out is None:
+        out = np.empty(shape, dtype=np.float32)
+    elif out.shape != shape or out.dtype != np.float32:
+        raise ValueError(f"out must be a float32 array of shape {shape}")
+    np.copyto(out, sliding_windows_view(grid, window_len, step=step))
+
+    return AlignedTensor(out, grid, index, features)
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregation_planner import bucket_starts, fetch_resampled, plan_aggregation, rule_to_interval
+
+HOUR_MS = 3600 * 1000
+DAY_MS = 24 * HOUR_MS
+
+
+def test_rule_to_interval():
+    assert rule_to_interval("1h") == ("MILLISECONDS", HOUR_MS)
+    assert rule_to_interval("15min") == ("MILLISECONDS", 15 * 60 * 1000)
+    assert rule_to_interval("W-MON") == ("WEEK_ISO", 0)
+    assert rule_to_interval("MS") == ("MONTH", 0)
+    with pytest.raises(ValueError):
+        rule_to_interval("2MS")
+
+
+def test_plan_prefers_server_for_minute_level_meters():
+    plan = plan_aggregation("1h", 0, 30 * DAY_MS - 1, how="mean", raw_interval_ms=60 * 1000)
+    assert plan.mode == "server"
+    assert (plan.agg, plan.intervalType, plan.interval) == ("AVG", "MILLISECONDS", HOUR_MS)
+    assert plan.n_buckets == 30 * 24
+    assert round(plan.reduction) == 60
+
+
+def test_plan_falls_back_to_client():
+    assert plan_aggregation("1h", 0, DAY_MS - 1, how="last").mode == "client"
+    assert plan_aggregation("1h", 0, DAY_MS - 1, raw_interval_ms=HOUR_MS).mode == "client"
+
+
+def test_server_plan_snaps_bucket_midpoints_and_chunks_requests():
+    calls = []
+
+    def fake_fetch(keys, startTs, endTs, agg, interval, **kwargs):
+        calls.append((startTs, endTs))
+        # ThingsBoard returns one point per bucket stamped at the bucket middle
+        return {keys: [{"ts": ts + interval // 2, "value": str(ts // HOUR_MS)}
+                       for ts in range(startTs, endTs + 1, interval)]}
+
+    plan = plan_aggregation("1h", 0, 2 * DAY_MS - 1)
+    frame = fetch_resampled(plan, 0, 2 * DAY_MS - 1, keys="kWh", timeZone="UTC",
+                            max_buckets_per_request=20, fetch=fake_fetch)
+
+    assert len(calls) == 3
+    assert len(frame) == 48
+    np.testing.assert_array_equal(frame["kWh"].to_numpy(), np.arange(48))
+    assert (frame.index == bucket_starts("1h", 0, 2 * DAY_MS - 1, "UTC")).all()
+
+
+def test_day_rules_map_to_milliseconds():
+    assert rule_to_interval("1D") == ("MILLISECONDS", DAY_MS)
+    assert rule_to_interval("2D") == ("MILLISECONDS", 2 * DAY_MS)
+    assert plan_aggregation("1D", 0, 60 * DAY_MS - 1, how="mean").mode == "server"
+
+
+@pytest.mark.parametrize("rule", ["24h", "1D", "7h"])
+def test_client_plan_in_local_time_zone(rule):
+    start = int(pd.Timestamp("2025-01-01", tz="Asia/Hong_Kong").value // 1_000_000)
+    end = start + 3 * DAY_MS - 1
+
+    def fake_fetch_raw(keys, startTs, endTs, **kwargs):
+        return {keys: [{"ts": ts, "value": str((ts - start) // HOUR_MS)}
+                       for ts in range(startTs, endTs + 1, 15 * 60 * 1000)]}
+
+    plan = plan_aggregation(rule, start, end, how="last")
+    assert plan.mode == "client"
+    frame = fetch_resampled(plan, start, end, keys="kWh", timeZone="Asia/Hong_Kong", fetch_raw=fake_fetch_raw)
+
+    assert frame.index[0] == pd.Timestamp("2025-01-01", tz="Asia/Hong_Kong")
+    assert not frame["kWh"].isna().any()
+    width = 7 if rule == "7h" else 24
+    assert frame["kWh"].iloc[0] == width - 1
+
+
+@pytest.mark.parametrize("rule", ["7h", "90min"])
+def test_bucket_starts_count_from_local_midnight(rule):
+    startTs = int(pd.Timestamp("2025-01-01 03:17", tz="UTC").value // 1_000_000)
+    endTs = startTs + 2 * DAY_MS
+    index = pd.to_datetime([startTs, endTs], unit="ms", utc=True).tz_convert("Asia/Kolkata")
+    expected = pd.Series(1.0, index=index).resample(rule).mean().index
+    assert (bucket_starts(rule, startTs, endTs, "Asia/Kolkata") == expected).all()
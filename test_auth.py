@@ -0,0 +1,121 @@
+import base64
+import json
+import os
+import stat
+import threading
+import time
+
+import auth
+from auth import AuthManager, decode_jwt_expiry
+
+
+_jti = iter(range(10 ** 9))
+
+
+def _make_jwt(exp):
+    def encode(obj):
+        return base64.urlsafe_b64encode(json.dumps(obj).encode()).rstrip(b"=").decode()
+    return f"{encode({'alg': 'HS512'})}.{encode({'sub': 'user', 'exp': exp, 'jti': next(_jti)})}.signature"
+
+
+class _FakeResponse:
+    def __init__(self, status_code, data=None):
+        self.status_code = status_code
+        self._data = data or {}
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        pass
+
+
+class _FakeSession:
+    """Stand-in for the shared HTTP session that counts login and refresh calls"""
+
+    def __init__(self, ttl=3600):
+        self.ttl = ttl
+        self.logins = 0
+        self.refreshes = 0
+        self.rejected = set()
+        self.lock = threading.Lock()
+
+    def _tokens(self):
+        now = int(time.time())
+        return {"token": _make_jwt(now + self.ttl), "refreshToken": _make_jwt(now + 7 * 24 * 3600)}
+
+    def post(self, url, headers=None, json=None):
+        with self.lock:
+            if url.endswith("/auth/login"):
+                self.logins += 1
+                time.sleep(0.01)
+            else:
+                self.refreshes += 1
+            return _FakeResponse(200, self._tokens())
+
+    def request(self, method, url, headers=None, **kwargs):
+        token = headers["X-Authorization"].split(" ", 1)[1]
+        if token in self.rejected:
+            return _FakeResponse(401)
+        return _FakeResponse(200, {"ok": True})
+
+
+def test_decode_jwt_expiry():
+    assert decode_jwt_expiry(_make_jwt(1234567890)) == 1234567890
+    assert decode_jwt_expiry("not-a-jwt") is None
+
+
+def test_concurrent_callers_share_one_login(monkeypatch):
+    session = _FakeSession()
+    monkeypatch.setattr(auth, "get_session", lambda: session)
+    manager = AuthManager("http://tb.local", username="u", password="p")
+
+    tokens = []
+    threads = [threading.Thread(target=lambda: tokens.append(manager.get_token())) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert session.logins == 1
+    assert len(set(tokens)) == 1
+
+
+def test_token_refreshed_before_expiry(monkeypatch):
+    session = _FakeSession(ttl=30)
+    monkeypatch.setattr(auth, "get_session", lambda: session)
+    manager = AuthManager("http://tb.local", username="u", password="p", refresh_margin=60)
+
+    manager.login()
+    manager.get_token()
+
+    assert session.logins == 1
+    assert session.refreshes == 1
+
+
+def test_request_retries_once_after_401(monkeypatch):
+    session = _FakeSession()
+    monkeypatch.setattr(auth, "get_session", lambda: session)
+    manager = AuthManager("http://tb.local", username="u", password="p")
+    session.rejected.add(manager.get_token())
+
+    response = manager.request("GET", "http://tb.local/api/data")
+
+    assert response.status_code == 200
+    assert session.refreshes == 1
+
+
+def test_token_store_is_shared_between_managers(monkeypatch, tmp_path):
+    session = _FakeSession()
+    monkeypatch.setattr(auth, "get_session", lambda: session)
+    store = str(tmp_path / "tokens.json")
+
+    first = AuthManager("http://tb.local", username="u", password="p", token_store_path=store)
+    token = first.get_token()
+    second = AuthManager("http://tb.local", username="u", password="p", token_store_path=store)
+
+    assert second.get_token() == token
+    assert session.logins == 1
+    # Written privately through a unique temporary file that does not linger
+    assert stat.S_IMODE(os.stat(store).st_mode) == 0o600
+    assert os.listdir(tmp_path) == ["tokens.json"]
@@ -0,0 +1,39 @@
+import os
+
+from batch import discover_exports, run_batch
+from outputs import load_windows
+from synthetic import write_power_csv
+
+
+def test_batch_processes_exports_and_isolates_failures(tmp_path):
+    source = tmp_path / "exports"
+    source.mkdir()
+    for floor, n_rows in (("16F", 3000), ("17F", 5000), ("18F", 60)):
+        write_power_csv(str(source / f"power-{floor}.csv"), n_rows, n_features=2, freq="1min", seed=1)
+    (source / "broken.csv").write_text("not;a;thingsboard;export\n1;2;3;4\n")
+
+    output = tmp_path / "out"
+    results = run_batch(str(source), str(output), max_workers=2, window_len=24, verbose=False)
+
+    assert [os.path.basename(r.path) for r in results] == [
+        "broken.csv", "power-16F.csv", "power-17F.csv", "power-18F.csv"
+    ]
+    broken, f16, f17, f18 = results
+    assert not broken.ok and "Timestamp" in broken.error
+    assert f17.ok and f17.rows == 5000 and f17.resampled_rows == 84
+    assert f17.n_windows == 84 - 24 + 1
+    # Too short for one window: resampled output only
+    assert f18.ok and f18.n_windows == 0 and "windows" not in f18.outputs
+
+    X, mask = load_windows(f16.outputs["windows"])
+    assert X.shape == (f16.n_windows, 24, 2)
+    assert str(X.dtype) == "float32"
+    assert mask.all()
+
+
+def test_discover_exports_accepts_glob_and_file(tmp_path):
+    for name in ("a.csv", "b.csv", "c.txt"):
+        (tmp_path / name).write_text("")
+    assert discover_exports(str(tmp_path)) == [str(tmp_path / "a.csv"), str(tmp_path / "b.csv")]
+    assert discover_exports(str(tmp_path / "b*")) == [str(tmp_path / "b.csv")]
+    assert discover_exports(str(tmp_path / "c.txt")) == [str(tmp_path / "c.txt")]
@@ -0,0 +1,45 @@
+import numpy as np
+
+from benchmark import compare, measure_startup
+from ingest import read_power_csv
+from synthetic import gap_mask, telemetry_response, write_power_csv
+
+
+def test_synthetic_export_matches_thingsboard_format(tmp_path):
+    path = str(tmp_path / "export.csv")
+    written = write_power_csv(path, 5000, n_features=2, freq="1h", gap_rate=0.01, chunk_rows=1000)
+
+    with open(path) as f:
+        assert f.readline().strip() == "Timestamp;Entity Name;Total_Power_Usage_17/F;Feature_2"
+    df = read_power_csv(path, cache=False)
+    assert len(df) == written < 5000
+    assert df.index.is_monotonic_increasing
+    assert df.index[0].year == 2025
+
+
+def test_gap_mask_produces_runs():
+    mask = gap_mask(10000, gap_rate=0.01, mean_gap=5, max_gap=8, seed=1)
+    edges = np.diff(np.concatenate(([0], mask.astype(int), [0])))
+    lengths = np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)
+    assert lengths.max() <= 16  # overlapping gaps may merge
+    assert lengths.mean() > 1
+
+
+def test_telemetry_response_shape():
+    response = telemetry_response(10, keys=("a", "b"), strict=True)
+    assert set(response) == {"a", "b"}
+    assert isinstance(response["a"][0]["value"], float)
+
+
+def test_compare_flags_only_real_regressions():
+    baseline = {"rows=1": {"resample": {"seconds": 1.0, "peak_bytes": 10 << 20}}}
+    same = {"rows=1": {"resample": {"seconds": 1.2, "peak_bytes": 11 << 20}}}
+    slower = {"rows=1": {"resample": {"seconds": 2.0, "peak_bytes": 40 << 20}}}
+    assert compare(same, baseline) == []
+    assert len(compare(slower, baseline)) == 2
+
+
+def test_entry_points_import_without_heavy_dependencies():
+    results = measure_startup(modules=("config", "getTelemetry", "main"), repeat=1)
+    for stage, result in results.items():
+        assert result["heavy_imports"] == [], stage
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from gap_filler import fill_short_gaps, seasonal_reference
+
+
+def test_linear_fill_of_short_interior_gaps_only():
+    values = np.array([0.0, np.nan, 2.0, np.nan, np.nan, 5.0, np.nan, np.nan, np.nan, 9.0, np.nan])
+    result = fill_short_gaps(values, max_gap=2, seasonal=False)
+    expected = np.array([0.0, 1.0, 2.0, 3.0, 4.0, 5.0, np.nan, np.nan, np.nan, 9.0, np.nan])
+    np.testing.assert_allclose(result.values, expected)
+    assert result.filled[:, 0].tolist() == [False, True, False, True, True] + [False] * 6
+    assert result.stats["n_gaps"] == 2 and result.stats["max_gap"] == 3
+
+
+def test_features_are_filled_independently():
+    values = np.array([[1.0, 1.0], [np.nan, 2.0], [3.0, np.nan], [4.0, np.nan], [5.0, np.nan], [6.0, 6.0]])
+    result = fill_short_gaps(values, max_gap=1, seasonal=False)
+    assert result.values[1, 0] == 2.0
+    assert np.isnan(result.values[2:5, 1]).all()
+
+
+def test_seasonal_fill_uses_same_hour_of_week():
+    index = pd.date_range("2025-01-01", periods=3 * 168, freq="h", name="Timestamp")
+    hour_of_week = (index.dayofweek * 24 + index.hour).to_numpy().astype(float)
+    df = pd.DataFrame({"kW": hour_of_week}, index=index)
+    df.iloc[200:210] = np.nan   # 10 h gap: too long to interpolate
+    df.iloc[0:3] = np.nan       # leading gap: no left neighbour
+
+    result = fill_short_gaps(df, max_gap=2, seasonal_max_gap=12)
+    assert isinstance(result.values, pd.DataFrame)
+    pd.testing.assert_index_equal(result.values.index, df.index)
+    np.testing.assert_array_equal(result.values["kW"].to_numpy(), hour_of_week)
+    assert result.filled.sum() == 13
+    assert result.stats["n_missing_steps"] == 0
+
+    left = fill_short_gaps(df, max_gap=2, seasonal_max_gap=4)
+    assert left.stats["n_missing_steps"] == 10
+
+
+def test_seasonal_reference_averages_both_sides():
+    values = np.array([1.0, np.nan, 3.0, 5.0, 7.0, np.nan, 9.0])
+    np.testing.assert_array_equal(seasonal_reference(values, period=3), [5.0, 7.0, np.nan, 5.0, np.nan, 3.0, 5.0])
+
+
+def test_period_follows_index_frequency():
+    from gap_filler import _period_of
+
+    def frame(freq):
+        return pd.DataFrame({"kW": 0.0}, index=pd.date_range("2025-01-01", periods=4, freq=freq))
+
+    assert _period_of(frame("h"), None) == 168
+    assert _period_of(frame("15min"), None) == 672
+    assert _period_of(frame("D"), None) == 7
+    assert _period_of(frame("5h"), None) is None
+    assert _period_of(frame("W"), None) is None
+    assert _period_of(frame("5h"), 30) == 30
+
+
+def test_seasonal_fill_uses_same_weekday_for_daily_data():
+    index = pd.date_range("2025-01-06", periods=21, freq="D")
+    df = pd.DataFrame({"kW": index.dayofweek.to_numpy().astype(float)}, index=index)
+    df.iloc[9:13] = np.nan
+    result = fill_short_gaps(df, max_gap=1, seasonal_max_gap=4)
+    np.testing.assert_array_equal(result.values["kW"].to_numpy(), index.dayofweek.to_numpy())
+
+
+def test_seasonal_fill_is_disabled_for_non_divisor_frequency(capsys):
+    index = pd.date_range("2025-01-01", periods=200, freq="5h")
+    df = pd.DataFrame({"kW": np.arange(200.0)}, index=index)
+    df.iloc[50:55] = np.nan
+    result = fill_short_gaps(df, max_gap=1, seasonal_max_gap=10)
+    assert np.isnan(result.values["kW"].to_numpy()[50:55]).all()
+    assert "seasonal fill disabled" in capsys.readouterr().out
@@ -0,0 +1,56 @@
+import numpy as np
+
+from gaps import build_window_index, gap_runs, gap_statistics, run_lengths, valid_window_starts
+
+
+def _reference_starts(mask, window_len, step, max_missing_frac, max_gap):
+    """Brute-force check of every window"""
+    starts = []
+    step_mask = mask.any(axis=1)
+    for s in range(0, len(mask) - window_len + 1, step):
+        window = mask[s:s + window_len]
+        if max_missing_frac is not None and window.mean() > max_missing_frac:
+            continue
+        if max_gap is not None:
+            _, lengths = gap_runs(step_mask[s:s + window_len])
+            if len(lengths) and lengths.max() > max_gap:
+                continue
+        starts.append(s)
+    return np.array(starts, dtype=np.int64)
+
+
+def test_gap_runs_and_run_lengths():
+    mask = np.array([0, 1, 1, 0, 1, 1, 1, 0, 0, 1], dtype=bool)
+    starts, lengths = gap_runs(mask)
+    np.testing.assert_array_equal(starts, [1, 4, 9])
+    np.testing.assert_array_equal(lengths, [2, 3, 1])
+    np.testing.assert_array_equal(run_lengths(mask), [0, 1, 2, 0, 1, 2, 3, 0, 0, 1])
+
+    stats = gap_statistics(mask)
+    assert stats["n_gaps"] == 3
+    assert stats["max_gap"] == 3
+    assert stats["gap_length_counts"] == {1: 1, 2: 1, 3: 1}
+
+
+def test_valid_window_starts_matches_brute_force():
+    rng = np.random.default_rng(0)
+    # Clustered gaps: extend random seeds into runs of varying length
+    seeds = rng.random((400, 2)) < 0.03
+    mask = np.zeros_like(seeds)
+    for shift in range(6):
+        mask[shift:] |= seeds[:len(seeds) - shift] & (rng.random(seeds.shape)[:len(seeds) - shift] < 0.8)
+
+    for window_len, step, frac, gap in [(24, 1, 0.1, None), (24, 3, None, 2), (48, 2, 0.2, 4), (10, 1, 0.0, 0)]:
+        np.testing.assert_array_equal(
+            valid_window_starts(mask, window_len, step, frac, gap),
+            _reference_starts(mask, window_len, step, frac, gap),
+        )
+
+
+def test_build_window_index_on_values():
+    values = np.arange(20, dtype=np.float64)
+    values[[3, 4, 5]] = np.nan
+    index = build_window_index(values, 5, max_gap=2)
+    assert index.stats["max_gap"] == 3
+    # Only windows starting at 1..3 contain the whole 3-step gap
+    np.testing.assert_array_equal(index.starts, [0] + list(range(4, 16)))
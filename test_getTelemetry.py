@@ -100,7 +100,15 @@ def test_telemetry_to_dataframe():
         print("Failed to retrieve telemetry data.")
         return None
 
+
+def test_get_jwt_token_is_still_exported(monkeypatch):
+    import auth
+    from getTelemetry import get_jwt_token
+
+    monkeypatch.setattr(auth, "get_jwt_token", lambda username, password: {"token": f"{username}:{password}"})
+    assert get_jwt_token("user", "pw") == {"token": "user:pw"}
+
 if __name__ == "__main__":
     dataframes = test_telemetry_to_dataframe()
     if dataframes is not None and not dataframes.empty:
-        print("\nTelemetry data successfully converted to Pandas DataFrame.")
\ No newline at end of file
+        print("\nTelemetry data successfully converted to Pandas DataFrame.")
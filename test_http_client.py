@@ -0,0 +1,63 @@
+import http_client
+
+
+def test_create_session_configures_pool_and_retries():
+    session = http_client.create_session(
+        pool_size=4, connect_timeout=1, read_timeout=2, max_retries=5, backoff_factor=0.1
+    )
+    adapter = session.get_adapter("https://example.com")
+    assert adapter._pool_maxsize == 4
+    assert adapter.max_retries.total == 5
+    assert "POST" not in adapter.max_retries.allowed_methods
+    assert 503 in adapter.max_retries.status_forcelist
+    assert session.timeout == (1, 2)
+    assert "gzip" in session.headers["Accept-Encoding"]
+
+
+def test_shared_session_is_reused():
+    http_client.reset_session()
+    try:
+        assert http_client.get_session() is http_client.get_session()
+    finally:
+        http_client.reset_session()
+
+
+def test_throttle_aware_session_leaves_503_to_the_controller():
+    http_client.reset_session()
+    try:
+        controlled = http_client.get_session(throttle_aware=True)
+        assert controlled is not http_client.get_session()
+        retry = controlled.get_adapter("https://example.com").max_retries
+        assert 503 not in retry.status_forcelist and 429 not in retry.status_forcelist
+        assert 502 in retry.status_forcelist
+        # Not even when the server sends Retry-After
+        assert not retry.is_retry("GET", 503, has_retry_after=True)
+    finally:
+        http_client.reset_session()
+
+
+def test_metrics_do_not_consume_streamed_bodies(monkeypatch):
+    import requests
+
+    from instrumentation import Instrumentation
+
+    class _Response:
+        status_code = 200
+        raw = None
+
+        def __init__(self, headers):
+            self.headers = headers
+
+        @property
+        def content(self):
+            raise AssertionError("body was read")
+
+    responses = [_Response({}), _Response({"Content-Length": "42"})]
+    monkeypatch.setattr(requests.Session, "request", lambda self, method, url, **kwargs: responses.pop(0))
+    metrics = Instrumentation(enabled=True)
+    monkeypatch.setattr(http_client, "metrics", metrics)
+
+    session = http_client.TimeoutSession(timeout=1)
+    session.request("GET", "http://tb.local/a", stream=True)
+    session.request("GET", "http://tb.local/b")
+    assert metrics.http[("GET", "tb.local")]["bytes"] == 42
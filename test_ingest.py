@@ -0,0 +1,51 @@
+import os
+
+import numpy as np
+
+from ingest import CACHE_SUFFIX, read_power_csv
+
+CSV = """Timestamp;Entity Name;Total_Power_Usage_17/F
+2025-06-26 11:00:00;Total_Power_Usage_17/F;40.89
+2025-06-26 12:00:00;Total_Power_Usage_17/F;42.03
+2025-06-26 14:00:00;Total_Power_Usage_17/F;39.14
+"""
+
+
+def _write_csv(tmp_path):
+    path = tmp_path / "export.csv"
+    path.write_text(CSV)
+    return str(path)
+
+
+def test_reads_only_value_columns(tmp_path):
+    df = read_power_csv(_write_csv(tmp_path), cache=False)
+    assert list(df.columns) == ["Total_Power_Usage_17/F"]
+    assert df.index.name == "Timestamp"
+    np.testing.assert_array_equal(df.iloc[:, 0].to_numpy(), [40.89, 42.03, 39.14])
+
+
+def test_chunked_read_matches_full_read(tmp_path):
+    path = _write_csv(tmp_path)
+    assert read_power_csv(path, chunksize=2, cache=False).equals(read_power_csv(path, cache=False))
+
+
+def test_cache_is_reused_until_source_changes(tmp_path):
+    path = _write_csv(tmp_path)
+    first = read_power_csv(path)
+    assert os.path.exists(path + CACHE_SUFFIX)
+    assert read_power_csv(path).equals(first)
+
+    with open(path, "a") as f:
+        f.write("2025-06-26 15:00:00;Total_Power_Usage_17/F;41.00\n")
+    assert len(read_power_csv(path)) == 4
+
+
+def test_streaming_resample_matches_full_read(tmp_path):
+    from ingest import resample_power_csv
+
+    path = _write_csv(tmp_path)
+    expected = read_power_csv(path, cache=False).resample("1h").mean()
+    resampled = resample_power_csv(path, rule="1h", chunksize=1)
+    np.testing.assert_array_equal(resampled.index.to_numpy(), expected.index.to_numpy())
+    np.testing.assert_allclose(resampled.to_numpy(), expected.to_numpy())
+    assert resampled.index.name == "Timestamp"
@@ -0,0 +1,37 @@
+import json
+
+from instrumentation import Instrumentation
+
+
+def test_disabled_registry_records_nothing():
+    metrics = Instrumentation(enabled=False)
+    with metrics.stage("resample") as record:
+        record.rows = 10
+    metrics.record_http("GET", "http://tb.local/api", 200, 0.1)
+    metrics.increment("auth_logins")
+    assert metrics.to_dict() == {"stages": [], "counters": {}, "http": []}
+
+
+def test_stage_and_http_measurements_export():
+    metrics = Instrumentation(enabled=True, trace_allocations=True)
+    with metrics.stage("window") as record:
+        buffer = bytearray(1 << 20)
+        record.rows = len(buffer)
+    metrics.record_http("GET", "http://tb.local/api/plugins/telemetry", 200, 0.03, nbytes=512)
+    metrics.record_http("GET", "http://tb.local/api/plugins/telemetry", 429, 2.0)
+    metrics.increment("auth_logins")
+
+    data = json.loads(metrics.to_json())
+    stage = data["stages"][0]
+    assert stage["name"] == "window" and stage["rows"] == 1 << 20
+    assert stage["wall_time"] >= 0
+    assert stage["peak_traced_bytes"] >= 1 << 20
+    http = data["http"][0]
+    assert http["count"] == 2 and http["bytes"] == 512
+    assert http["status"] == {"200": 1, "429": 1}
+
+    text = metrics.to_prometheus()
+    assert 'pipeline_stage_rows_total{stage="window"} 1048576' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",host="tb.local",le="0.05"} 1' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",host="tb.local",le="+Inf"} 2' in text
+    assert "pipeline_auth_logins_total 1" in text
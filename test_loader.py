@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from loader import WindowLoader
+from outputs import load_windows, save_windows
+from windowing import sliding_windows_view
+
+
+def _series(n=300, features=2):
+    values = np.arange(n * features, dtype=np.float64).reshape(n, features)
+    values[50:55, 0] = np.nan
+    return values
+
+
+@pytest.mark.parametrize("prefetch", [0, 2])
+def test_epoch_covers_each_start_once(prefetch):
+    values = _series()
+    starts = np.arange(0, 200, 3)
+    loader = WindowLoader(values, 24, starts=starts, batch_size=16, prefetch=prefetch, seed=0)
+    windows = sliding_windows_view(values, 24)
+
+    seen = []
+    for batch in loader:
+        np.testing.assert_array_equal(batch.X, windows[batch.index].astype(np.float32))
+        np.testing.assert_array_equal(batch.missing_mask, ~np.isnan(batch.X))
+        seen.extend(batch.index.tolist())
+    assert sorted(seen) == starts.tolist()
+    assert len(loader) == 5
+
+
+def test_shuffles_differently_each_epoch_and_reuses_buffers():
+    loader = WindowLoader(_series(), 24, batch_size=32, seed=1)
+    first = [batch.index.copy() for batch in loader]
+    second = [batch.index.copy() for batch in loader]
+    assert not all(np.array_equal(a, b) for a, b in zip(first, second))
+
+    buffers = {id(batch.X.base if batch.X.base is not None else batch.X) for batch in loader}
+    assert len(buffers) <= loader.prefetch + 2
+
+
+def test_memmapped_tensor_and_missingness_injection(tmp_path):
+    values = _series()
+    path = str(tmp_path / "windows.npy")
+    save_windows(sliding_windows_view(values, 24), path)
+    X, _ = load_windows(path)
+
+    loader = WindowLoader(X, batch_size=40, missing_rate=0.2, seed=3)
+    injected = observed = 0
+    for batch in loader:
+        np.testing.assert_array_equal(batch.X_ori, np.asarray(X)[batch.index].astype(np.float32))
+        assert np.isnan(batch.X[batch.indicating_mask]).all()
+        assert not (batch.indicating_mask & np.isnan(batch.X_ori)).any()
+        np.testing.assert_array_equal(batch.missing_mask, ~np.isnan(batch.X))
+        injected += batch.indicating_mask.sum()
+        observed += (~np.isnan(batch.X_ori)).sum()
+    assert 0.15 < injected / observed < 0.25
+
+
+def test_early_exit_and_errors_stop_the_prefetch_thread():
+    loader = WindowLoader(_series(), 24, batch_size=8, prefetch=1)
+    for i, _ in enumerate(loader):
+        if i == 2:
+            break
+
+    class Broken:
+        def transform(self, X, copy=True):
+            raise RuntimeError("boom")
+
+    loader = WindowLoader(_series(), 24, batch_size=8, scaler=Broken())
+    with pytest.raises(RuntimeError, match="boom"):
+        list(loader)
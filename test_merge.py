@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from merge import MergedSeries, merge_sorted, sort_unique
+
+HOUR_MS = 3_600_000
+
+
+def _run(ts, values, precedence):
+    ts = np.asarray(ts, dtype=np.int64)
+    return ts, np.asarray(values, dtype=np.float64)[:, None], np.full(len(ts), precedence, dtype=np.int64)
+
+
+def _api_response(key, ts, values):
+    return {key: [{"ts": int(t), "value": str(v)} for t, v in zip(ts, values)]}
+
+
+def test_merge_sorted_keeps_highest_precedence_per_timestamp():
+    ts, values, precedence = merge_sorted([
+        _run([1, 3, 5, 7], [10, 30, 50, 70], 1),
+        _run([2, 3, 4], [20, 31, 40], 2),
+        _run([5, 8], [52, 80], 0),
+    ])
+    assert ts.tolist() == [1, 2, 3, 4, 5, 7, 8]
+    assert values[:, 0].tolist() == [10, 20, 31, 40, 50, 70, 80]
+    assert precedence.tolist() == [1, 2, 2, 2, 1, 1, 0]
+
+    # Runs that already follow each other are concatenated as they are
+    ts, values, _ = merge_sorted([_run([1, 2], [1, 2], 0), _run([3, 4], [3, 4], 0)])
+    assert ts.tolist() == [1, 2, 3, 4]
+
+
+def test_sort_unique_keeps_last_repeat():
+    ts, values = sort_unique(np.array([3, 1, 2, 1]), np.array([[3.0], [1.0], [2.0], [1.5]]))
+    assert ts.tolist() == [1, 2, 3]
+    assert values[:, 0].tolist() == [1.5, 2.0, 3.0]
+
+
+@pytest.mark.parametrize("policy, expected", [
+    ("prefer_api", [1.0, 1.0, 20.0, 20.0, 1.0]),
+    ("prefer_csv", [1.0, 1.0, 1.0, 20.0, 1.0]),
+])
+def test_policies_resolve_csv_api_overlap(policy, expected):
+    # CSV exports carry naive local timestamps; the API returns epoch ms
+    csv = pd.DataFrame(
+        {"Total_Power_Usage_17/F": [1.0, 1.0, 1.0, 1.0]},
+        index=pd.DatetimeIndex(pd.date_range("2025-01-01 08:00", periods=4, freq="h"), name="Timestamp")
+    )
+    csv = csv.drop(csv.index[3])
+    start = int(pd.Timestamp("2025-01-01 00:00", tz="UTC").value // 1_000_000)
+    api_ts = [start + 2 * HOUR_MS, start + 3 * HOUR_MS]
+
+    merged = MergedSeries(["kW"], policy=policy, timeZone="Asia/Hong_Kong")
+    merged.add(csv, "csv", rename={"Total_Power_Usage_17/F": "kW"})
+    merged.add(_api_response("kW", api_ts, [20.0, 20.0]), "api")
+    merged.add(pd.DataFrame({"kW": [1.0]}, index=[pd.Timestamp("2025-01-01 12:00")]), "csv")
+
+    assert merged.ts.tolist() == [start + i * HOUR_MS for i in range(5)]
+    assert merged.values[:, 0].tolist() == expected
+    assert merged.to_frame().index[0] == pd.Timestamp("2025-01-01 08:00", tz="Asia/Hong_Kong")
+
+
+def test_last_write_wins_and_splice_in_the_middle():
+    merged = MergedSeries(["kW"], policy="last_write_wins", timeZone="UTC")
+    merged.add_arrays(np.arange(0, 100, dtype=np.int64) * 10, np.zeros((100, 1)), "csv")
+    kept = merged.add(pd.DataFrame({"kW": [1.0, 1.0, 1.0]}, index=pd.to_datetime([405, 410, 415], unit="ms")), "api")
+    assert kept == 3
+    assert len(merged) == 102
+    assert np.all(np.diff(merged.ts) > 0)
+    assert merged.values[40:44, 0].tolist() == [0.0, 1.0, 1.0, 1.0]
+    assert merged.ts[-1] == 990
+
+    # An older CSV re-export written later still replaces the API values
+    merged.add(pd.DataFrame({"kW": [2.0]}, index=pd.to_datetime([410], unit="ms")), "csv")
+    assert merged.values[42, 0] == 2.0
+
+
+def test_incremental_resample_matches_full_resample():
+    rng = np.random.default_rng(0)
+    start = pd.Timestamp("2025-01-01", tz="UTC")
+    merged = MergedSeries(["kW"], policy="prefer_api", timeZone="UTC")
+
+    def points(first_hour, hours):
+        index = start + pd.to_timedelta(np.sort(rng.uniform(first_hour, first_hour + hours, 200)), unit="h")
+        return pd.DataFrame({"kW": rng.normal(size=200)}, index=index.floor("s"))
+
+    merged.add(points(0, 48), "csv")
+    first = merged.resample("1h", how="mean")
+    assert len(first) == 48
+
+    merged.add(points(40, 20), "api")    # overlaps the end and appends
+    merged.add(points(70, 5), "api")     # leaves empty buckets in between
+    merged.add(points(10, 2), "csv")     # backfill in the middle
+    incremental = merged.resample("1h", how="mean")
+
+    expected = merged.to_frame().resample("1h").mean()
+    expected.index = expected.index.as_unit(incremental.index.unit).rename(incremental.index.name)
+    pd.testing.assert_frame_equal(incremental, expected, check_freq=False)
+    assert merged.resample("1h", how="mean") is incremental
+
+    counts = merged.resample("1h", how="count")
+    assert counts["kW"].sum() == len(merged)
+
+
+def test_unknown_policy_and_source():
+    with pytest.raises(ValueError):
+        MergedSeries(["kW"], policy="newest")
+    with pytest.raises(ValueError):
+        MergedSeries(["kW"]).add(pd.DataFrame({"kW": [1.0]}, index=[pd.Timestamp("2025-01-01")]), "ftp")
+
+
+def test_csv_with_dst_fall_back_hour_is_localized():
+    from merge import frame_to_arrays
+
+    # 01:30 occurs twice on 2025-10-26 in London: first in BST, then in GMT
+    index = pd.DatetimeIndex(["2025-10-26 00:30", "2025-10-26 01:30", "2025-10-26 01:30", "2025-10-26 02:30"])
+    df = pd.DataFrame({"kW": [1.0, 2.0, 3.0, 4.0]}, index=index)
+    ts, values = frame_to_arrays(df, ["kW"], "Europe/London")
+    assert np.diff(ts).tolist() == [HOUR_MS] * 3
+    assert values[:, 0].tolist() == [1.0, 2.0, 3.0, 4.0]
+
+    # Without the preceding hour the repeat cannot be inferred; those rows are dropped
+    ts, values = frame_to_arrays(df.iloc[[1, 3]], ["kW"], "Europe/London")
+    assert values[:, 0].tolist() == [4.0]
+
+
+@pytest.mark.parametrize("rule", ["1h", "7h", "1D"])
+def test_incremental_resample_aligns_to_local_midnight(rule):
+    rng = np.random.default_rng(3)
+    start = pd.Timestamp("2025-01-01 03:00", tz="UTC")
+    merged = MergedSeries(["kW"], timeZone="Asia/Kolkata")
+
+    def points(first_hour, hours):
+        index = start + pd.to_timedelta(np.sort(rng.uniform(first_hour, first_hour + hours, 150)), unit="h")
+        return pd.DataFrame({"kW": rng.normal(size=150)}, index=index.floor("s"))
+
+    merged.add(points(0, 48), "csv")
+    merged.resample(rule)
+    merged.add(points(40, 30), "api")
+    merged.add(points(-30, 2), "csv")    # reaches back to an earlier day
+    result = merged.resample(rule)
+
+    expected = merged.to_frame().resample(rule).mean()
+    assert (result.index == expected.index).all()
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy())
@@ -0,0 +1,81 @@
+import time
+
+import pytest
+
+import getTelemetry
+from auth import AuthManager
+from config import Config
+from mock_thingsboard import MockThingsBoard
+from rate_limit import AdaptiveConcurrencyController
+
+DEVICE = "b57357f0-0934-11f0-ba3c-6989ae50b774"
+HOUR = 3_600_000
+
+
+@pytest.fixture
+def server(monkeypatch):
+    with MockThingsBoard() as mock:
+        monkeypatch.setattr(Config, "TELEMETRY_BASE_URL", f"{mock.base_url}/api/plugins/telemetry")
+        yield mock
+
+
+def _auth(mock):
+    return AuthManager(mock.base_url, username=mock.username, password=mock.password, token_store_path="")
+
+
+def test_raw_query_honours_range_limit_and_order(server):
+    auth = _auth(server)
+    data = getTelemetry.get_telemetry_data(
+        entityId=DEVICE, keys="a,b", startTs=0, endTs=HOUR, limit=10, orderBy="DESC",
+        useStrictDataTypes=True, auth_manager=auth
+    )
+    ts = [entry["ts"] for entry in data["a"]]
+    assert ts == list(range(HOUR, HOUR - 10 * 60_000, -60_000))
+    assert isinstance(data["a"][0]["value"], float)
+    assert data["a"] != data["b"]
+    assert server.stats["logins"] == 1
+
+
+def test_aggregated_buckets_are_stamped_at_midpoints(server):
+    auth = _auth(server)
+    data = getTelemetry.get_telemetry_data(
+        entityId=DEVICE, keys="a", startTs=0, endTs=3 * HOUR - 1, agg="COUNT", interval=HOUR,
+        intervalType="MILLISECONDS", auth_manager=auth
+    )
+    assert [entry["ts"] for entry in data["a"]] == [HOUR // 2, HOUR + HOUR // 2, 2 * HOUR + HOUR // 2]
+    assert [float(entry["value"]) for entry in data["a"]] == [60.0, 60.0, 60.0]
+
+
+def test_bulk_fetch_matches_single_query(server):
+    server.gap_rate = 0.1
+    auth = _auth(server)
+    single = getTelemetry.get_telemetry_data(entityId=DEVICE, keys="a", startTs=0, endTs=6 * HOUR, limit=10_000, auth_manager=auth)
+    bulk = getTelemetry.get_telemetry_data_bulk(
+        entityId=DEVICE, keys="a", startTs=0, endTs=6 * HOUR, shard_ms=HOUR, limit=25,
+        auth_manager=auth, controller=AdaptiveConcurrencyController()
+    )
+    assert bulk["a"] == single["a"]
+    assert len(single["a"]) < 6 * 60
+
+
+def test_expired_token_is_refreshed(server):
+    server.token_ttl = 1.0
+    auth = _auth(server)
+    auth.refresh_margin = 0
+    assert getTelemetry.get_telemetry_data(entityId=DEVICE, keys="a", startTs=0, endTs=HOUR, auth_manager=auth)
+    time.sleep(1.1)
+    assert getTelemetry.get_telemetry_data(entityId=DEVICE, keys="a", startTs=0, endTs=HOUR, auth_manager=auth)
+    assert server.stats["logins"] == 1
+    assert server.stats["refreshes"] == 1
+
+
+def test_throttling_is_retried_through_controller(server):
+    server.throttle_rate = 0.5
+    server.retry_after = 0
+    auth = _auth(server)
+    controller = AdaptiveConcurrencyController(max_retries=20)
+    for _ in range(5):
+        data = getTelemetry.get_telemetry_data(entityId=DEVICE, keys="a", startTs=0, endTs=HOUR, auth_manager=auth, controller=controller)
+        assert len(data["a"]) == 61
+    assert server.stats["throttled"] > 0
+    assert controller.stats()["throttled"] == server.stats["throttled"]
@@ -0,0 +1,73 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from outputs import atomic_path, iter_window_batches, load_frame, load_windows, save_frame, save_windows
+from windowing import sliding_windows_view
+
+
+def test_save_windows_npy_roundtrip_with_mask(tmp_path):
+    series = np.arange(40, dtype=np.float64).reshape(20, 2)
+    series[5, 1] = np.nan
+    view = sliding_windows_view(series, 6)
+    path = str(tmp_path / "windows.npy")
+
+    save_windows(view, path, chunk_rows=4, dtype=np.float32)
+    X, mask = load_windows(path)
+
+    assert isinstance(X, np.memmap)
+    assert X.dtype == np.float32
+    np.testing.assert_array_equal(X, view.astype(np.float32))
+    np.testing.assert_array_equal(mask, ~np.isnan(view))
+
+    batches = list(iter_window_batches(path, batch_size=5))
+    assert sum(len(x) for x, _ in batches) == len(view)
+
+
+def test_save_windows_npy_pair_stays_consistent(tmp_path):
+    path = str(tmp_path / "windows.npy")
+    save_windows(np.zeros((4, 3, 1)), path)
+    save_windows(np.ones((5, 3, 1)), path, save_mask=False)
+    # The stale mask of the first save is gone, and no temporary files remain
+    assert load_windows(path)[1] is None
+    assert os.listdir(tmp_path) == ["windows.npy"]
+
+    save_windows(np.ones((5, 3, 1)), path)
+    np.save(str(tmp_path / "windows.mask.npy"), np.ones((4, 3, 1), dtype=bool))
+    with pytest.raises(ValueError):
+        load_windows(path)
+
+
+def test_atomic_path_keeps_original_on_error(tmp_path):
+    path = tmp_path / "out.csv"
+    path.write_text("original")
+    with pytest.raises(RuntimeError):
+        with atomic_path(str(path)) as tmp:
+            with open(tmp, "w") as f:
+                f.write("partial")
+            raise RuntimeError("boom")
+    assert path.read_text() == "original"
+    assert os.listdir(tmp_path) == ["out.csv"]
+
+
+def test_save_frame_csv_roundtrip(tmp_path):
+    df = pd.DataFrame({"v": [1.0, np.nan, 3.0]}, index=pd.date_range("2025-01-01", periods=3, freq="h", name="Timestamp"))
+    path = str(tmp_path / "resampled.csv")
+    save_frame(df, path)
+    pd.testing.assert_frame_equal(load_frame(path), df, check_freq=False)
+
+
+def test_atomic_path_applies_umask_mode(tmp_path):
+    import outputs
+
+    previous = os.umask(0o027)
+    try:
+        outputs._file_mode.cache_clear()
+        with atomic_path(str(tmp_path / "out.csv")) as tmp:
+            open(tmp, "w").close()
+    finally:
+        os.umask(previous)
+        outputs._file_mode.cache_clear()
+    assert os.stat(tmp_path / "out.csv").st_mode & 0o777 == 0o640
@@ -0,0 +1,77 @@
+import threading
+import time
+
+import getTelemetry
+from rate_limit import AdaptiveConcurrencyController, parse_retry_after
+
+
+class _Response:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            import requests
+            raise requests.exceptions.HTTPError(f"{self.status_code}")
+
+    def json(self):
+        return {"kWh": [{"ts": 1, "value": "1"}]}
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("2") == 2.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+def test_aimd_limit_adjustment():
+    controller = AdaptiveConcurrencyController(initial_limit=4, max_limit=6, cooldown=0)
+    for _ in range(4):
+        controller.record(0.01, 200)
+    assert controller.limit == 5
+
+    controller.record(0.01, 429, retry_after="0")
+    assert controller.limit == 2
+    controller.record(10.0, 200)
+    assert controller.limit == 1
+    assert controller.stats()["throttled"] == 1
+
+
+def test_in_flight_never_exceeds_limit():
+    controller = AdaptiveConcurrencyController(initial_limit=3, max_limit=3)
+    peak = []
+    lock = threading.Lock()
+
+    def worker():
+        with controller.slot():
+            with lock:
+                peak.append(controller.in_flight)
+            time.sleep(0.01)
+        controller.record(0.01, 200)
+
+    threads = [threading.Thread(target=worker) for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert max(peak) <= 3
+    assert controller.throughput() > 0
+
+
+def test_get_telemetry_data_retries_throttled_responses(monkeypatch):
+    responses = [_Response(429, {"Retry-After": "0.05"}), _Response(503), _Response(200)]
+
+    class _Session:
+        def get(self, *args, **kwargs):
+            return responses.pop(0)
+
+    monkeypatch.setattr(getTelemetry, "get_session", lambda throttle_aware=False: _Session())
+    controller = AdaptiveConcurrencyController(default_retry_after=0.01)
+
+    started = time.monotonic()
+    data = getTelemetry.get_telemetry_data(keys="kWh", authorization_token="t", controller=controller)
+
+    assert data == {"kWh": [{"ts": 1, "value": "1"}]}
+    assert time.monotonic() - started >= 0.05
+    assert controller.stats()["requests"] == 3
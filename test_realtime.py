@@ -0,0 +1,107 @@
+import asyncio
+
+import numpy as np
+
+from realtime import IngestDaemon, LocalTelemetryFeed, RingBuffer
+
+HOUR_MS = 3600 * 1000
+
+
+def test_ring_buffer_window_is_ordered_view():
+    ring = RingBuffer(4)
+    for value in range(6):
+        ring.push(value)
+    window = ring.window()
+    np.testing.assert_array_equal(window[:, 0], [2, 3, 4, 5])
+    assert not window.flags.writeable
+    assert np.shares_memory(window, ring._data)
+
+    ring.extend(np.arange(10, 20))
+    np.testing.assert_array_equal(ring.window()[:, 0], [16, 17, 18, 19])
+
+
+def test_daemon_consumes_feed_into_ring():
+    windows = []
+
+    def on_window(window, bucket_start):
+        windows.append((bucket_start, window.copy()))
+
+    daemon = IngestDaemon("dev-1", "kWh", window_len=3, fetch=lambda **kwargs: {}, on_window=on_window, timeZone="UTC")
+
+    async def scenario():
+        feed = LocalTelemetryFeed()
+        for hour in range(5):
+            points = [[hour * HOUR_MS + minute * 60000, str(hour)] for minute in (0, 30)]
+            await feed.publish({"subscriptionId": 1, "data": {"kWh": points}})
+        await feed.close()
+        await daemon.consume(feed)
+
+    asyncio.run(scenario())
+
+    # Hour 4 is still open; hours 0..3 were emitted
+    assert daemon.steps_emitted == 4
+    assert daemon.last_ts == 4 * HOUR_MS + 30 * 60000
+    np.testing.assert_array_equal(windows[-1][1][:, 0], [1, 2, 3])
+
+
+def test_daemon_polls_from_last_seen_timestamp():
+    requested = []
+
+    def fake_fetch(keys, startTs, endTs, **kwargs):
+        requested.append(startTs)
+        return {keys: [{"ts": ts, "value": "1"} for ts in range(startTs - startTs % HOUR_MS, endTs, HOUR_MS // 4)]}
+
+    daemon = IngestDaemon("dev-1", "kWh", window_len=4, fetch=fake_fetch, poll_interval=0)
+
+    async def scenario():
+        await daemon.poll_once()
+        first_last_ts = daemon.last_ts
+        await daemon.poll_once()
+        return first_last_ts
+
+    first_last_ts = asyncio.run(scenario())
+    assert requested[1] == first_last_ts + 1
+    # The first poll backfilled enough history to fill the window
+    assert daemon.ring.is_full
+
+
+def test_daemon_resumes_from_key_cut_off_at_limit():
+    points = {"a": list(range(0, 40)), "b": list(range(0, 40, 10))}
+    requested = []
+
+    def fake_fetch(keys, startTs, endTs, **kwargs):
+        requested.append(startTs)
+        # Every key stops at 5 points, like a request limit
+        return {key: [{"ts": ts, "value": "1"} for ts in points[key] if startTs <= ts <= endTs][:5]
+                for key in keys.split(",")}
+
+    daemon = IngestDaemon("dev-1", "a,b", window_len=4, how="sum", fetch=fake_fetch, timeZone="UTC")
+
+    async def scenario():
+        for _ in range(8):
+            await daemon._handle(fake_fetch("a,b", 0 if daemon.last_ts is None else daemon.last_ts + 1, 39), endTs=39)
+
+    asyncio.run(scenario())
+    assert daemon.key_last_ts == {"a": 39, "b": 39}
+    # Key "a" set the pace; every point went through the resampler exactly once
+    assert daemon.resampler.flush().iloc[0].tolist() == [40.0, 4.0]
+
+
+def test_daemon_backfills_through_paginating_fetch():
+    calls = []
+
+    def fetch(name):
+        def fake_fetch(keys, startTs, endTs, **kwargs):
+            calls.append((name, endTs - startTs))
+            return {keys: [{"ts": ts, "value": "1"} for ts in range(startTs - startTs % HOUR_MS, endTs, HOUR_MS // 4)]}
+        return fake_fetch
+
+    daemon = IngestDaemon("dev-1", "kWh", window_len=4, fetch=fetch("poll"), backfill_fetch=fetch("backfill"))
+
+    async def scenario():
+        await daemon.poll_once()
+        await daemon.poll_once()
+
+    asyncio.run(scenario())
+    assert [name for name, _ in calls] == ["backfill", "poll"]
+    assert calls[0][1] >= 5 * HOUR_MS
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from resampler import StreamingResampler, resample_stream
+
+
+def _raw_frame(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.Timestamp("2025-06-26") + pd.to_timedelta(np.sort(rng.integers(0, 3 * 24 * 3600, n)), unit="s")
+    values = rng.normal(40, 5, size=(n, 2))
+    values[rng.random((n, 2)) < 0.1] = np.nan
+    # Leave an empty stretch so some buckets have no data at all
+    keep = (index < pd.Timestamp("2025-06-27 03:00")) | (index >= pd.Timestamp("2025-06-27 07:00"))
+    return pd.DataFrame(values[keep], index=index[keep], columns=["a", "b"])
+
+
+@pytest.mark.parametrize("how", ["mean", "sum", "min", "max", "last", "count"])
+def test_stream_matches_pandas_resample(how):
+    df = _raw_frame()
+    expected = getattr(df.resample("1h"), how)().astype(np.float64)
+
+    chunks = [df.iloc[i:i + 137] for i in range(0, len(df), 137)]
+    result = pd.concat(list(resample_stream(chunks, rule="1h", how=how)))
+
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy())
+    assert (result.index == expected.index).all()
+
+
+def test_out_of_order_points_within_lateness():
+    df = _raw_frame()
+    shuffled = df.sample(frac=1.0, random_state=1)
+    resampler = StreamingResampler("1h", allowed_lateness="3D")
+    closed = [resampler.update(shuffled.iloc[i:i + 100]) for i in range(0, len(shuffled), 100)]
+    result = pd.concat(closed + [resampler.flush()])
+
+    np.testing.assert_allclose(result.to_numpy(), df.resample("1h").mean().to_numpy())
+    assert resampler.late_points == 0
+
+
+def test_late_points_for_emitted_buckets_are_dropped():
+    index = pd.date_range("2025-01-01", periods=6, freq="30min")
+    resampler = StreamingResampler("1h", columns=["v"])
+    first = resampler.update(pd.DataFrame({"v": np.arange(6.0)}, index=index))
+    assert len(first) == 2
+
+    late = pd.DataFrame({"v": [100.0]}, index=[pd.Timestamp("2025-01-01 00:10")])
+    assert resampler.update(late).empty
+    assert resampler.late_points == 1
+    np.testing.assert_allclose(resampler.flush()["v"].to_numpy(), [4.5])
+
+
+@pytest.mark.parametrize("tz", ["Asia/Hong_Kong", "Asia/Kolkata", "Europe/London"])
+@pytest.mark.parametrize("rule", ["1h", "7h", "24h", "1D"])
+def test_buckets_align_like_pandas_in_local_time(tz, rule):
+    rng = np.random.default_rng(2)
+    # Spans the 2025 end of DST in Europe
+    index = pd.Timestamp("2025-10-24 05:17") + pd.to_timedelta(np.sort(rng.integers(0, 5 * 86400, 1500)), unit="s")
+    index = index.tz_localize(tz, ambiguous="NaT", nonexistent="NaT")
+    df = pd.DataFrame({"v": rng.normal(size=len(index))}, index=index)[index.notna()]
+
+    expected = df.resample(rule).mean()
+    chunks = [df.iloc[i:i + 97] for i in range(0, len(df), 97)]
+    result = pd.concat(list(resample_stream(chunks, rule=rule)))
+
+    assert (result.index == expected.index).all()
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy())
+
+
+def test_rule_to_nanos_accepts_days():
+    from resampler import rule_to_nanos
+
+    assert rule_to_nanos("1D") == rule_to_nanos("24h") == 86_400 * 10 ** 9
+    assert rule_to_nanos("2D") == 2 * 86_400 * 10 ** 9
+    with pytest.raises(ValueError):
+        rule_to_nanos("MS")
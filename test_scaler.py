@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from scaler import StreamingScaler, fit_csv
+from synthetic import write_power_csv
+from windowing import WindowBatcher
+
+
+def _data(n=10_000, seed=0):
+    rng = np.random.default_rng(seed)
+    values = rng.normal([1e6, -3.0], [1.0, 5.0], size=(n, 2))
+    values[rng.random(n) < 0.05, 1] = np.nan
+    return values
+
+
+def test_streaming_statistics_match_numpy():
+    values = _data()
+    scaler = StreamingScaler()
+    for start in range(0, len(values), 777):
+        scaler.partial_fit(values[start:start + 777])
+
+    np.testing.assert_allclose(scaler.mean, np.nanmean(values, axis=0), rtol=1e-12)
+    # Large offset (1e6) with unit variance: a naive sum-of-squares would lose it
+    np.testing.assert_allclose(scaler.var, np.nanvar(values, axis=0), rtol=1e-9)
+    np.testing.assert_array_equal(scaler.min, np.nanmin(values, axis=0))
+    np.testing.assert_array_equal(scaler.max, np.nanmax(values, axis=0))
+    assert scaler.count.tolist() == (~np.isnan(values)).sum(axis=0).tolist()
+
+
+def test_merge_equals_single_pass():
+    values = _data()
+    parts = [StreamingScaler().partial_fit(part) for part in np.array_split(values, 4)]
+    merged = StreamingScaler()
+    for part in parts:
+        merged.merge(part)
+    whole = StreamingScaler().partial_fit(values)
+    np.testing.assert_allclose(merged.mean, whole.mean, rtol=1e-12)
+    np.testing.assert_allclose(merged.var, whole.var, rtol=1e-9)
+
+
+def test_transform_window_batches_in_place(tmp_path):
+    values = _data(500)
+    scaler = StreamingScaler().partial_fit(values)
+    path = str(tmp_path / "scaler.json")
+    scaler.save(path)
+    loaded = StreamingScaler.load(path)
+
+    batcher = WindowBatcher(values, 24, batch_size=64)
+    for batch in batcher:
+        result = loaded.transform(batch, copy=False)
+        assert result is batch
+    last = loaded.transform(values[-24:].astype(np.float32))
+    np.testing.assert_allclose(batch[-1], last, rtol=1e-5, equal_nan=True)
+    np.testing.assert_allclose(loaded.inverse_transform(last), values[-24:], rtol=1e-4, equal_nan=True)
+
+
+def test_fit_csv_in_chunks(tmp_path):
+    path = str(tmp_path / "export.csv")
+    write_power_csv(path, 5000, n_features=2, chunk_rows=1000)
+    scaler = fit_csv(path, chunksize=700)
+    df = pd.read_csv(path, sep=";").drop(columns=["Timestamp", "Entity Name"])
+    np.testing.assert_allclose(scaler.mean, df.mean().to_numpy(), rtol=1e-10)
+    np.testing.assert_allclose(scaler.std, df.std(ddof=0).to_numpy(), rtol=1e-8)
+    assert scaler.columns == list(df.columns)
@@ -0,0 +1,82 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from gaps import WindowIndex, build_window_index
+from stage_cache import StageCache, file_digest, stage_key
+
+
+def _frame():
+    index = pd.date_range("2025-01-01", periods=48, freq="h", tz="Asia/Hong_Kong", name="Timestamp")
+    values = np.arange(48, dtype=np.float64)
+    values[5:8] = np.nan
+    return pd.DataFrame({"a": values, "b": values * 2}, index=index)
+
+
+def test_frame_and_window_index_round_trip(tmp_path):
+    cache = StageCache(str(tmp_path))
+    df = _frame()
+    stored = cache.put("resample", "k1", df)
+    pd.testing.assert_frame_equal(stored, df)
+    assert stored.index.freq == df.index.freq
+
+    index = build_window_index(df, 12, max_missing_frac=0.5)
+    loaded = cache.put("window_index", "k2", index)
+    assert isinstance(loaded, WindowIndex)
+    np.testing.assert_array_equal(loaded.starts, index.starts)
+    assert loaded.stats["n_gaps"] == index.stats["n_gaps"]
+
+
+def test_cached_computes_once_per_key(tmp_path):
+    cache = StageCache(str(tmp_path))
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return np.ones((4, 3))
+
+    key = stage_key("windows", "source", window_len=4)
+    first = cache.cached("windows", key, compute)
+    second = cache.cached("windows", key, compute)
+    np.testing.assert_array_equal(first, second)
+    assert len(calls) == 1
+    assert cache.hits == 1
+
+    other = stage_key("windows", "source", window_len=5)
+    assert other != key
+    cache.cached("windows", other, compute)
+    assert len(calls) == 2
+
+
+def test_failed_stage_is_not_cached(tmp_path):
+    cache = StageCache(str(tmp_path))
+    assert cache.cached("resample", "k", lambda: None) is None
+    assert cache.entries() == []
+
+
+def test_file_digest_follows_content(tmp_path):
+    path = tmp_path / "input.csv"
+    memo = str(tmp_path / "digests.json")
+    path.write_text("a;b\n1;2\n")
+    first = file_digest(str(path), memo_path=memo)
+    assert file_digest(str(path), memo_path=memo) == first
+    path.write_text("a;b\n1;3\n")
+    assert file_digest(str(path), memo_path=memo) != first
+
+
+def test_eviction_by_age_and_size(tmp_path):
+    cache = StageCache(str(tmp_path), max_bytes=None, max_age=3600)
+    for i in range(3):
+        cache.put("stage", f"k{i}", np.zeros(1000))
+    old = os.path.join(str(tmp_path), "stage", "k0", "meta.json")
+    os.utime(old, (1, 1))
+    assert cache.evict() == 1
+    assert cache.get("stage", "k0") is None
+
+    cache.max_bytes = 10_000
+    cache.get("stage", "k1")  # k1 is now the most recently used
+    os.utime(os.path.join(str(tmp_path), "stage", "k2", "meta.json"), (100_000, 100_000))
+    cache.max_age = None
+    assert cache.evict() == 1
+    assert [entry[1] for entry in cache.entries()] == ["k1"]
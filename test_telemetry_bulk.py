@@ -0,0 +1,78 @@
+import threading
+
+import pytest
+
+import getTelemetry
+
+
+def _fake_backend(points, calls=None):
+    """Return a get_telemetry_data stand-in serving `points` {key: [ts, ...]}"""
+    lock = threading.Lock()
+
+    def fake_get_telemetry_data(keys, limit, startTs, endTs, orderBy="ASC", **kwargs):
+        if calls is not None:
+            with lock:
+                calls.append((keys, startTs, endTs))
+        result = {}
+        for key in keys.split(","):
+            selected = [ts for ts in points[key] if startTs <= ts <= endTs][:limit]
+            result[key] = [{"ts": ts, "value": str(ts * 0.5)} for ts in selected]
+        return result
+
+    return fake_get_telemetry_data
+
+
+def test_split_time_range_is_contiguous():
+    shards = getTelemetry._split_time_range(0, 99, 30)
+    assert shards == [(0, 29), (30, 59), (60, 89), (90, 99)]
+
+
+def test_bulk_paginates_past_limit(monkeypatch):
+    points = {"a": list(range(0, 1000, 3)), "b": list(range(0, 1000, 50))}
+    calls = []
+    monkeypatch.setattr(getTelemetry, "get_telemetry_data", _fake_backend(points, calls))
+
+    data = getTelemetry.get_telemetry_data_bulk(
+        keys="a,b", startTs=0, endTs=999, shard_ms=250, limit=10, max_workers=4
+    )
+
+    assert [entry["ts"] for entry in data["a"]] == points["a"]
+    assert [entry["ts"] for entry in data["b"]] == points["b"]
+    # Key "a" needed several pages per shard, so it was re-queried
+    assert len(calls) > 4
+
+
+def test_bulk_reports_failed_shards(monkeypatch):
+    backend = _fake_backend({"a": list(range(100))})
+
+    def flaky(**kwargs):
+        if kwargs["startTs"] >= 50:
+            return None
+        return backend(**kwargs)
+
+    monkeypatch.setattr(getTelemetry, "get_telemetry_data", flaky)
+    with pytest.raises(RuntimeError):
+        getTelemetry.get_telemetry_data_bulk(keys="a", startTs=0, endTs=99, shard_ms=50, limit=10)
+
+
+def test_bulk_drops_points_repeated_across_shards(monkeypatch):
+    backend = _fake_backend({"a": list(range(0, 100, 5))})
+
+    def overlapping(**kwargs):
+        # A server that also returns the first point of the next shard
+        kwargs["endTs"] += 5
+        return backend(**kwargs)
+
+    monkeypatch.setattr(getTelemetry, "get_telemetry_data", overlapping)
+    data = getTelemetry.get_telemetry_data_bulk(keys="a", startTs=0, endTs=99, shard_ms=25, limit=3)
+    assert [entry["ts"] for entry in data["a"]] == list(range(0, 100, 5))
+
+
+def test_bulk_rejects_aggregation_and_order(monkeypatch):
+    monkeypatch.setattr(getTelemetry, "get_telemetry_data", _fake_backend({"a": [1]}))
+    with pytest.raises(ValueError):
+        getTelemetry.get_telemetry_data_bulk(keys="a", startTs=0, endTs=9, agg="AVG")
+    with pytest.raises(ValueError):
+        getTelemetry.get_telemetry_data_bulk(keys="a", startTs=0, endTs=9, orderBy="DESC")
+    data = getTelemetry.get_telemetry_data_bulk(keys="a", startTs=0, endTs=9, agg="NONE")
+    assert [entry["ts"] for entry in data["a"]] == [1]
@@ -0,0 +1,30 @@
+import numpy as np
+
+from telemetry_decode import decode_series, telemetry_to_dataframe
+
+
+def test_decode_series_parses_strings_and_numbers():
+    ts, values = decode_series([{"ts": 1, "value": "1.5"}, {"ts": 2, "value": 3}, {"ts": 3, "value": "n/a"}])
+    assert ts.dtype == np.int64
+    np.testing.assert_array_equal(ts, [1, 2, 3])
+    np.testing.assert_array_equal(values, [1.5, 3.0, np.nan])
+
+
+def test_telemetry_to_dataframe_aligns_keys():
+    data = {
+        "a": [{"ts": 1700000000000, "value": "1"}, {"ts": 1700000060000, "value": "2"}],
+        "b": [{"ts": 1700000060000, "value": "20"}, {"ts": 1700000120000, "value": "30"}],
+    }
+    df = telemetry_to_dataframe(data, timeZone="Asia/Hong_Kong")
+
+    assert list(df.columns) == ["a", "b"]
+    assert str(df.index.tz) == "Asia/Hong_Kong"
+    assert df.index[0].hour == 6  # 22:13 UTC -> 06:13 HKT
+    np.testing.assert_array_equal(df["a"].to_numpy(), [1, 2, np.nan])
+    np.testing.assert_array_equal(df["b"].to_numpy(), [np.nan, 20, 30])
+
+
+def test_telemetry_to_dataframe_handles_empty_keys():
+    df = telemetry_to_dataframe({"a": []}, keys=["a", "missing"])
+    assert df.empty
+    assert list(df.columns) == ["a", "missing"]
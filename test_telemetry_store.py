@@ -0,0 +1,46 @@
+import numpy as np
+
+from telemetry_store import TelemetryStore
+
+SERIES = ("DEVICE", "device-1", "Total_Power_Usage_17/F")
+
+
+def test_append_only_keeps_points_after_high_water_mark(tmp_path):
+    store = TelemetryStore(str(tmp_path))
+    assert store.append(*SERIES, [1000, 2000, 3000], ["1.5", "2.5", "bad"]) == 3
+    assert store.append(*SERIES, [2000, 3000, 4000, 5000], [9, 9, 4, 5]) == 2
+    assert store.high_water_mark(*SERIES) == 5000
+
+    ts, values = store.read_range(*SERIES)
+    np.testing.assert_array_equal(ts, [1000, 2000, 3000, 4000, 5000])
+    np.testing.assert_array_equal(values, [1.5, 2.5, np.nan, 4, 5])
+    assert store.series() == [SERIES]
+
+
+def test_range_read_and_compact(tmp_path):
+    store = TelemetryStore(str(tmp_path))
+    for start in range(0, 100, 10):
+        store.append(*SERIES, np.arange(start, start + 10), np.arange(start, start + 10))
+
+    ts, values = store.read_range(*SERIES, startTs=25, endTs=42)
+    np.testing.assert_array_equal(ts, np.arange(25, 43))
+
+    assert store.compact(*SERIES) == 100
+    store.append(*SERIES, [100], [100])
+    assert store.compact(*SERIES) == 101
+    ts, values = store.read_range(*SERIES)
+    np.testing.assert_array_equal(ts, np.arange(101))
+
+
+def test_sync_fetches_from_high_water_mark(tmp_path):
+    store = TelemetryStore(str(tmp_path))
+    requested = []
+
+    def fake_fetch(entityType, entityId, keys, startTs, endTs, **kwargs):
+        requested.append(startTs)
+        points = [ts for ts in range(0, endTs + 1, 100) if ts >= startTs]
+        return {keys: [{"ts": ts, "value": str(ts)} for ts in points]}
+
+    assert store.sync(*SERIES[:2], "a,b", initialStartTs=0, endTs=500, fetch=fake_fetch) == {"a": 6, "b": 6}
+    assert store.sync(*SERIES[:2], "a", endTs=800, fetch=fake_fetch) == {"a": 3}
+    assert requested == [0, 0, 501]
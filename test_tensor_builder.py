@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from tensor_builder import build_aligned_tensor
+
+HOUR_MS = 3600 * 1000
+
+
+def _fake_fetch(entityType, entityId, keys, startTs, endTs, **kwargs):
+    """Two points per hour for every key; device 'dev-2' has no data in hour 3"""
+    offset = 100.0 if entityId == "dev-2" else 0.0
+    data = {}
+    for k, key in enumerate(keys.split(",")):
+        entries = []
+        for ts in range(startTs, endTs + 1, HOUR_MS // 2):
+            if entityId == "dev-2" and 3 * HOUR_MS <= ts < 4 * HOUR_MS:
+                continue
+            entries.append({"ts": ts, "value": str(offset + k * 10 + ts // HOUR_MS)})
+        data[key] = entries
+    return data
+
+
+def test_builds_aligned_float32_windows():
+    result = build_aligned_tensor(
+        ["dev-1", "dev-2"], ["a", "b"], startTs=0, endTs=10 * HOUR_MS - 1,
+        window_len=4, fetch=_fake_fetch, timeZone="UTC"
+    )
+
+    assert result.X.shape == (7, 4, 4)
+    assert result.X.dtype == np.float32
+    assert result.features == [("DEVICE", "dev-1", "a"), ("DEVICE", "dev-1", "b"),
+                               ("DEVICE", "dev-2", "a"), ("DEVICE", "dev-2", "b")]
+    np.testing.assert_array_equal(result.grid[:, 0], np.arange(10))
+    np.testing.assert_array_equal(result.grid[:, 3], np.where(np.arange(10) == 3, np.nan, np.arange(10) + 110))
+    np.testing.assert_array_equal(result.X[2], result.grid[2:6])
+    assert result.index[0] == pd.Timestamp(0, tz="UTC")
+
+
+def test_writes_into_preallocated_buffer():
+    out = np.empty((5, 4, 1), dtype=np.float32)
+    result = build_aligned_tensor(
+        ["dev-1"], ["a"], startTs=0, endTs=8 * HOUR_MS - 1, window_len=4, step=1,
+        how="max", fetch=_fake_fetch, out=out
+    )
+    assert result.X is out
+    np.testing.assert_array_equal(out[:, 0, 0], np.arange(5))
+
+
+@pytest.mark.parametrize("rule", ["1D", "7h"])
+def test_grid_matches_resample_in_local_time(rule):
+    rng = np.random.default_rng(5)
+    start = int(pd.Timestamp("2025-01-01 03:00", tz="UTC").value // 1_000_000)
+    end = start + 6 * 24 * HOUR_MS
+    ts = np.sort(rng.integers(start, end, 500))
+    values = rng.normal(size=500)
+
+    def fetch(entityType, entityId, keys, startTs, endTs, **kwargs):
+        keep = (ts >= startTs) & (ts <= endTs)
+        return {keys: [{"ts": int(t), "value": str(v)} for t, v in zip(ts[keep], values[keep])]}
+
+    result = build_aligned_tensor(
+        ["dev-1"], ["a"], startTs=start, endTs=end, rule=rule, window_len=2,
+        fetch=fetch, timeZone="Asia/Hong_Kong"
+    )
+
+    index = pd.to_datetime(ts, unit="ms", utc=True).tz_convert("Asia/Hong_Kong")
+    expected = pd.Series(values, index=index).resample(rule).mean()
+    assert (result.index == expected.index).all()
+    np.testing.assert_allclose(result.grid[:, 0], expected.to_numpy(), rtol=1e-6)
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from windowing import WindowBatcher, count_windows, sliding_windows_view
+
+
+def _loop_windows(data, window_len, step=1):
+    """Reference implementation: the original loop from main.create_sliding_windows"""
+    n_samples = count_windows(len(data), window_len, step)
+    X = np.zeros((n_samples, window_len, data.shape[1]))
+    for i in range(n_samples):
+        X[i] = data[i * step : i * step + window_len]
+    return X
+
+
+def test_view_matches_loop():
+    data = np.random.default_rng(0).normal(size=(50, 3))
+    for step in (1, 2, 5):
+        view = sliding_windows_view(data, 7, step=step)
+        np.testing.assert_array_equal(view, _loop_windows(data, 7, step))
+
+
+def test_view_is_zero_copy_and_read_only():
+    data = np.arange(20, dtype=np.float64).reshape(10, 2)
+    view = sliding_windows_view(data, 4)
+    assert np.shares_memory(view, data)
+    assert not view.flags.writeable
+    with pytest.raises(ValueError):
+        view[0, 0, 0] = 1.0
+
+
+def test_short_data_raises():
+    with pytest.raises(ValueError):
+        sliding_windows_view(np.zeros((3, 1)), 4)
+
+
+def test_batcher_covers_all_windows():
+    data = np.arange(30, dtype=np.float64)
+    batcher = WindowBatcher(data, 5, step=2, batch_size=4)
+    batches = [batch.copy() for batch in batcher]
+    assert len(batches) == len(batcher)
+    stacked = np.concatenate(batches)
+    assert stacked.dtype == np.float32
+    np.testing.assert_array_equal(stacked, _loop_windows(data[:, None], 5, 2))
+
+
+def test_create_sliding_windows_with_starts():
+    from main import create_sliding_windows
+
+    data = np.arange(20, dtype=np.float64)
+    windows = create_sliding_windows(data, 4, starts=np.array([0, 5, 9]))
+    np.testing.assert_array_equal(windows[:, 0, 0], [0.0, 5.0, 9.0])
+    assert windows.flags.writeable
+    with pytest.raises(ValueError):
+        create_sliding_windows(data, 4, step=2, starts=np.array([0, 2]))
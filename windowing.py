@@ -0,0 +1,106 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _as_2d(data, dtype=None):
+    """
+    Return data as a 2D (Time, Features) array without copying when possible
+    """
+    arr = np.asarray(data, dtype=dtype)
+    if arr.ndim == 1:
+        arr = arr[:, None]
+    if arr.ndim != 2:
+        raise ValueError(f"Expected 1D or 2D data, got shape {arr.shape}")
+    return arr
+
+
+def count_windows(n_steps, window_len, step=1):
+    """
+    Number of windows of length window_len taken every `step` rows from n_steps rows
+    """
+    if window_len <= 0:
+        raise ValueError("window_len must be positive")
+    if step <= 0:
+        raise ValueError("step must be positive")
+    if n_steps < window_len:
+        return 0
+    return (n_steps - window_len) // step + 1
+
+
+def sliding_windows_view(data, window_len, step=1, dtype=None):
+    """
+    Build a zero-copy, read-only (Samples, Window, Features) view over 2D data.
+
+    Args:
+        data: Array-like of shape (Time, Features) or (Time,).
+        window_len (int): Number of time steps per window.
+        step (int): Stride between the start of consecutive windows.
+        dtype: Optional dtype. Converting the source to another dtype costs one
+            copy of the source series (not of the windows).
+
+    Returns:
+        np.ndarray: Read-only strided view of shape (n_samples, window_len, n_features).
+
+    Raises:
+        ValueError: When the data is shorter than one window.
+    """
+    arr = _as_2d(data, dtype=dtype)
+    if count_windows(len(arr), window_len, step) <= 0:
+        raise ValueError("數據長度小於窗口長度，無法切分！")
+
+    # sliding_window_view returns (Samples, Features, Window); move the window axis
+    # in front of the feature axis so the layout matches (Samples, Window, Features)
+    view = sliding_window_view(arr, window_len, axis=0)[::step]
+    view = view.transpose(0, 2, 1)
+    view.flags.writeable = False
+    return view
+
+
+class WindowBatcher:
+    """Lazily yield mini-batches of sliding windows without materializing all of them"""
+
+    def __init__(self, data, window_len, step=1, batch_size=256, dtype=np.float32):
+        """
+        Initialize the batcher
+
+        Args:
+            data: Array-like of shape (Time, Features) or (Time,).
+            window_len (int): Number of time steps per window.
+            step (int): Stride between the start of consecutive windows.
+            batch_size (int): Number of windows per yielded batch.
+            dtype: dtype of the yielded batches.
+        """
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        self._view = sliding_windows_view(data, window_len, step=step)
+        self.window_len = window_len
+        self.step = step
+        self.batch_size = batch_size
+        self.dtype = np.dtype(dtype)
+
+    @property
+    def shape(self):
+        """Shape of the full (virtual) window tensor"""
+        return self._view.shape
+
+    @property
+    def n_samples(self):
+        return self._view.shape[0]
+
+    def __len__(self):
+        """Number of batches"""
+        return -(-self.n_samples // self.batch_size)
+
+    def __iter__(self):
+        # One reusable buffer per iteration; each batch is a slice of it, so callers
+        # that keep batches around must copy them
+        buffer = np.empty((self.batch_size,) + self._view.shape[1:], dtype=self.dtype)
+        for start in range(0, self.n_samples, self.batch_size):
+            stop = min(start + self.batch_size, self.n_samples)
+            out = buffer[: stop - start]
+            np.copyto(out, self._view[start:stop], casting='unsafe')
+            yield out
+
+    def materialize(self):
+        """Copy every window into one dense array (same result as the old loop)"""
+        return np.array(self._view, dtype=self.dtype)